@@ -11,6 +11,8 @@ import os
 
 # complex_search: With ORs and not filtering by not restricted settings
 COMPLEX_SEARCH_CAPABILITY = "complex_search"
-SERVER_CAPABILITIES = [COMPLEX_SEARCH_CAPABILITY, ]
+# batch_packages_info: Info and manifest of several packages in one request
+BATCH_PACKAGES_INFO_CAPABILITY = "batch_packages_info"
+SERVER_CAPABILITIES = [COMPLEX_SEARCH_CAPABILITY, BATCH_PACKAGES_INFO_CAPABILITY]
 
 __version__ = '0.19.1'
@@ -0,0 +1,176 @@
+import io
+import itertools
+import os
+import signal
+import sys
+import tempfile
+import threading
+import traceback
+
+from conans.client import output as conan_output
+from conans.errors import ConanException
+from conans.util import locks
+from conans.util.files import load, save, rmdir
+from conans.util.log import logger
+
+
+def fork_available():
+    return hasattr(os, "fork")
+
+
+class BuildScheduler(object):
+    """ Runs the tasks of a dependency graph as soon as all their dependencies are done, not
+    level by level. The concurrent ones (the builds) run in threads that wait for a forked
+    process each, up to max_builds at the same time, the others run in this thread.
+    The output of every forked process goes to its own log file, written at once when it
+    finishes, so the logs of different builds are not mixed. The first failure kills the
+    running processes and no new task is started
+    """
+
+    def __init__(self, output, client_cache, max_builds):
+        self._out = output
+        self._client_cache = client_cache
+        self._max_builds = max_builds
+        self._pids = set()
+        self._lock = threading.Lock()
+        self._aborted = False
+        self._logs_folder = None
+        self._log_ids = itertools.count()
+
+    def run(self, tasks):
+        """ param tasks: [(key, dependency keys, function, concurrent)], in the preferred order
+        """
+        self._logs_folder = tempfile.mkdtemp(suffix="conan_builds")
+        condition = threading.Condition()
+        done = set()
+        started = set()
+        failures = []
+        threads = []
+
+        def worker(key, function):
+            try:
+                function()
+            except BaseException as exc:
+                logger.debug(traceback.format_exc())
+                with condition:
+                    failures.append(exc)
+                    condition.notify()
+            else:
+                with condition:
+                    done.add(key)
+                    condition.notify()
+
+        try:
+            while True:
+                inline = None
+                with condition:
+                    if failures or len(done) == len(tasks):
+                        break
+                    running = len(started) - len(done)
+                    for key, dependencies, function, concurrent in tasks:
+                        if key in started or any(dep not in done for dep in dependencies):
+                            continue
+                        if not concurrent:
+                            inline = inline or (key, function)
+                        elif running < self._max_builds:
+                            started.add(key)
+                            running += 1
+                            thread = threading.Thread(target=worker, args=(key, function))
+                            thread.daemon = True
+                            thread.start()
+                            threads.append(thread)
+                    if inline is None:
+                        if running == 0:
+                            raise ConanException("Cannot schedule the build of the "
+                                                 "remaining packages")
+                        condition.wait(1)  # With timeout, so python 2 can be interrupted
+                        continue
+                    started.add(inline[0])
+                inline[1]()
+                with condition:
+                    done.add(inline[0])
+        except BaseException:
+            self._abort()
+            raise
+        finally:
+            if failures:
+                self._abort()
+            for thread in threads:
+                thread.join()
+            rmdir(self._logs_folder)
+        if failures:
+            raise failures[0]
+
+    def _abort(self):
+        with self._lock:
+            self._aborted = True
+            pids = list(self._pids)
+        for pid in pids:
+            try:
+                os.killpg(pid, signal.SIGTERM)
+            except OSError:  # Already finished
+                pass
+
+    def run_forked(self, function):
+        """ calls function in a forked process, in its own process group, and waits for it.
+        Nothing it changes in memory is seen by this process
+        """
+        with self._lock:
+            if self._aborted:
+                raise ConanException("Build cancelled")
+            log_path = os.path.join(self._logs_folder, "%d.log" % next(self._log_ids))
+            error_path = log_path + ".error"
+            with conan_output.output_lock():
+                sys.stdout.flush()
+                sys.stderr.flush()
+                pid = os.fork()
+            if pid == 0:
+                self._child(function, log_path, error_path)  # Doesn't return
+            try:
+                os.setpgid(pid, pid)  # Also in the child, whichever runs first
+            except OSError:
+                pass
+            self._pids.add(pid)
+        try:
+            _, status = os.waitpid(pid, 0)
+        finally:
+            with self._lock:
+                self._pids.discard(pid)
+
+        if os.path.exists(log_path):
+            self._out.write(load(log_path))
+        if status != 0:
+            if os.path.exists(error_path):
+                raise ConanException(load(error_path))
+            raise ConanException("Build process killed")
+
+    def _child(self, function, log_path, error_path):
+        exit_code = 1
+        stream = getattr(self._out, "_stream", None)
+        # An output kept in memory, not redirected with the file descriptors
+        buffered = hasattr(stream, "getvalue")
+        start = len(stream.getvalue()) if buffered else 0
+        log_fd = None
+        try:
+            os.setpgid(0, 0)  # So the commands it runs are killed with it
+            locks.reset_after_fork()
+            self._client_cache.reset_after_fork()
+            log_fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            os.dup2(log_fd, 1)
+            os.dup2(log_fd, 2)
+            function()
+            exit_code = 0
+        except BaseException as exc:
+            try:
+                save(error_path, str(exc))
+            except BaseException:
+                pass
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                if buffered and log_fd is not None:
+                    with io.open(os.dup(log_fd), "ab") as log_file:
+                        log_file.write(stream.getvalue()[start:].encode("utf-8"))
+            finally:
+                os._exit(exit_code)
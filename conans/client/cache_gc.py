@@ -0,0 +1,159 @@
+import os
+import time
+import fasteners
+from conans.client.remover import DiskRemover
+from conans.client.store.access_log import FOLDER_KINDS, PACKAGES, BUILDS, SOURCES
+from conans.errors import ConanException
+from conans.model.ref import ConanFileReference, PackageReference
+from conans.util.files import list_folder_subdirs
+from conans.util.log import logger
+
+GC_LOCK = "gc.lock"
+
+
+def _folder_size(folder):
+    size = 0
+    for dirpath, _, filenames in os.walk(folder):
+        for filename in filenames:
+            try:
+                size += os.lstat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                pass
+    return size
+
+
+def _mb(size):
+    return "%.1f MB" % (size / (1024.0 * 1024.0))
+
+
+class CacheCollector(object):
+    """ Garbage collection of the local cache: removes the least recently used package, build
+    and source folders, until the ones of each kind fit in their size quota. The references
+    that are being used by other running commands are skipped
+    """
+
+    def __init__(self, client_cache, output):
+        self._client_cache = client_cache
+        self._out = output
+
+    def collect(self, quotas, dry_run=False):
+        """ param quotas: {kind of folder: max size in MB}, 0 for no quota
+        return the freed bytes
+        """
+        quotas = {kind: quota for kind, quota in quotas.items() if quota}
+        if not quotas:
+            self._out.info("No quotas defined for the local cache, nothing to collect")
+            return 0
+
+        gc_lock = fasteners.InterProcessLock(os.path.join(self._client_cache.locks_folder,
+                                                          GC_LOCK), logger=logger)
+        if not gc_lock.acquire(blocking=False):
+            self._out.warn("Other process is collecting the local cache, skipped")
+            return 0
+        t1 = time.time()
+        try:
+            stored = self._stored_folders()
+            freed = 0
+            for kind in FOLDER_KINDS:
+                if kind in quotas:
+                    freed += self._collect(kind, stored[kind], quotas[kind] * 1024 * 1024,
+                                           dry_run)
+        finally:
+            gc_lock.release()
+        logger.debug("Cache garbage collection: %.3fs" % (time.time() - t1))
+        if freed:
+            self._out.success("%s %s of the local cache"
+                              % ("Would free" if dry_run else "Freed", _mb(freed)))
+        return freed
+
+    def _stored_folders(self):
+        """ return {kind: {reference string: (reference, folder)}} of the existing folders
+        """
+        paths = self._client_cache
+        stored = {kind: {} for kind in FOLDER_KINDS}
+        for folder in list_folder_subdirs(paths.store, level=4):
+            try:
+                conan_ref = ConanFileReference(*folder.split("/"))
+            except Exception:  # Not a reference
+                continue
+            for package_id in paths.conan_packages(conan_ref):
+                package_ref = PackageReference(conan_ref, package_id)
+                stored[PACKAGES][str(package_ref)] = (package_ref,
+                                                      paths.package(package_ref, short_paths=None))
+            for package_id in paths.conan_builds(conan_ref):
+                package_ref = PackageReference(conan_ref, package_id)
+                stored[BUILDS][str(package_ref)] = (package_ref,
+                                                    paths.build(package_ref, short_paths=None))
+            if os.path.isdir(paths.source(conan_ref)):
+                stored[SOURCES][str(conan_ref)] = (conan_ref,
+                                                   paths.source(conan_ref, short_paths=None))
+        return stored
+
+    def _collect(self, kind, stored, quota, dry_run):
+        """ removes the least recently used folders of that kind beyond the quota (bytes).
+        The sizes are measured every time, the folders can change anywhere in their tree
+        """
+        access_log = self._client_cache.access_log
+        entries = access_log.entries(kind) if access_log else {}
+        items = []
+        updated = {}
+        for ref_str, (reference, folder) in stored.items():
+            try:
+                folder_mtime = os.path.getmtime(folder)
+            except OSError:  # Removed meanwhile
+                continue
+            last_access = entries.get(ref_str)
+            if last_access is None:  # Never recorded, created by other commands
+                last_access = folder_mtime
+                updated[ref_str] = last_access
+            items.append((last_access, ref_str, reference, _folder_size(folder)))
+
+        removed = [ref_str for ref_str in entries if ref_str not in stored]
+        total = sum(size for _, _, _, size in items)
+        freed = 0
+        for _, ref_str, reference, size in sorted(items):
+            if total <= quota:
+                break
+            if self._remove(kind, reference, size, dry_run):
+                total -= size
+                freed += size
+                removed.append(ref_str)
+                updated.pop(ref_str, None)
+
+        if total > quota:
+            self._out.warn("The %s of the local cache use %s, over the quota of %s"
+                           % (kind, _mb(total), _mb(quota)))
+        if access_log and not dry_run:
+            access_log.update(kind, updated)
+            access_log.forget(kind, removed)
+        return freed
+
+    def _remove(self, kind, reference, size, dry_run):
+        conan_ref = reference.conan if isinstance(reference, PackageReference) else reference
+        description = "%s %s (%s)" % (kind[:-1], str(reference), _mb(size))
+        if dry_run:
+            self._out.info("Would remove %s" % description)
+            return True
+
+        locks = self._client_cache.locks
+        writer = locks.acquire_write(str(conan_ref), blocking=False)
+        if writer is None:
+            self._out.info("Skipping %s, in use" % description)
+            return False
+        try:
+            remover = DiskRemover(self._client_cache)
+            if kind == PACKAGES:
+                remover.remove_packages(conan_ref, [reference.package_id])
+            elif kind == BUILDS:
+                remover.remove_builds(conan_ref, [reference.package_id])
+            else:
+                remover.remove_src(conan_ref)
+        except ConanException as e:
+            self._out.warn(str(e))
+            return False
+        finally:
+            writer.release()
+        self._out.info("Removed %s" % description)
+        if kind == PACKAGES:
+            self._client_cache.update_catalog([conan_ref])
+        return True
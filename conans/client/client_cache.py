@@ -6,14 +6,23 @@ from conans.model.values import Values
 from conans.client.detect import detect_defaults_settings
 from conans.model.ref import ConanFileReference
 from conans.model.manifest import FileTreeManifest
-from conans.paths import SimplePaths, CONANINFO
+from conans.paths import SimplePaths, CONANINFO, SRC_FOLDER
 from genericpath import isdir
 from conans.model.info import ConanInfo
+from conans.client.store.checksum_cache import ChecksumCache
+from conans.client.store.catalog import CacheCatalog
+from conans.client.store.access_log import AccessLog
+from conans.util.locks import ReadWriteLocks
+from conans.util.log import logger
 
 
 CONAN_CONF = 'conan.conf'
 CONAN_SETTINGS = "settings.yml"
 LOCALDB = ".conan.db"
+CHECKSUMS_DB = ".checksums.db"
+CATALOG_DB = ".catalog.db"
+ACCESS_DB = ".access.db"
+LOCKS_FOLDER = ".conan_locks"
 REGISTRY = "registry.txt"
 PROFILES_FOLDER = "profiles"
 
@@ -28,6 +37,9 @@ class ClientCache(SimplePaths):
         self._conan_config = None
         self._settings = None
         self._output = output
+        self._checksum_cache = None
+        self._catalog = None
+        self._access_log = None
         self._store_folder = store_folder or self.conan_config.storage_path or self.conan_folder
         super(ClientCache, self).__init__(self._store_folder)
 
@@ -55,6 +67,104 @@ class ClientCache(SimplePaths):
     def localdb(self):
         return os.path.join(self.conan_folder, LOCALDB)
 
+    @property
+    def checksum_cache(self):
+        """ The stored checksums of the files of the local cache, so the unchanged ones are not
+        read again to check the manifests. None if it cannot be opened
+        """
+        if self._checksum_cache is None:
+            try:
+                self._checksum_cache = ChecksumCache(os.path.join(self.conan_folder,
+                                                                  CHECKSUMS_DB))
+            except Exception as e:
+                logger.warn("Could not open the checksums cache: %s" % str(e))
+                return None
+        return self._checksum_cache
+
+    def reset_after_fork(self):
+        """ To be called in a forked process, the database connections of the parent can't be
+        used in it, new ones are opened when needed
+        """
+        self._checksum_cache = None
+        self._catalog = None
+        self._access_log = None
+
+    @property
+    def catalog_path(self):
+        return os.path.join(self.store, CATALOG_DB)
+
+    @property
+    def catalog(self):
+        """ The index of the recipes and packages of the store, None if disabled
+        """
+        if not self.conan_config.search_index:
+            return None
+        if self._catalog is None:
+            self._catalog = CacheCatalog(self.catalog_path, self)
+        return self._catalog
+
+    def update_catalog(self, conan_refs):
+        """ To be called after adding, modifying or removing recipes or packages of the store
+        """
+        if self.conan_config.search_index:
+            self.catalog.update(conan_refs)
+        elif os.path.exists(self.catalog_path):
+            # Not maintained while disabled, it would be outdated when enabled again
+            os.remove(self.catalog_path)
+
+    @property
+    def access_log(self):
+        """ The last access times of the package, build and source folders, None if it cannot
+        be opened
+        """
+        if self._access_log is None:
+            try:
+                self._access_log = AccessLog(os.path.join(self.store, ACCESS_DB))
+            except Exception as e:
+                logger.warn("Could not open the access log: %s" % str(e))
+                return None
+        return self._access_log
+
+    def record_access(self, accesses):
+        """ param accesses: [(kind, reference)] of the folders used, see store.access_log
+        """
+        access_log = self.access_log
+        if access_log is not None:
+            access_log.touch(accesses)
+
+    @property
+    def locks_folder(self):
+        return os.path.join(self.store, LOCKS_FOLDER)
+
+    @property
+    def locks(self):
+        """ The inter-process readers/writer locks of the references, by their str()
+        """
+        return ReadWriteLocks(self.locks_folder)
+
+    def using(self, references):
+        """ Read locks the given recipe or package references while the block runs, so other
+        processes don't modify or remove their folders meanwhile
+        """
+        return self.locks.read(str(reference) for reference in references)
+
+    def writing(self, reference, output=None):
+        """ Write locks the given recipe or package reference while the block runs, waiting for
+        the other processes reading or writing it
+        """
+        return self.locks.write(str(reference), waiting=_waiting_message(reference, output))
+
+    def writing_source(self, conan_reference, output=None):
+        """ Write locks the sources of a recipe, the exported ones and the source folder, while
+        the block runs. They are created while the recipe is being read, by any of its builds
+        """
+        return self.locks.write("%s %s" % (str(conan_reference), SRC_FOLDER),
+                                waiting=_waiting_message(conan_reference, output))
+
+    @property
+    def metadata_cache_path(self):
+        return os.path.join(self.conan_folder, "metadata")
+
     @property
     def conan_conf_path(self):
         return os.path.join(self.conan_folder, CONAN_CONF)
@@ -134,7 +244,8 @@ class ClientCache(SimplePaths):
 
     def _digests(self, digest_path):
         readed_digest = FileTreeManifest.loads(load(digest_path))
-        expected_digest = FileTreeManifest.create(os.path.dirname(digest_path))
+        expected_digest = FileTreeManifest.create(os.path.dirname(digest_path),
+                                                  checksum_cache=self.checksum_cache)
         return readed_digest, expected_digest
 
     def delete_empty_dirs(self, deleted_refs):
@@ -152,3 +263,9 @@ class ClientCache(SimplePaths):
         if not os.path.exists(self.profiles_path):
             mkdir(self.profiles_path)
         return os.path.join(self.profiles_path, name)
+
+
+def _waiting_message(reference, output):
+    if output is None:
+        return None
+    return lambda: output.info("Waiting for other process using %s" % str(reference))
@@ -27,6 +27,8 @@ from conans.model.scope import Scopes
 from conans.model.version import Version
 from conans.paths import CONANFILE, conan_expand_user
 from conans.search.search import DiskSearchManager, DiskSearchAdapter
+from conans.client.store.catalog import CatalogSearchManager
+from conans.client.store.access_log import PACKAGES, BUILDS, SOURCES
 from conans.util.log import logger
 from conans.util.env_reader import get_env
 from conans.util.files import rmdir, load, save_files, exception_message_safe
@@ -700,6 +702,31 @@ path to the CMake binary directory, like this:
                              build_ids=args.builds,
                              src=args.src, force=args.force, remote=args.remote)
 
+    def cache(self, *args):
+        """ Manages the local cache. The 'gc' subcommand removes the least recently used package,
+        build and source folders beyond the size quotas defined in conan.conf, skipping the
+        ones in use by other running commands.
+        """
+        parser = argparse.ArgumentParser(description=self.cache.__doc__, prog="conan cache")
+        subparsers = parser.add_subparsers(dest='subcommand', help='sub-command help')
+        parser_gc = subparsers.add_parser('gc', help='remove the least recently used folders '
+                                          'beyond the size quotas')
+        parser_gc.add_argument('--packages-quota', type=float,
+                               help='max size in MB of the package folders')
+        parser_gc.add_argument('--builds-quota', type=float,
+                               help='max size in MB of the build folders')
+        parser_gc.add_argument('--sources-quota', type=float,
+                               help='max size in MB of the source folders')
+        parser_gc.add_argument('--dry-run', default=False, action='store_true',
+                               help='print what would be removed, without removing it')
+        args = parser.parse_args(*args)
+        log_command("cache", vars(args))
+
+        if args.subcommand == "gc":
+            quotas = {PACKAGES: args.packages_quota, BUILDS: args.builds_quota,
+                      SOURCES: args.sources_quota}
+            self._manager.collect_garbage(quotas, dry_run=args.dry_run)
+
     def copy(self, *args):
         """ Copy conan recipes and packages to another user/channel.
         Useful to promote packages (e.g. from "beta" to "stable").
@@ -775,9 +802,17 @@ path to the CMake binary directory, like this:
                                                                 'has to be a package recipe '
                                                                 'reference: MyPackage/1.2'
                                                                 '@user/channel')
+        parser.add_argument('--rebuild-index', default=False, action='store_true',
+                            help='Build again the index of the local cache from its contents. '
+                                 'Only if "search_index" is enabled in conan.conf')
         args = parser.parse_args(*args)
         log_command("search", vars(args))
 
+        if args.rebuild_index:
+            self._manager.rebuild_search_index()
+            if not args.pattern:
+                return
+
         reference = None
         if args.pattern:
             try:
@@ -1002,7 +1037,12 @@ def get_command():
                                                             Version(MIN_SERVER_COMPATIBLE_VERSION),
                                                             out)
         # To handle remote connections
-        rest_api_client = RestApiClient(out, requester=version_checker_requester)
+        conan_config = client_cache.conan_config
+        rest_api_client = RestApiClient(out, requester=version_checker_requester,
+                                        parallel_transfers=conan_config.parallel_transfers,
+                                        stream_extract=conan_config.stream_extract,
+                                        download_retry=conan_config.download_retry,
+                                        checksum_cache=client_cache.checksum_cache)
         # To store user and token
         localdb = LocalDB(client_cache.localdb)
         # Wraps RestApiClient to add authentication support (same interface)
@@ -1033,8 +1073,11 @@ def get_command():
     remote_manager = instance_remote_manager(client_cache)
 
     # Get a search manager
-    search_adapter = DiskSearchAdapter()
-    search_manager = DiskSearchManager(client_cache, search_adapter)
+    if client_cache.conan_config.search_index:
+        search_manager = CatalogSearchManager(client_cache, client_cache.catalog)
+    else:
+        search_adapter = DiskSearchAdapter()
+        search_manager = DiskSearchManager(client_cache, search_adapter)
 
     command = Command(client_cache, user_io, get_conan_runner(), remote_manager, search_manager)
     return command
@@ -3,6 +3,8 @@ from conans.errors import ConanException
 import logging
 from conans.util.env_reader import get_env
 from conans.util.files import save, load
+from conans.util.staging import COPY, HARDLINK, SYMLINK, STAGING_MODES
+from conans.client.store.access_log import FOLDER_KINDS
 from six.moves.configparser import ConfigParser, NoSectionError
 from conans.model.values import Values
 import urllib
@@ -49,6 +51,52 @@ path: ~/.conan/data
 # http: http://10.10.1.10:3128
 # https: http://10.10.1.10:1080
 
+[general]
+# Number of files of a recipe or package transferred concurrently (1 = sequential)
+# parallel_transfers: 1
+# Number of binary packages of the dependency graph retrieved concurrently (1 = sequential)
+# parallel_downloads: 1
+# Ask all the remotes at the same time for a missing recipe, the registry order still decides
+# parallel_remotes: False
+# Number of recipes and packages uploaded concurrently by "upload --all" (1 = sequential)
+# parallel_uploads: 1
+# Number of packages built from sources concurrently, each one in its own process, as soon as
+# its dependencies are installed. Builds run sequentially where processes cannot be forked
+# parallel_builds: 1
+# Extract conan_package.tgz while it is being downloaded, without storing it
+# stream_extract: False
+# Attempts to download a file, an interrupted download is resumed where it stopped
+# download_retry: 2
+# Machine wide cache of downloaded archives, shared by all the conan user homes
+# blob_cache_path: /var/cache/conan/blobs
+# Max size of the blob cache in MB, the least recently used archives are removed
+# blob_cache_size: 4096
+# Seconds that the remote manifests and package infos are reused without asking the remote
+# again, after that they are revalidated with conditional requests (0 = disabled)
+# remote_metadata_ttl: 0
+# Answer the local searches from an index of the cache, instead of reading all its folders.
+# If it ever gets out of sync, rebuild it with "conan search --rebuild-index"
+# search_index: False
+# How the build folders are created from the source ones: copy, reflink (copy-on-write clones,
+# btrfs/xfs), hardlink or symlink. Copies if not supported. The linked files written by conan
+# tools are copied first, but builds that modify their sources with other tools (configure,
+# patch, sed) change the shared source folder, which is then created again for the next build.
+# The source folders are created from the exported files with copy or reflink, never linked
+# build_staging: copy
+# How imports() brings the files from the local cache: copy, hardlink or symlink. Linked files
+# must not be modified, that would change the package in the cache. Copies if not supported
+# imports_mode: copy
+# Keep the build folder of the packages built again with the same package_id, updating only the
+# changed sources, so the build system can compile incrementally
+# incremental_builds: False
+# Max size in MB of the package, build and source folders of the local cache. "conan cache gc"
+# removes the least recently used ones beyond it, skipping those in use (0 = no quota)
+# cache_packages_quota: 0
+# cache_builds_quota: 0
+# cache_sources_quota: 0
+# Run the "conan cache gc" garbage collection after every install
+# cache_gc_after_install: False
+
 [settings_defaults]
 '''
 
@@ -99,6 +147,146 @@ class ConanClientConfigParser(ConfigParser):
         except:
             return None
 
+    def _get_optional(self, section, varname, env_var, default):
+        """ optional field, might not exist. The environment variable, if defined, has
+        priority over the config file value. The type is inferred from the default value
+        """
+        try:
+            value = dict(self.items(section)).get(varname)
+        except NoSectionError:
+            value = None
+        value = os.getenv(env_var, value)
+        if value is None:
+            return default
+        try:
+            if isinstance(default, bool):
+                return value.strip().lower() in ("1", "true", "yes", "on")
+            return type(default)(value)
+        except ValueError:
+            raise ConanException("Invalid value '%s' for '%s' in [%s] section of conan.conf"
+                                 % (value, varname, section))
+
+    @property
+    def parallel_transfers(self):
+        """ Number of concurrent file transfers when downloading or uploading the files
+        of a recipe or a package
+        """
+        return max(1, self._get_optional("general", "parallel_transfers",
+                                         "CONAN_PARALLEL_TRANSFERS", 1))
+
+    @property
+    def parallel_downloads(self):
+        """ Number of binary packages of the dependency graph retrieved concurrently
+        by the installer
+        """
+        return max(1, self._get_optional("general", "parallel_downloads",
+                                         "CONAN_PARALLEL_DOWNLOADS", 1))
+
+    @property
+    def parallel_uploads(self):
+        """ Number of recipes and packages uploaded concurrently
+        """
+        return max(1, self._get_optional("general", "parallel_uploads",
+                                         "CONAN_PARALLEL_UPLOADS", 1))
+
+    @property
+    def parallel_builds(self):
+        """ Number of packages built concurrently by the installer
+        """
+        return max(1, self._get_optional("general", "parallel_builds",
+                                         "CONAN_PARALLEL_BUILDS", 1))
+
+    @property
+    def parallel_remotes(self):
+        """ Look for the recipes in all the remotes concurrently, instead of one by one
+        """
+        return self._get_optional("general", "parallel_remotes", "CONAN_PARALLEL_REMOTES", False)
+
+    @property
+    def stream_extract(self):
+        """ Extract the downloaded package tgz on the fly, instead of saving it to disk
+        and extracting it afterwards
+        """
+        return self._get_optional("general", "stream_extract", "CONAN_STREAM_EXTRACT", False)
+
+    @property
+    def download_retry(self):
+        """ Number of attempts to download a file. The retries of interrupted transfers
+        resume from the bytes already received
+        """
+        return max(1, self._get_optional("general", "download_retry", "CONAN_DOWNLOAD_RETRY", 2))
+
+    @property
+    def blob_cache_path(self):
+        """ Folder of the content-addressed cache of downloaded archives, None if disabled.
+        Not relative to CONAN_USER_HOME, it is meant to be shared by several of them
+        """
+        path = self._get_optional("general", "blob_cache_path", "CONAN_BLOB_CACHE_PATH", "")
+        return os.path.abspath(os.path.expanduser(path)) if path.strip() else None
+
+    @property
+    def blob_cache_size(self):
+        """ Max size in MB of the blob cache
+        """
+        return self._get_optional("general", "blob_cache_size", "CONAN_BLOB_CACHE_SIZE", 4096)
+
+    @property
+    def remote_metadata_ttl(self):
+        """ Seconds the remote metadata is cached without revalidating it, 0 if disabled
+        """
+        return max(0, self._get_optional("general", "remote_metadata_ttl",
+                                         "CONAN_REMOTE_METADATA_TTL", 0))
+
+    @property
+    def search_index(self):
+        """ Use the catalog of the local cache for the local searches
+        """
+        return self._get_optional("general", "search_index", "CONAN_SEARCH_INDEX", False)
+
+    @property
+    def build_staging(self):
+        """ Mode of creating the source and build folders, one of staging.STAGING_MODES
+        """
+        mode = self._get_optional("general", "build_staging", "CONAN_BUILD_STAGING", COPY)
+        mode = mode.strip().lower()
+        if mode not in STAGING_MODES:
+            raise ConanException("Invalid build_staging '%s' in conan.conf, possible values: %s"
+                                 % (mode, ", ".join(STAGING_MODES)))
+        return mode
+
+    @property
+    def imports_mode(self):
+        """ copy, hardlink or symlink the files imported from the local cache
+        """
+        mode = self._get_optional("general", "imports_mode", "CONAN_IMPORTS_MODE", COPY)
+        mode = mode.strip().lower()
+        if mode not in (COPY, HARDLINK, SYMLINK):
+            raise ConanException("Invalid imports_mode '%s' in conan.conf, possible values: %s"
+                                 % (mode, ", ".join((COPY, HARDLINK, SYMLINK))))
+        return mode
+
+    @property
+    def incremental_builds(self):
+        """ keep the build folders, and sync only the changed sources, when rebuilding
+        """
+        return self._get_optional("general", "incremental_builds", "CONAN_INCREMENTAL_BUILDS",
+                                  False)
+
+    @property
+    def cache_quotas(self):
+        """ {kind of folder: max size in MB} of the local cache, 0 for no quota
+        """
+        return {kind: max(0, self._get_optional("general", "cache_%s_quota" % kind,
+                                                "CONAN_CACHE_%s_QUOTA" % kind.upper(), 0.0))
+                for kind in FOLDER_KINDS}
+
+    @property
+    def cache_gc_after_install(self):
+        """ run the garbage collection of the local cache after the installs
+        """
+        return self._get_optional("general", "cache_gc_after_install",
+                                  "CONAN_CACHE_GC_AFTER_INSTALL", False)
+
     def settings_defaults(self, settings):
         default_settings = self.get_conf("settings_defaults")
         values = Values.from_list(default_settings)
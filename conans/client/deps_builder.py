@@ -55,14 +55,19 @@ class DepsGraph(object):
         self.nodes = set()
         self._neighbors = defaultdict(set)
         self._inverse_neighbors = defaultdict(set)
+        self._levels = None  # Cached by_levels() and inverse_levels(), till the graph changes
+        self._inverse_levels = None
+        self._closures = None  # Cached _compute_closures(), till the graph changes
 
     def add_node(self, node):
         self.nodes.add(node)
+        self._levels = self._inverse_levels = self._closures = None
 
     def add_edge(self, src, dst):
         assert src in self.nodes and dst in self.nodes
         self._neighbors[src].add(dst)
         self._inverse_neighbors[dst].add(src)
+        self._levels = self._inverse_levels = self._closures = None
 
     def neighbors(self, node):
         """ return all connected nodes (directionally) to the parameter one
@@ -77,12 +82,15 @@ class DepsGraph(object):
     def public_neighbors(self, node):
         """ return nodes with direct reacheability by public dependencies
         """
-        neighbors = self._neighbors[node]
+        return list(self._get_closures().public_neighbors[node])
+
+    def _public_neighbors(self, node):
+        neighbors = self._neighbors.get(node, ())
         _, conanfile = node
 
-        public_requires = [r.conan_reference for r in conanfile.requires.values() if not r.private]
-        result = [n for n in neighbors if n.conan_ref in public_requires]
-        return result
+        public_requires = set(r.conan_reference for r in conanfile.requires.values()
+                              if not r.private)
+        return frozenset(n for n in neighbors if n.conan_ref in public_requires)
 
     def propagate_info(self):
         """ takes the exports from upper level and updates the imports
@@ -128,36 +136,29 @@ class DepsGraph(object):
                     conanfile.conan_info()
                 else:
                     conanfile.package_id()
+        # The requirements now point to the resolved references, that decide the public ones
+        self._closures = None
         return ordered
 
-    def ordered_closure(self, node, flat):
-        closure = set()
-        current = self._neighbors[node]
-        while current:
-            new_current = set()
-            for n in current:
-                closure.add(n)
-                new_neighs = self.public_neighbors(n)
-                to_add = set(new_neighs).difference(current)
-                new_current.update(to_add)
-            current = new_current
-
-        result = [n for n in flat if n in closure]
-        return result
+    def ordered_closure(self, node):
+        """ return the direct dependencies of the node, and the public dependencies of them,
+        transitively, in inverse levels order (the most dependent ones first)
+        """
+        closures = self._get_closures()
+        return closures.nodes(closures.closure[node])
 
     def _inverse_closure(self, references):
-        closure = set()
-        current = [n for n in self.nodes if str(n.conan_ref) in references or "ALL" in references]
-        closure.update(current)
-        while current:
-            new_current = set()
-            for n in current:
-                closure.add(n)
-                new_neighs = self._inverse_neighbors[n]
-                to_add = set(new_neighs).difference(current)
-                new_current.update(to_add)
-            current = new_current
-        return closure
+        closures = self._get_closures()
+        bits = 0
+        for n in self.nodes:
+            if str(n.conan_ref) in references or "ALL" in references:
+                bits |= closures.inverse_closure[n]
+        return set(closures.nodes(bits))
+
+    def _get_closures(self):
+        if self._closures is None:
+            self._closures = _Closures(self)
+        return self._closures
 
     def build_order(self, references):
         levels = self.inverse_levels()
@@ -170,35 +171,42 @@ class DepsGraph(object):
         return result
 
     def by_levels(self):
-        return self._order_levels(self._neighbors)
+        if self._levels is None:
+            self._levels = self._order_levels(self._neighbors, self._inverse_neighbors)
+        return [list(level) for level in self._levels]
 
     def inverse_levels(self):
-        return self._order_levels(self._inverse_neighbors)
+        if self._inverse_levels is None:
+            self._inverse_levels = self._order_levels(self._inverse_neighbors, self._neighbors)
+        return [list(level) for level in self._inverse_levels]
 
-    def _order_levels(self, neighbours):
+    def _order_levels(self, neighbours, inverse_neighbours):
         """ order by node degree. The first level will be the one which nodes dont have
         dependencies. Second level will be with nodes that only have dependencies to
         first level nodes, and so on
+        Kahn's algorithm, each edge is visited once: a node goes to the next level when the
+        last of its neighbours is leveled
         return [[node1, node34], [node3], [node23, node8],...]
         """
-        current_level = []
-        result = [current_level]
-        opened = self.nodes.copy()
-        while opened:
-            current = opened.copy()
-            for o in opened:
-                o_neighs = neighbours[o]
-                if not any(n in opened for n in o_neighs):
-                    current_level.append(o)
-                    current.discard(o)
+        pending = {node: len(neighbours.get(node, ())) for node in self.nodes}
+        current_level = [node for node, count in pending.items() if count == 0]
+        result = []
+        leveled = 0
+        while current_level:
             current_level.sort()
-            # now initialize new level
-            opened = current
-            if opened:
-                current_level = []
-                result.append(current_level)
-
-        return result
+            result.append(current_level)
+            leveled += len(current_level)
+            next_level = []
+            for node in current_level:
+                for inverse_neighbour in inverse_neighbours.get(node, ()):
+                    pending[inverse_neighbour] -= 1
+                    if pending[inverse_neighbour] == 0:
+                        next_level.append(inverse_neighbour)
+            current_level = next_level
+
+        if leveled != len(self.nodes):
+            raise ConanException("Loop detected in the dependency graph")
+        return result or [[]]
 
     def private_nodes(self, built_private_nodes):
         """ computes a list of nodes living in the private zone of the deps graph,
@@ -212,7 +220,7 @@ class DepsGraph(object):
             new_open_nodes = set()
             for node in open_nodes:
                 if node in built_private_nodes:
-                    neighbors = self.public_neighbors(node)
+                    neighbors = self._get_closures().public_neighbors[node]
                 else:
                     neighbors = self._neighbors[node]
                 new_open_nodes.update(set(neighbors).difference(closure))
@@ -248,6 +256,54 @@ class DepsGraph(object):
         return result
 
 
+class _Closures(object):
+    """ The transitive closures of all the nodes of a DepsGraph, computed at once bottom-up,
+    each one from the closures of its neighbours. They are bitsets (python ints) of the node
+    ordinals, that are the positions of the nodes in the inverse levels order
+    """
+
+    def __init__(self, deps_graph):
+        self._ordered = [node for level in deps_graph.inverse_levels() for node in level]
+        ordinals = {node: i for i, node in enumerate(self._ordered)}
+        self.public_neighbors = {}  # {node: frozenset(nodes required publicly)}
+        # {node: bitset of the direct dependencies and of their public ones, transitively}
+        self.closure = {}
+        # {node: bitset of the node and the ones depending on it, directly or not}
+        self.inverse_closure = {}
+
+        public_closure = {}  # {node: bitset of its public dependencies, transitively}
+        for level in deps_graph.by_levels():
+            for node in level:
+                public_neighbors = deps_graph._public_neighbors(node)
+                self.public_neighbors[node] = public_neighbors
+                closure = 0
+                public = 0
+                for neighbor in deps_graph._neighbors.get(node, ()):
+                    bits = (1 << ordinals[neighbor]) | public_closure[neighbor]
+                    closure |= bits
+                    if neighbor in public_neighbors:
+                        public |= bits
+                self.closure[node] = closure
+                public_closure[node] = public
+
+        for node in self._ordered:
+            bits = 1 << ordinals[node]
+            for inverse_neighbor in deps_graph._inverse_neighbors.get(node, ()):
+                bits |= self.inverse_closure[inverse_neighbor]
+            self.inverse_closure[node] = bits
+
+    def nodes(self, bits):
+        """ the nodes of a bitset, in ordinal order
+        """
+        binary = bin(bits)[:1:-1]  # From the lowest ordinal
+        result = []
+        index = binary.find("1")
+        while index != -1:
+            result.append(self._ordered[index])
+            index = binary.find("1", index + 1)
+        return result
+
+
 class DepsGraphBuilder(object):
     """ Responsible for computing the dependencies graph DepsGraph
     """
@@ -77,13 +77,15 @@ def _export(conanfile, origin_folder, destination_folder, output):
 
     copier = FileCopier(origin_folder, destination_folder)
     for pattern in exports:
-        copier(pattern, links=True)
+        copier.add(pattern, links=True)
+    copier.execute()
     # create directory for sources, and import them
     export_sources_dir = os.path.join(destination_folder, EXPORT_SOURCES_DIR)
     mkdir(export_sources_dir)
     copier = FileCopier(origin_folder, export_sources_dir)
     for pattern in exports_sources:
-        copier(pattern, links=True)
+        copier.add(pattern, links=True)
+    copier.execute()
     package_output = ScopedOutput("%s export" % output.scope, output)
     copier.report(package_output)
 
@@ -1,7 +1,15 @@
 import os
+import re
+import time
 import fnmatch
-import shutil
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from multiprocessing import cpu_count
+from conans.util.log import logger
+from conans.util.parallel import run_in_threads
+from conans.util.staging import FileStager, COPY
+
+
+_COPY_WORKERS = min(8, cpu_count())
 
 
 def report_copied_files(copied, output, warn=False):
@@ -18,13 +26,106 @@ def report_copied_files(copied, output, warn=False):
         output.warn("No files copied!")
 
 
+class _CopiedFiles(list):
+    """ The list of files copied by a pending copy, that does all the pending copies of its
+    FileCopier when read, so the copies can be done together, but the result is always right
+    """
+
+    def __init__(self, file_copier):
+        super(_CopiedFiles, self).__init__()
+        self._file_copier = file_copier
+
+    def _execute(self):
+        self._file_copier.execute()
+
+    def __iter__(self):
+        self._execute()
+        return super(_CopiedFiles, self).__iter__()
+
+    def __len__(self):
+        self._execute()
+        return super(_CopiedFiles, self).__len__()
+
+    def __getitem__(self, index):
+        self._execute()
+        return super(_CopiedFiles, self).__getitem__(index)
+
+    def __contains__(self, item):
+        self._execute()
+        return super(_CopiedFiles, self).__contains__(item)
+
+    def __eq__(self, other):
+        self._execute()
+        return super(_CopiedFiles, self).__eq__(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        self._execute()
+        return super(_CopiedFiles, self).__repr__()
+
+    __hash__ = None
+
+
+def _walk_files(src):
+    """ return the relative names of the files of the src folder tree
+    """
+    result = []
+    for root, subfolders, files in os.walk(src, followlinks=True):
+        basename = os.path.basename(root)
+        # Skip git or svn subfolders
+        if basename in [".git", ".svn"]:
+            subfolders[:] = []
+            continue
+        if basename == "test_package":  # DO NOT export test_package/build folder
+            try:
+                subfolders.remove("build")
+            except:
+                pass
+        relative_path = os.path.relpath(root, src)
+        result.extend(os.path.normpath(os.path.join(relative_path, f)) for f in files)
+    return result
+
+
+class _CopyRequest(object):
+    """ The arguments of a FileCopier call, and the list of the files it copied
+    """
+
+    def __init__(self, pattern, src, dst, keep_path, links, copied_files):
+        self.pattern = pattern
+        self.matcher = re.compile(fnmatch.translate(os.path.normcase(pattern)))
+        self.src = src
+        self.dst = dst
+        self.keep_path = keep_path
+        self.links = links
+        self.copied_files = copied_files
+        self.to_copy = []  # [(abs src name, abs dst name, links)]
+
+
+def _copy_file(abs_src_name, abs_dst_name, links, stage_file):
+    if os.path.islink(abs_dst_name) or os.path.isfile(abs_dst_name):
+        if stage_file.is_staged(abs_src_name, abs_dst_name):
+            return
+        # Never write through an existing link, it could be pointing to the origin
+        os.remove(abs_dst_name)
+    if links and os.path.islink(abs_src_name):
+        os.symlink(os.readlink(abs_src_name), abs_dst_name)
+    else:
+        stage_file(abs_src_name, abs_dst_name)
+
+
 class FileCopier(object):
     """ main responsible of copying files from place to place:
     package: build folder -> package folder
     imports: package folder -> user folder
     export: user folder -> store "export" folder
+
+    Several copies can be requested with add() and done with execute(): the source folder of
+    the copies is walked once for all of them, and every file matched against all their
+    patterns at once
     """
-    def __init__(self, root_source_folder, root_destination_folder):
+    def __init__(self, root_source_folder, root_destination_folder, mode=COPY):
         """
         Takes the base folders to copy resources src -> dst. These folders names
         will not be used in the relative names while copying
@@ -32,17 +133,21 @@ class FileCopier(object):
                                   store build folder
         param root_destination_folder: The base folder to copy things to, typicall the
                                        store package folder
+        param mode: one of staging.STAGING_MODES, the files can be linked instead of copied
         """
         self._base_src = root_source_folder
         self._base_dst = root_destination_folder
+        self._stage_file = FileStager(mode)
         self._copied = []
+        self.sources = {}  # {copied file: its origin}
+        self._pending = []
 
     def report(self, output, warn=False):
+        self.execute()
         report_copied_files(self._copied, output, warn)
 
     def __call__(self, pattern, dst="", src="", keep_path=True, links=False, symlinks=None):
-        """ FileCopier is lazy, it just store requested copies, and execute them later
-        param pattern: an fnmatch file pattern of the files that should be copied. Eg. *.dll
+        """ param pattern: an fnmatch file pattern of the files that should be copied. Eg. *.dll
         param dst: the destination local folder, wrt to current conanfile dir, to which
                    the files will be copied. Eg: "bin"
         param src: the source folder in which those files will be searched. This folder
@@ -53,49 +158,84 @@ class FileCopier(object):
                          lib dir
         return: list of copied files
         """
+        copied_files = self.add(pattern, dst, src, keep_path, links, symlinks)
+        self.execute()
+        return copied_files
+
+    def add(self, pattern, dst="", src="", keep_path=True, links=False, symlinks=None):
+        """ Same as calling the FileCopier, but the copy is not done until execute(). All the
+        pending copies are done with a single walk of the source tree
+        return: list of copied files, filled by execute()
+        """
         if symlinks is not None:
             links = symlinks
         # Check for ../ patterns and allow them
-        reldir = os.path.abspath(os.path.join(self._base_src, pattern))
-        if self._base_src.startswith(os.path.dirname(reldir)):  # ../ relative dir
-            self._base_src = os.path.dirname(reldir)
+        base_src = self._base_src
+        reldir = os.path.abspath(os.path.join(base_src, pattern))
+        if base_src.startswith(os.path.dirname(reldir)):  # ../ relative dir
+            base_src = os.path.dirname(reldir)
             pattern = os.path.basename(reldir)
 
-        copied_files = []
-        src = os.path.join(self._base_src, src)
+        src = os.path.normpath(os.path.join(base_src, src))
         dst = os.path.join(self._base_dst, dst)
-        for root, subfolders, files in os.walk(src, followlinks=True):
-            basename = os.path.basename(root)
-            # Skip git or svn subfolders
-            if basename in [".git", ".svn"]:
-                subfolders[:] = []
+        request = _CopyRequest(pattern, src, dst, keep_path, links, _CopiedFiles(self))
+        self._pending.append(request)
+        return request.copied_files
+
+    def execute(self):
+        """ Does the pending copies, in the requested order and several files at a time
+        """
+        pending, self._pending = self._pending, []
+        by_src = OrderedDict()
+        for request in pending:
+            by_src.setdefault(request.src, []).append(request)
+        for src, requests in by_src.items():
+            self._match(src, requests)
+        for request in pending:
+            self._copy(request)
+
+    @staticmethod
+    def _match(src, requests):
+        """ walks the src folder once, and fills the files to copy of the requests
+        """
+        t1 = time.time()
+        # A single regex discards the files not matching any pattern
+        matcher = re.compile("|".join("(?:%s)" % request.matcher.pattern
+                                      for request in requests))
+        files = 0
+        for relative_name in _walk_files(src):
+            files += 1
+            name = os.path.normcase(relative_name)
+            if not matcher.match(name):
                 continue
-            if basename == "test_package":  # DO NOT export test_package/build folder
-                try:
-                    subfolders.remove("build")
-                except:
-                    pass
-
-            relative_path = os.path.relpath(root, src)
-            for f in files:
-                relative_name = os.path.normpath(os.path.join(relative_path, f))
-                if fnmatch.fnmatch(relative_name, pattern):
-                    abs_src_name = os.path.join(root, f)
-                    filename = relative_name if keep_path else f
-                    abs_dst_name = os.path.normpath(os.path.join(dst, filename))
-                    try:
-                        os.makedirs(os.path.dirname(abs_dst_name))
-                    except:
-                        pass
-                    if links and os.path.islink(abs_src_name):
-                        linkto = os.readlink(abs_src_name)
-                        try:
-                            os.remove(abs_dst_name)
-                        except OSError:
-                            pass
-                        os.symlink(linkto, abs_dst_name)
-                    else:
-                        shutil.copy2(abs_src_name, abs_dst_name)
-                    copied_files.append(abs_dst_name)
-                    self._copied.append(relative_name)
-        return copied_files
+            for request in requests:
+                if request.matcher.match(name):
+                    abs_src_name = os.path.join(src, relative_name)
+                    filename = relative_name if request.keep_path else os.path.basename(
+                        relative_name)
+                    abs_dst_name = os.path.normpath(os.path.join(request.dst, filename))
+                    request.to_copy.append((abs_src_name, abs_dst_name, request.links,
+                                            relative_name))
+        logger.debug("Matched %d patterns in %s: %d files in %.3fs"
+                     % (len(requests), src, files, time.time() - t1))
+
+    def _copy(self, request):
+        t1 = time.time()
+        to_copy = request.to_copy
+        for folder in set(os.path.dirname(item[1]) for item in to_copy):
+            try:
+                os.makedirs(folder)
+            except:
+                pass
+        # Several of the requested files could be the same destination, the last one wins
+        workers = _COPY_WORKERS if len(to_copy) > 16 else 1
+        unique = list(OrderedDict((item[1], item) for item in to_copy).values())
+        copy = lambda item: _copy_file(item[0], item[1], item[2], self._stage_file)
+        for _, _, exc in run_in_threads(copy, unique, workers):
+            if exc is not None:
+                raise exc
+        list.extend(request.copied_files, [item[1] for item in to_copy])
+        self._copied.extend(item[3] for item in to_copy)
+        self.sources.update((item[1], item[0]) for item in unique)
+        logger.debug("Copied '%s' from %s: %d files in %.3fs"
+                     % (request.pattern, request.src, len(to_copy), time.time() - t1))
@@ -1,5 +1,6 @@
 import os
 import fnmatch
+from collections import OrderedDict
 
 from conans.client.file_copier import FileCopier, report_copied_files
 from conans.client.output import ScopedOutput
@@ -9,6 +10,8 @@ import calendar
 import time
 from conans.errors import ConanException
 from conans.tools import environment_append
+from conans.util.staging import COPY, HARDLINK, SYMLINK
+from six.moves.urllib.parse import quote
 
 
 IMPORTS_MANIFESTS = "conan_imports_manifest.txt"
@@ -28,7 +31,7 @@ def undo_imports(current_path, output):
 
     not_removed = 0
     for filepath, _ in manifest.file_sums.items():
-        if not os.path.exists(filepath):
+        if not os.path.lexists(filepath):  # The imported symlinks can be broken
             output.warn("File doesn't exist: %s" % filepath)
             continue
         try:
@@ -48,8 +51,23 @@ def undo_imports(current_path, output):
         raise ConanException("Cannot remove manifest file (open or busy): %s" % manifest_path)
 
 
-def run_imports(conanfile, current_path, output):
-    file_importer = FileImporter(conanfile, current_path)
+def _import_record(file_path, origin):
+    """ what is stored in the imports manifest for an imported file: its md5, or the origin
+    in the local cache of the linked ones, so they don't need to be read
+    """
+    if origin is not None:
+        if os.path.islink(file_path):
+            if os.readlink(file_path) == os.path.abspath(origin):
+                return "%s:%s" % (SYMLINK, quote(origin))
+        elif os.stat(file_path).st_nlink > 1 and os.path.samefile(file_path, origin):
+            return "%s:%s" % (HARDLINK, quote(origin))
+    return md5sum(file_path)
+
+
+def run_imports(conanfile, current_path, output, mode=COPY):
+    """ param mode: copy, or symlink/hardlink the files from the local cache
+    """
+    file_importer = FileImporter(conanfile, current_path, mode)
     conanfile.copy = file_importer
     # FIXME: The environment has to be properly defined even for "conan imports"
     with environment_append(conanfile.env or []):
@@ -62,7 +80,7 @@ def run_imports(conanfile, current_path, output):
         file_dict = {}
         for f in copied_files:
             abs_path = os.path.join(current_path, f)
-            file_dict[f] = md5sum(abs_path)
+            file_dict[f] = _import_record(abs_path, file_importer.sources.get(abs_path))
         manifest = FileTreeManifest(date, file_dict)
         save(os.path.join(current_path, IMPORTS_MANIFESTS), str(manifest))
     return copied_files
@@ -78,10 +96,12 @@ class FileImporter(object):
     It can be also used for Golang projects, in which the packages are always
     source based and need to be copied to the user folder to be built
     """
-    def __init__(self, conanfile, dst_folder):
+    def __init__(self, conanfile, dst_folder, mode=COPY):
         self._conanfile = conanfile
         self._dst_folder = dst_folder
+        self._mode = mode
         self._copies = []
+        self.sources = {}  # {imported file: its origin in the local cache}
 
     def __call__(self, pattern, dst="", src="", root_package=None):
         """ FileImporter is lazy, it just store requested copies, and execute them later
@@ -113,7 +133,8 @@ class FileImporter(object):
         """ Execute the stored requested copies, using a FileCopier as helper
         return: set of copied files
         """
-        copied_files = set()
+        file_copiers = OrderedDict()  # Every package folder is walked once for all the copies
+        requested = []
         for pattern, dst_folder, src_folder, conan_name_pattern in self._copies:
             if os.path.isabs(dst_folder):
                 real_dst_folder = dst_folder
@@ -122,7 +143,16 @@ class FileImporter(object):
 
             matching_paths = self._get_folders(conan_name_pattern)
             for matching_path in matching_paths:
-                file_copier = FileCopier(matching_path, real_dst_folder)
-                files = file_copier(pattern, src=src_folder, links=True)
-                copied_files.update(files)
+                file_copier = file_copiers.get(matching_path)
+                if file_copier is None:
+                    file_copier = FileCopier(matching_path, self._dst_folder, self._mode)
+                    file_copiers[matching_path] = file_copier
+                requested.append(file_copier.add(pattern, dst=real_dst_folder, src=src_folder,
+                                                 links=True))
+        copied_files = set()
+        for file_copier in file_copiers.values():
+            file_copier.execute()
+            self.sources.update(file_copier.sources)
+        for files in requested:
+            copied_files.update(files)
         return copied_files
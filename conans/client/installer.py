@@ -1,20 +1,28 @@
 import os
 import time
+import calendar
 import platform
 import fnmatch
-import shutil
+import threading
+from multiprocessing.pool import ThreadPool
 
-from conans.paths import CONANINFO, BUILD_INFO, CONANENV, RUN_LOG_NAME
-from conans.util.files import save, rmdir
+from conans.paths import CONANINFO, BUILD_INFO, CONANENV, RUN_LOG_NAME, SOURCES_MANIFEST, \
+    DIRTY_FILE
+from conans.util.files import save, rmdir, load
 from conans.model.ref import PackageReference
 from conans.util.log import logger
 from conans.errors import ConanException, format_conanfile_exception
 from conans.client.packager import create_package
+from conans.client.build_scheduler import BuildScheduler, fork_available
+from conans.client.deps_builder import Node
 from conans.client.generators import write_generators, TXTGenerator
 from conans.model.build_info import CppInfo
 from conans.client.output import ScopedOutput
 from conans.model.env_info import EnvInfo
 from conans.client.source import config_source
+from conans.util.staging import stage_tree, sync_tree, tree_checksums, HARDLINK, SYMLINK
+from conans.model.manifest import FileTreeManifest
+from conans.client.store.access_log import PACKAGES, BUILDS, SOURCES
 from conans.client.generators.env import ConanEnvGenerator
 from conans.tools import environment_append
 from conans.util.tracer import log_package_built
@@ -44,6 +52,7 @@ class ConanInstaller(object):
         self._client_cache = client_cache
         self._out = user_io.out
         self._remote_proxy = remote_proxy
+        self._lock = threading.RLock()  # The steps of the nodes not run in other processes
 
     def install(self, deps_graph, build_mode=False):
         """ given a DepsGraph object, build necessary nodes or retrieve them
@@ -55,12 +64,34 @@ class ConanInstaller(object):
         nodes_by_level = deps_graph.by_levels()
         logger.debug("Install-Process buildinfo %s" % (time.time() - t1))
         t1 = time.time()
+        self._prefetch_packages_info(nodes_by_level, build_mode)
+        logger.debug("Install-Process packages info %s" % (time.time() - t1))
+        t1 = time.time()
         skip_private_nodes = self._compute_private_nodes(deps_graph, build_mode)
         logger.debug("Install-Process private %s" % (time.time() - t1))
         t1 = time.time()
-        self._build(nodes_by_level, skip_private_nodes, build_mode)
+        self._accesses = []  # [(kind, reference)] of the used folders, for the cache GC
+        try:
+            self._build(nodes_by_level, skip_private_nodes, build_mode)
+        finally:
+            self._client_cache.record_access(self._accesses)
         logger.debug("Install-build %s" % (time.time() - t1))
 
+    def _prefetch_packages_info(self, nodes_by_level, build_mode):
+        """ asks the remotes for all the binaries of the graph at once, so checking their
+        availability in _compute_private_nodes and _get_nodes doesn't need a request per node
+        """
+        package_references = []
+        for level in nodes_by_level:
+            for conan_ref, conan_file in level:
+                if not conan_ref or conan_file.build_policy_always:
+                    continue
+                if self._build_forced(conan_ref, build_mode, conan_file):
+                    continue
+                package_reference = PackageReference(conan_ref, conan_file.info.package_id())
+                package_references.append((package_reference, conan_file.short_paths))
+        self._remote_proxy.prefetch_packages_info(package_references)
+
     def _compute_private_nodes(self, deps_graph, build_mode):
         """ computes a list of nodes that are not required to be built, as they are
         private requirements of already available shared libraries as binaries.
@@ -96,6 +127,7 @@ class ConanInstaller(object):
         """Called from info command when a build policy is used in build_order parameter"""
         # Get the nodes in order and if we have to build them
         nodes_by_level = deps_graph.by_levels()
+        self._prefetch_packages_info(nodes_by_level, build_mode)
         skip_private_nodes = self._compute_private_nodes(deps_graph, build_mode)
         nodes = self._get_nodes(nodes_by_level, skip_private_nodes, build_mode)
         return [(PackageReference(conan_ref, package_id), conan_file)
@@ -115,19 +147,126 @@ class ConanInstaller(object):
 
         """
 
-        inverse = self._deps_graph.inverse_levels()
-        flat = []
-
-        for level in inverse:
-            level = sorted(level, key=lambda x: x.conan_ref)
-            flat.extend(level)
-
         # Get the nodes in order and if we have to build them
         nodes_to_process = self._get_nodes(nodes_by_level, skip_private_nodes, build_mode)
 
-        for conan_ref, package_id, conan_file, build_needed in nodes_to_process:
+        # Binaries and recipe sources are retrieved in background, while the nodes are
+        # processed (built) in order anyway
+        pool, retrievals = self._prefetch(nodes_to_process)
+        try:
+            self._process_nodes(nodes_to_process, build_mode, retrievals)
+        except:
+            if pool:
+                pool.terminate()
+            raise
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+
+    def _prefetch(self, nodes_to_process):
+        """ Launches the retrieval of the binaries of the nodes that are not going to be
+        built, and of the recipe sources of the ones to build, in the order they are going to
+        be needed, using up to conan.conf "parallel_downloads" concurrent threads. If there is
+        anything to build, they are retrieved in background even if parallel_downloads is 1,
+        so the downloads of the next nodes overlap with the builds
+        return (pool, {package_reference or conan_reference: AsyncResult}), (None, {}) if
+        nothing is retrieved in background. The packages built in this install are not
+        retrieved, neither their repeated nodes (private requirements of other packages)
+        """
+        parallel_downloads = self._client_cache.conan_config.parallel_downloads
+        builds = any(build_needed for _, _, _, build_needed in nodes_to_process)
+        if parallel_downloads <= 1 and not builds:
+            return None, {}
 
+        to_retrieve = []
+        built = set()  # The repeated nodes of these are retrieved in order, once built
+        for conan_ref, package_id, conan_file, build_needed in nodes_to_process:
+            if not conan_ref:
+                continue
+            package_ref = PackageReference(conan_ref, package_id)
             if build_needed:
+                built.add(package_ref)
+                to_retrieve.append((conan_ref, self._remote_proxy.get_recipe_sources,
+                                    (conan_ref, )))
+            elif package_ref not in built:
+                to_retrieve.append((package_ref, self._retrieve_package,
+                                    (package_ref, conan_file)))
+        if not to_retrieve or (not builds and len(to_retrieve) == 1):
+            return None, {}
+
+        pool = ThreadPool(min(parallel_downloads, len(to_retrieve)))
+        retrievals = {}
+        for reference, function, args in to_retrieve:
+            if reference not in retrievals:
+                retrievals[reference] = pool.apply_async(function, args)
+        return pool, retrievals
+
+    def _process_nodes(self, nodes_to_process, build_mode, retrievals):
+        parallel_builds = self._client_cache.conan_config.parallel_builds
+        if parallel_builds > 1 and fork_available():
+            if len([node for node in nodes_to_process if node[3]]) > 1:
+                self._process_nodes_parallel(nodes_to_process, build_mode, retrievals,
+                                             parallel_builds)
+                return
+
+        for conan_ref, package_id, conan_file, build_needed in nodes_to_process:
+            self._process_node(conan_ref, package_id, conan_file, build_needed,
+                               build_mode, retrievals)
+
+    def _process_nodes_parallel(self, nodes_to_process, build_mode, retrievals,
+                                parallel_builds):
+        """ Builds every package as soon as its dependencies are installed, up to
+        parallel_builds at the same time, each one in a forked process
+        """
+        scheduler = BuildScheduler(self._out, self._client_cache, parallel_builds)
+        nodes = set(Node(conan_ref, conan_file)
+                    for conan_ref, _, conan_file, _ in nodes_to_process)
+        tasks = []
+        builders = {}  # {package_reference: node that builds it}
+        for conan_ref, package_id, conan_file, build_needed in nodes_to_process:
+            node = Node(conan_ref, conan_file)
+            dependencies = self._processed_dependencies(node, nodes)
+            if conan_ref:
+                package_ref = PackageReference(conan_ref, package_id)
+                if build_needed:
+                    builders[package_ref] = node
+                elif package_ref in builders:  # A repeated node, once built
+                    dependencies.add(builders[package_ref])
+
+            def process(conan_ref=conan_ref, package_id=package_id, conan_file=conan_file,
+                        build_needed=build_needed):
+                self._process_node(conan_ref, package_id, conan_file, build_needed,
+                                   build_mode, retrievals, scheduler.run_forked)
+            tasks.append((node, dependencies, process, build_needed))
+        scheduler.run(tasks)
+
+    def _processed_dependencies(self, node, processed):
+        """ the nodes in 'processed' that the given one depends on, directly or through
+        the ones not in it (the skipped private nodes)
+        """
+        result = set()
+        pending = list(self._deps_graph.neighbors(node))
+        visited = set()
+        while pending:
+            dependency = pending.pop()
+            if dependency in visited:
+                continue
+            visited.add(dependency)
+            if dependency in processed:
+                result.add(dependency)
+            else:
+                pending.extend(self._deps_graph.neighbors(dependency))
+        return result
+
+    def _process_node(self, conan_ref, package_id, conan_file, build_needed, build_mode,
+                      retrievals, run_build=None):
+        """ param run_build: optional function to run the build and package steps, given as a
+        callable. They run in other process while other nodes are processed, the rest of the
+        steps are done one node at a time
+        """
+        if build_needed:
+            with self._lock:
                 build_allowed = self._build_allowed(conan_ref, build_mode, conan_file)
                 if not build_allowed:
                     self._raise_package_not_found_error(conan_ref, conan_file)
@@ -142,38 +281,72 @@ class ConanInstaller(object):
 
                 t1 = time.time()
                 # Assign to node the propagated info
-                self._propagate_info(conan_ref, conan_file, flat)
-
-                self._remote_proxy.get_recipe_sources(conan_ref)
-                # Call the conanfile's build method
-                self._build_conanfile(conan_ref, conan_file, package_ref, package_folder, output)
-
-                # Call the conanfile's package method
-                self._package_conanfile(conan_ref, conan_file, package_ref, package_folder, output)
-
-                # Call the info method
-                self._package_info_conanfile(conan_ref, conan_file)
-
-                duration = time.time() - t1
-                log_file = os.path.join(self._client_cache.build(package_ref, conan_file.short_paths),
-                                        RUN_LOG_NAME)
-                log_file = log_file if os.path.exists(log_file) else None
-                log_package_built(package_ref, duration, log_file)
-            else:
+                self._propagate_info(conan_ref, conan_file)
+
+            existing = os.path.exists(package_folder)
+            with self._client_cache.writing(package_ref, output):
+                with self._lock:
+                    if (not existing and os.path.exists(package_folder) and
+                            not self._build_forced(conan_ref, build_mode, conan_file)):
+                        # Built or retrieved by other process while waiting for it
+                        output.info("Package %s installed by other process" % package_id)
+                        self._accesses.append((PACKAGES, package_ref))
+                        self._package_info_conanfile(conan_ref, conan_file)
+                        return
+
+                retrieval = retrievals.get(conan_ref)
+                if retrieval is not None:
+                    retrieval.get()
+                else:
+                    self._remote_proxy.get_recipe_sources(conan_ref)
+
+                with self._lock:
+                    self._accesses.extend([(PACKAGES, package_ref), (BUILDS, package_ref),
+                                           (SOURCES, conan_ref)])
+                    # FIXME: Is weak to assign here the recipe_hash
+                    conan_file.info.recipe_hash = self._client_cache.load_manifest(conan_ref).summary_hash
+
+                def build():
+                    # Call the conanfile's build method
+                    self._build_conanfile(conan_ref, conan_file, package_ref, package_folder,
+                                          output)
+
+                    # Call the conanfile's package method
+                    self._package_conanfile(conan_ref, conan_file, package_ref, package_folder,
+                                            output)
+                if run_build:
+                    run_build(build)
+                else:
+                    build()
+
+                with self._lock:
+                    self._remote_proxy.handle_package_manifest(package_ref, installed=True)
+                    # Call the info method
+                    self._package_info_conanfile(conan_ref, conan_file)
+
+            duration = time.time() - t1
+            log_file = os.path.join(self._client_cache.build(package_ref, conan_file.short_paths),
+                                    RUN_LOG_NAME)
+            log_file = log_file if os.path.exists(log_file) else None
+            log_package_built(package_ref, duration, log_file)
+        else:
+            with self._lock:
                 # Get the package, we have a not outdated remote package
                 if conan_ref:
-                    self._get_package(conan_ref, conan_file)
+                    package_ref = PackageReference(conan_ref, package_id)
+                    self._get_package(conan_ref, conan_file, retrievals.get(package_ref))
+                    self._accesses.append((PACKAGES, package_ref))
 
                 # Assign to the node the propagated info
                 # (conan_ref could be None if user project, but of course assign the info
-                self._propagate_info(conan_ref, conan_file, flat)
+                self._propagate_info(conan_ref, conan_file)
 
                 # Call the info method
                 self._package_info_conanfile(conan_ref, conan_file)
 
-    def _propagate_info(self, conan_ref, conan_file, flat):
+    def _propagate_info(self, conan_ref, conan_file):
         # Get deps_cpp_info from upstream nodes
-        node_order = self._deps_graph.ordered_closure((conan_ref, conan_file), flat)
+        node_order = self._deps_graph.ordered_closure((conan_ref, conan_file))
         public_deps = [name for name, req in conan_file.requires.items() if not req.private]
         conan_file.cpp_info.public_deps = public_deps
         for n in node_order:
@@ -218,27 +391,42 @@ class ConanInstaller(object):
 
         return nodes_to_build
 
-    def _get_package(self, conan_ref, conan_file):
-        '''Get remote package. It won't check if it's outdated'''
-        # Compute conan_file package from local (already compiled) or from remote
-        output = ScopedOutput(str(conan_ref), self._out)
+    def _get_package(self, conan_ref, conan_file, retrieval=None):
+        '''Get remote package. It won't check if it's outdated.
+        param retrieval: AsyncResult of an already launched _retrieve_package, if any
+        '''
         package_id = conan_file.info.package_id()
         package_reference = PackageReference(conan_ref, package_id)
 
-        conan_ref = package_reference.conan
+        if retrieval is not None:
+            installed = retrieval.get()
+        else:
+            installed = self._retrieve_package(package_reference, conan_file)
+        # The manifests are checked in order, they might ask the user
+        self._remote_proxy.handle_package_manifest(package_reference, installed)
+
+        if installed:
+            output = ScopedOutput(str(conan_ref), self._out)
+            self._handle_system_requirements(conan_ref, package_reference, conan_file, output)
+            return True
+
+        self._raise_package_not_found_error(conan_ref, conan_file)
+
+    def _retrieve_package(self, package_reference, conan_file):
+        '''Compute conan_file package from local (already compiled) or from remote.
+        Can be called concurrently for different packages
+        '''
+        output = ScopedOutput(str(package_reference.conan), self._out)
         package_folder = self._client_cache.package(package_reference, conan_file.short_paths)
 
         # If already exists do not dirt the output, the common situation
         # is that package is already installed and OK. If don't, the proxy
         # will print some other message about it
         if not os.path.exists(package_folder):
-            output.info("Installing package %s" % package_id)
+            output.info("Installing package %s" % package_reference.package_id)
 
-        if self._remote_proxy.get_package(package_reference, short_paths=conan_file.short_paths):
-            self._handle_system_requirements(conan_ref, package_reference, conan_file, output)
-            return True
-
-        self._raise_package_not_found_error(conan_ref, conan_file)
+        return self._remote_proxy.retrieve_package(package_reference,
+                                                   short_paths=conan_file.short_paths)
 
     def _build_conanfile(self, conan_ref, conan_file, package_reference, package_folder, output):
         """Calls the conanfile's build method"""
@@ -250,13 +438,12 @@ class ConanInstaller(object):
         self._handle_system_requirements(conan_ref, package_reference, conan_file, output)
 
         with environment_append(conan_file.env):
-            self._build_package(export_folder, src_folder, build_folder, package_folder, conan_file, output)
+            self._build_package(conan_ref, export_folder, src_folder, build_folder, package_folder,
+                                conan_file, output)
 
     def _package_conanfile(self, conan_ref, conan_file, package_reference, package_folder, output):
         """Generate the info txt files and calls the conanfile package method"""
 
-        # FIXME: Is weak to assign here the recipe_hash
-        conan_file.info.recipe_hash = self._client_cache.load_manifest(conan_ref).summary_hash
         build_folder = self._client_cache.build(package_reference, conan_file.short_paths)
 
         # Creating ***info.txt files
@@ -270,7 +457,6 @@ class ConanInstaller(object):
         os.chdir(build_folder)
         with environment_append(conan_file.env):
             create_package(conan_file, build_folder, package_folder, output)
-            self._remote_proxy.handle_package_manifest(package_reference, installed=True)
 
     def _raise_package_not_found_error(self, conan_ref, conan_file):
         settings_text = ", ".join(conan_file.info.full_settings.dumps().splitlines())
@@ -317,41 +503,82 @@ Package configuration:
             output.error("while executing system_requirements(): %s" % str(e))
             raise ConanException("Error in system requirements")
 
-    def _build_package(self, export_folder, src_folder, build_folder, package_folder, conan_file, output):
+    @staticmethod
+    def _previous_sources(build_folder):
+        """ the checksums of the sources staged in the build folder by the previous build, if it
+        can be reused by an incremental build: its sources were completely staged. None
+        otherwise. The build folder is already the one of the same package_id
+        """
+        sources_manifest = os.path.join(build_folder, SOURCES_MANIFEST)
+        if not os.path.exists(sources_manifest):
+            return None
+        try:
+            return FileTreeManifest.loads(load(sources_manifest)).file_sums
+        except Exception as e:
+            logger.debug("Build folder %s not reused: %s" % (build_folder, str(e)))
+            return None
+
+    def _build_package(self, conan_ref, export_folder, src_folder, build_folder, package_folder,
+                       conan_file, output):
         """ builds the package, creating the corresponding build folder if necessary
         and copying there the contents from the src folder. The code is duplicated
         in every build, as some configure processes actually change the source
         code
         """
 
+        incremental = self._client_cache.conan_config.incremental_builds
+        previous_sources = self._previous_sources(build_folder) if incremental else None
         try:
-            rmdir(build_folder)
+            if previous_sources is None:
+                rmdir(build_folder)
             rmdir(package_folder)
         except Exception as e:
             raise ConanException("%s\n\nCouldn't remove folder, might be busy or open\n"
                                  "Close any app using it, and retry" % str(e))
 
         output.info('Building your package in %s' % build_folder)
-        config_source(export_folder, src_folder, conan_file, output)
-        output.info('Copying sources to build folder')
-
-        def check_max_path_len(src, files):
-            if platform.system() != "Windows":
-                return []
-            filtered_files = []
-            for the_file in files:
-                source_path = os.path.join(src, the_file)
-                # Without storage path, just relative
-                rel_path = os.path.relpath(source_path, src_folder)
-                dest_path = os.path.normpath(os.path.join(build_folder, rel_path))
-                # it is NOT that "/" is counted as "\\" so it counts double
-                # seems a bug in python, overflows paths near the limit of 260,
-                if len(dest_path) >= 249:
-                    filtered_files.append(the_file)
-                    output.warn("Filename too long, file excluded: %s" % dest_path)
-            return filtered_files
-
-        shutil.copytree(src_folder, build_folder, symlinks=True, ignore=check_max_path_len)
+        staging = self._client_cache.conan_config.build_staging
+        # The source folder is shared by all the builds of the recipe, in any process
+        with self._client_cache.writing_source(conan_ref, output):
+            config_source(export_folder, src_folder, conan_file, output, staging=staging)
+            excluded = set()
+
+            def check_max_path_len(src, files):
+                if platform.system() != "Windows":
+                    return []
+                filtered_files = []
+                for the_file in files:
+                    source_path = os.path.join(src, the_file)
+                    # Without storage path, just relative
+                    rel_path = os.path.relpath(source_path, src_folder)
+                    dest_path = os.path.normpath(os.path.join(build_folder, rel_path))
+                    # it is NOT that "/" is counted as "\\" so it counts double
+                    # seems a bug in python, overflows paths near the limit of 260,
+                    if len(dest_path) >= 249:
+                        filtered_files.append(the_file)
+                        if dest_path not in excluded:
+                            excluded.add(dest_path)
+                            output.warn("Filename too long, file excluded: %s" % dest_path)
+                return filtered_files
+
+            sources_manifest = os.path.join(build_folder, SOURCES_MANIFEST)
+            linked = staging in (HARDLINK, SYMLINK)
+            sources = None
+            if incremental or linked:
+                sources = tree_checksums(src_folder, check_max_path_len,
+                                         self._client_cache.checksum_cache)
+            if previous_sources is None:
+                output.info('Copying sources to build folder')
+                stage_tree(src_folder, build_folder, staging, ignore=check_max_path_len)
+            else:
+                # Without manifest if interrupted, so the next build starts from scratch
+                os.remove(sources_manifest)
+                updated = sync_tree(src_folder, build_folder, previous_sources, sources, staging,
+                                    self._client_cache.checksum_cache)
+                output.info('Incremental build, %d changed source files updated in build folder'
+                            % len(updated))
+            if incremental:
+                save(sources_manifest, str(FileTreeManifest(calendar.timegm(time.gmtime()), sources)))
         logger.debug("Copied to %s" % build_folder)
         logger.debug("Files copied %s" % os.listdir(build_folder))
         os.chdir(build_folder)
@@ -364,7 +591,8 @@ Package configuration:
         # Build step might need DLLs, binaries as protoc to generate source files
         # So execute imports() before build, storing the list of copied_files
         from conans.client.importer import run_imports
-        copied_files = run_imports(conan_file, build_folder, output)
+        copied_files = run_imports(conan_file, build_folder, output,
+                                   self._client_cache.conan_config.imports_mode)
 
         try:
             # This is necessary because it is different for user projects
@@ -391,6 +619,21 @@ Package configuration:
                         os.remove(f)
                 except Exception:
                     self._out.warn("Unable to remove imported file from build: %s" % f)
+            if linked:
+                self._check_linked_sources(conan_ref, src_folder, sources, check_max_path_len,
+                                           output)
+
+    def _check_linked_sources(self, conan_ref, src_folder, sources, ignore, output):
+        """ the files of the build folder linked to the source ones, modified in place by the
+        build tools, modify the source folder shared by all the builds. Then it is marked dirty,
+        so it is created again for the next build
+        """
+        with self._client_cache.writing_source(conan_ref, output):
+            current = tree_checksums(src_folder, ignore, self._client_cache.checksum_cache)
+            if current != sources:
+                output.warn("The build modified the linked sources, the source folder will be "
+                            "created again")
+                save(os.path.join(src_folder, DIRTY_FILE), "")
 
     def _package_info_conanfile(self, conan_ref, conan_file):
         # Once the node is build, execute package info, so it has access to the
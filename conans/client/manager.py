@@ -17,6 +17,7 @@ from conans.client.generators import write_generators
 from conans.client.importer import run_imports, undo_imports
 from conans.model.ref import ConanFileReference, PackageReference
 from conans.client.remover import ConanRemover
+from conans.client.cache_gc import CacheCollector
 from conans.model.info import ConanInfo
 from conans.model.values import Values
 from conans.model.options import OptionsValues
@@ -92,6 +93,10 @@ class ConanManager(object):
                                options=user_options, scopes=conaninfo_scopes,
                                env=env, package_env=package_env)
 
+    def _update_catalog(self, deps_graph):
+        self._client_cache.update_catalog([node.conan_ref for node in deps_graph.nodes
+                                           if node.conan_ref])
+
     def export(self, user, conan_file_path, keep_source=False):
         """ Export the conans
         param conanfile_path: the original source directory of the user containing a
@@ -120,8 +125,12 @@ class ConanManager(object):
                                  "You exported '%s' but already existing '%s'"
                                  % (conan_ref_str, " ".join(str(s) for s in refs)))
         output = ScopedOutput(str(conan_ref), self._user_io.out)
-        export_conanfile(output, self._client_cache, conan_file, conan_file_path,
-                         conan_ref, conan_file.short_paths, keep_source)
+        try:
+            with self._client_cache.writing(conan_ref, output):
+                export_conanfile(output, self._client_cache, conan_file, conan_file_path,
+                                 conan_ref, conan_file.short_paths, keep_source)
+        finally:
+            self._client_cache.update_catalog([conan_ref])
 
     def download(self, reference, package_ids, remote=None):
         """ Download conanfile and specified packages to local repository
@@ -136,15 +145,18 @@ class ConanManager(object):
         if not package:  # Search the reference first, and raise if it doesn't exist
             raise ConanException("'%s' not found in remote" % str(reference))
 
-        if package_ids:
-            remote_proxy.download_packages(reference, package_ids)
-        else:
-            packages_props = remote_proxy.search_packages(reference, None)
-            if not packages_props:
-                output = ScopedOutput(str(reference), self._user_io.out)
-                output.warn("No remote binary packages found in remote")
+        try:
+            if package_ids:
+                remote_proxy.download_packages(reference, package_ids)
             else:
-                remote_proxy.download_packages(reference, list(packages_props.keys()))
+                packages_props = remote_proxy.search_packages(reference, None)
+                if not packages_props:
+                    output = ScopedOutput(str(reference), self._user_io.out)
+                    output.warn("No remote binary packages found in remote")
+                else:
+                    remote_proxy.download_packages(reference, list(packages_props.keys()))
+        finally:
+            self._client_cache.update_catalog([reference])
 
     def _get_graph(self, reference, current_path, remote, options, settings, filename, update,
                    check_updates, manifest_manager, scopes, package_settings, env, package_env):
@@ -216,6 +228,7 @@ class ConanManager(object):
         objects = self._get_graph(reference, current_path, remote, options, settings, filename,
                                   update, check_updates, None, scopes, package_settings, None, None)
         (builder, deps_graph, project_reference, registry, _, remote_proxy, _) = objects
+        self._update_catalog(deps_graph)  # Recipes could have been retrieved
 
         if build_order:
             result = deps_graph.build_order(build_order)
@@ -334,28 +347,38 @@ If not:
             pass
 
         installer = ConanInstaller(self._client_cache, self._user_io, remote_proxy)
-        installer.install(deps_graph, build_mode)
-
-        prefix = "PROJECT" if not isinstance(reference, ConanFileReference) else str(reference)
-        output = ScopedOutput(prefix, self._user_io.out)
-
-        # Write generators
-        tmp = list(conanfile.generators)  # Add the command line specified generators
-        tmp.extend(generators)
-        conanfile.generators = tmp
-        write_generators(conanfile, current_path, output)
-
-        if not isinstance(reference, ConanFileReference):
-            content = normalize(conanfile.info.dumps())
-            save(os.path.join(current_path, CONANINFO), content)
-            output.info("Generated %s" % CONANINFO)
-            if not no_imports:
-                run_imports(conanfile, current_path, output)
-            installer.call_system_requirements(conanfile, output)
+        # Other processes can't remove the used folders meanwhile
+        with self._client_cache.using(node.conan_ref for node in deps_graph.nodes
+                                      if node.conan_ref):
+            try:
+                installer.install(deps_graph, build_mode)
+            finally:
+                self._update_catalog(deps_graph)
+
+            prefix = "PROJECT" if not isinstance(reference, ConanFileReference) else str(reference)
+            output = ScopedOutput(prefix, self._user_io.out)
+
+            # Write generators
+            tmp = list(conanfile.generators)  # Add the command line specified generators
+            tmp.extend(generators)
+            conanfile.generators = tmp
+            write_generators(conanfile, current_path, output)
+
+            if not isinstance(reference, ConanFileReference):
+                content = normalize(conanfile.info.dumps())
+                save(os.path.join(current_path, CONANINFO), content)
+                output.info("Generated %s" % CONANINFO)
+                if not no_imports:
+                    run_imports(conanfile, current_path, output,
+                                self._client_cache.conan_config.imports_mode)
+                installer.call_system_requirements(conanfile, output)
 
         if manifest_manager:
             manifest_manager.print_log()
 
+        if self._client_cache.conan_config.cache_gc_after_install:
+            self.collect_garbage()
+
     def _load_info_file(self, current_path, conanfile, output, info_file, error=False):
         if info_file == BUILD_INFO:
             class_, attr, gen = DepsCppInfo, "deps_cpp_info", "txt"
@@ -396,7 +419,9 @@ If not:
             self._load_deps_info(current_path, conanfile, output)
             src_folder = self._client_cache.source(reference, conanfile.short_paths)
             export_folder = self._client_cache.export(reference)
-            config_source(export_folder, src_folder, conanfile, output, force)
+            with self._client_cache.writing_source(reference, output):
+                config_source(export_folder, src_folder, conanfile, output, force,
+                              staging=self._client_cache.conan_config.build_staging)
 
     def imports_undo(self, current_path):
         undo_imports(current_path, self._user_io.out)
@@ -419,7 +444,8 @@ If not:
             conanfile = self._loader().load_conan(conan_file_path, output, reference=reference)
 
         self._load_deps_info(current_path, conanfile, output, load_env=False, error=True)
-        run_imports(conanfile, dest_folder or current_path, output)
+        run_imports(conanfile, dest_folder or current_path, output,
+                    self._client_cache.conan_config.imports_mode)
 
     def local_package(self, current_path, build_folder):
         if current_path == build_folder:
@@ -466,7 +492,10 @@ If not:
                                           reference=package_reference.conan)
             self._load_deps_info(build_folder, conanfile, output)
             rmdir(package_folder)
-            packager.create_package(conanfile, build_folder, package_folder, output)
+            try:
+                packager.create_package(conanfile, build_folder, package_folder, output)
+            finally:
+                self._client_cache.update_catalog([reference])
 
     def build(self, conanfile_path, current_path, test=False, filename=None, profile_name=None,
               env=None, package_env=None):
@@ -541,6 +570,24 @@ If not:
 
         logger.debug("====> Time manager upload: %f" % (time.time() - t1))
 
+    def rebuild_search_index(self):
+        catalog = self._client_cache.catalog
+        if catalog is None:
+            raise ConanException("The search index is disabled, enable it with "
+                                 "'search_index: True' in the [general] section of conan.conf")
+        catalog.rebuild()
+        self._user_io.out.success("Rebuilt the search index of the local cache")
+
+    def collect_garbage(self, quotas=None, dry_run=False):
+        """ Removes the least recently used package, build and source folders of the local
+        cache beyond the size quotas
+        param quotas: {kind of folder: max size in MB}, conan.conf ones if not given
+        """
+        conf_quotas = self._client_cache.conan_config.cache_quotas
+        conf_quotas.update({kind: quota for kind, quota in (quotas or {}).items()
+                            if quota is not None})
+        CacheCollector(self._client_cache, self._user_io.out).collect(conf_quotas, dry_run)
+
     def search(self, pattern_or_reference=None, remote=None, ignorecase=True, packages_query=None):
         """ Print the single information saved in conan.vars about all the packages
             or the packages which match with a pattern
@@ -595,7 +642,17 @@ If not:
                 package_ids = os.listdir(packages)
             else:
                 package_ids = []
-        copier.copy(reference, package_ids, username, channel, force)
+        dest_ref = ConanFileReference(reference.name, reference.version, username, channel)
+        if dest_ref == reference:
+            raise ConanException("Cannot copy '%s' to itself" % str(reference))
+        origins = [reference] + [PackageReference(reference, package_id)
+                                 for package_id in package_ids]
+        try:
+            with self._client_cache.using(origins):
+                with self._client_cache.writing(dest_ref, self._user_io.out):
+                    copier.copy(reference, package_ids, username, channel, force)
+        finally:
+            self._client_cache.update_catalog([dest_ref])
 
     def remove(self, pattern, src=False, build_ids=None, package_ids_filter=None, force=False,
                remote=None):
@@ -1,3 +1,5 @@
+import threading
+
 from colorama import Fore, Style
 import six
 from conans.util.files import decode_text
@@ -36,6 +38,16 @@ if get_env("CONAN_COLOR_DARK", 0):
     Color.BRIGHT_GREEN = Fore.GREEN
 
 
+# Shared by all the outputs, so lines written from concurrent threads are not mixed
+_output_lock = threading.RLock()
+
+
+def output_lock():
+    """ While it is held, no other thread writes to any output
+    """
+    return _output_lock
+
+
 class ConanOutput(object):
     """ wraps an output stream, so it can be pretty colored,
     and auxiliary info, success, warn methods for convenience.
@@ -65,12 +77,13 @@ class ConanOutput(object):
             if newline:
                 data = "%s\n" % data
 
-        try:
-            self._stream.write(data)
-        except UnicodeError:
-            data = data.encode("utf8").decode("ascii", "ignore")
-            self._stream.write(data)
-        self._stream.flush()
+        with _output_lock:
+            try:
+                self._stream.write(data)
+            except UnicodeError:
+                data = data.encode("utf8").decode("ascii", "ignore")
+                self._stream.write(data)
+            self._stream.flush()
 
     def info(self, data):
         self.writeln(data, Color.BRIGHT_CYAN)
@@ -100,8 +113,7 @@ class ConanOutput(object):
         LIMIT_SIZE = 32  # Hard coded instead of TOTAL_SIZE/2-3 that fails in Py3 float division
         if len(line) > TOTAL_SIZE:
             line = line[0:LIMIT_SIZE] + " ... " + line[-LIMIT_SIZE:]
-        self.write("\r%s%s" % (line, " " * (TOTAL_SIZE - len(line))))
-        self._stream.flush()
+        ConanOutput.write(self, "\r%s%s" % (line, " " * (TOTAL_SIZE - len(line))))
         self._color = tmp_color
 
 
@@ -113,5 +125,9 @@ class ScopedOutput(ConanOutput):
         self.werror_active = output.werror_active
 
     def write(self, data, front=None, back=None, newline=False):
-        super(ScopedOutput, self).write("%s: " % self.scope, front, back, False)
-        super(ScopedOutput, self).write("%s" % data, Color.BRIGHT_WHITE, back, newline)
+        with _output_lock:
+            super(ScopedOutput, self).write("%s: " % self.scope, front, back, False)
+            super(ScopedOutput, self).write("%s" % data, Color.BRIGHT_WHITE, back, newline)
+
+    def rewrite_line(self, line):
+        super(ScopedOutput, self).rewrite_line("%s: %s" % (self.scope, line))
@@ -19,7 +19,9 @@ def create_package(conanfile, build_folder, package_folder, output, local=False)
     # Make the copy of all the patterns
     output.info("Generating the package")
     output.info("Package folder %s" % (package_folder))
-    conanfile.copy = FileCopier(build_folder, package_folder)
+    file_copier = FileCopier(build_folder, package_folder)
+    # Every copy is done right away, package() can work with the files it has just copied
+    conanfile.copy = file_copier
 
     def wrap(dst_folder):
         def new_method(pattern, src=""):
@@ -33,7 +35,7 @@ def create_package(conanfile, build_folder, package_folder, output, local=False)
     try:
         conanfile.package()
         package_output = ScopedOutput("%s package()" % output.scope, output)
-        conanfile.copy.report(package_output, warn=True)
+        file_copier.report(package_output, warn=True)
     except Exception as e:
         if not local:
             os.chdir(build_folder)
@@ -1,10 +1,12 @@
 from conans.client.output import ScopedOutput
+from collections import OrderedDict
 from conans.util.files import rmdir
 from conans.model.ref import PackageReference
 from conans.errors import (ConanException, ConanConnectionError, ConanOutdatedClient,
                            NotFoundException)
 from conans.client.remote_registry import RemoteRegistry
 from conans.util.log import logger
+from conans.util.parallel import run_in_threads
 from conans.client.loader import ConanFileLoader
 import os
 from conans.paths import rm_conandir, EXPORT_SOURCES_DIR, EXPORT_SOURCES_TGZ_NAME
@@ -28,6 +30,7 @@ class ConanProxy(object):
         self._update = update
         self._check_updates = check_updates or update  # Update forces check
         self._manifest_manager = manifest_manager
+        self._packages_info = {}  # {package_ref: ConanInfo or None}, from prefetch_packages_info
 
     @property
     def registry(self):
@@ -70,37 +73,46 @@ class ConanProxy(object):
         """ obtain a package, either from disk or retrieve from remotes if necessary
         and not necessary to build
         """
+        installed = self.retrieve_package(package_ref, short_paths)
+        self.handle_package_manifest(package_ref, installed)
+        return installed
+
+    def retrieve_package(self, package_ref, short_paths):
+        """ same as get_package, but without checking the package manifest, so it can be
+        called concurrently for different packages
+        """
         output = ScopedOutput(str(package_ref.conan), self._out)
         package_folder = self._client_cache.package(package_ref, short_paths=short_paths)
 
-        # Check current package status
-        if os.path.exists(package_folder):
-            if self._check_updates:
-                read_manifest = self._client_cache.load_package_manifest(package_ref)
-                try:  # get_conan_digest can fail, not in server
-                    upstream_manifest = self.get_package_digest(package_ref)
-                    if upstream_manifest.file_sums != read_manifest.file_sums:
-                        if upstream_manifest.time > read_manifest.time:
-                            output.warn("Current package is older than remote upstream one")
-                            if self._update:
-                                output.warn("Removing it to retrieve or build an updated one")
-                                rmdir(package_folder)
-                        else:
-                            output.warn("Current package is newer than remote upstream one")
-                except ConanException:
-                    pass
-
-        installed = False
-        local_package = os.path.exists(package_folder)
-        if local_package:
-            output.info('Already installed!')
-            installed = True
-            log_package_got_from_local_cache(package_ref)
-        else:
-            installed = self._retrieve_remote_package(package_ref, package_folder,
-                                                      output)
-        self.handle_package_manifest(package_ref, installed)
-        return installed
+        # Other process could be retrieving or building it, it is checked when it is done
+        with self._client_cache.writing(package_ref, output):
+            # Check current package status
+            if os.path.exists(package_folder):
+                if self._check_updates:
+                    read_manifest = self._client_cache.load_package_manifest(package_ref)
+                    try:  # get_conan_digest can fail, not in server
+                        upstream_manifest = self.get_package_digest(package_ref)
+                        if upstream_manifest.file_sums != read_manifest.file_sums:
+                            if upstream_manifest.time > read_manifest.time:
+                                output.warn("Current package is older than remote upstream one")
+                                if self._update:
+                                    output.warn("Removing it to retrieve or build an updated one")
+                                    rmdir(package_folder)
+                            else:
+                                output.warn("Current package is newer than remote upstream one")
+                    except ConanException:
+                        pass
+
+            installed = False
+            local_package = os.path.exists(package_folder)
+            if local_package:
+                output.info('Already installed!')
+                installed = True
+                log_package_got_from_local_cache(package_ref)
+            else:
+                installed = self._retrieve_remote_package(package_ref, package_folder,
+                                                          output)
+            return installed
 
     def _package_outdated(self, package_ref, package_folder):
         recipe_hash = self._client_cache.load_manifest(package_ref.conan).summary_hash
@@ -118,12 +130,17 @@ class ConanProxy(object):
         if os.path.exists(sources_folder):
             return
 
-        current_remote = self._registry.get_ref(conan_reference)
-        if not current_remote:
-            raise ConanException("Error while trying to get recipe sources for %s. "
-                                 "No remote defined" % str(conan_reference))
-        else:
-            self._remote_manager.get_recipe_sources(conan_reference, export_path, current_remote)
+        output = ScopedOutput(str(conan_reference), self._out)
+        with self._client_cache.writing_source(conan_reference, output):
+            if os.path.exists(sources_folder):  # Retrieved by other process meanwhile
+                return
+            current_remote = self._registry.get_ref(conan_reference)
+            if not current_remote:
+                raise ConanException("Error while trying to get recipe sources for %s. "
+                                     "No remote defined" % str(conan_reference))
+            else:
+                self._remote_manager.get_recipe_sources(conan_reference, export_path,
+                                                        current_remote)
 
     def get_recipe(self, conan_reference):
         output = ScopedOutput(str(conan_reference), self._out)
@@ -141,7 +158,8 @@ class ConanProxy(object):
             else:
                 output.info("Installed!")
 
-        # check if it is in disk
+        # check if it is in disk. Only locked if it is retrieved or refreshed, the installs
+        # read lock the recipes they use for all their duration
         conanfile_path = self._client_cache.conanfile(conan_reference)
 
         if os.path.exists(conanfile_path):
@@ -162,10 +180,13 @@ class ConanProxy(object):
                                             % remote.name)
                             output.warn("Refused to install!")
                         else:
-                            if remote != ref_remote:
-                                # Delete packages, could be non coherent with new remote
-                                DiskRemover(self._client_cache).remove_packages(conan_reference)
-                            _refresh()
+                            with self._client_cache.writing(conan_reference, output):
+                                # Might have been updated by other process while waiting
+                                if self.update_available(conan_reference) == 1:
+                                    if remote != ref_remote:
+                                        # Delete packages, could be non coherent with new remote
+                                        DiskRemover(self._client_cache).remove_packages(conan_reference)
+                                    _refresh()
                     elif ret == -1:
                         if not self._update:
                             output.info("Current conanfile is newer "
@@ -176,7 +197,11 @@ class ConanProxy(object):
                                          "to replace it." % (remote.name, conan_reference))
 
         else:
-            self._retrieve_recipe(conan_reference, output)
+            with self._client_cache.writing(conan_reference, output):
+                if os.path.exists(conanfile_path):  # Retrieved by other process meanwhile
+                    log_recipe_got_from_local_cache(conan_reference)
+                else:
+                    self._retrieve_recipe(conan_reference, output)
 
         if self._manifest_manager:
             # Just make sure that the recipe sources are there to check
@@ -221,6 +246,10 @@ class ConanProxy(object):
             output.info("Not found, looking in remotes...")
 
         remotes = self._registry.remotes
+        if len(remotes) > 1 and self._client_cache.conan_config.parallel_remotes:
+            remote = self._probe_remotes(conan_reference, remotes, output)
+            return _retrieve_from_remote(remote)
+
         for remote in remotes:
             logger.debug("Trying with remote %s" % remote.name)
             try:
@@ -238,6 +267,28 @@ class ConanProxy(object):
 
         raise ConanException("No remote defined")
 
+    def _probe_remotes(self, conan_reference, remotes, output):
+        """ asks all the remotes at the same time if they have the recipe, so a missing one
+        costs the slowest remote, not the sum of all of them. Returns the first remote in the
+        registry order that has it
+        """
+        def probe(remote):
+            logger.debug("Probing remote %s" % remote.name)
+            return self._remote_manager.get_conan_digest(conan_reference, remote)
+
+        probes = run_in_threads(probe, remotes, len(remotes))
+        for remote, _, exc in probes:
+            if exc is None:
+                return remote
+            if isinstance(exc, (ConanOutdatedClient, ConanConnectionError)):
+                output.warn(str(exc))
+            elif not isinstance(exc, NotFoundException):
+                raise exc
+
+        if isinstance(probes[-1][2], NotFoundException):
+            raise NotFoundException("Unable to find '%s' in remotes" % str(conan_reference))
+        raise ConanConnectionError("All remotes failed")
+
     def complete_recipe_sources(self, conan_reference, force_complete=True):
         export_path = self._client_cache.export(conan_reference)
         sources_folder = os.path.join(export_path, EXPORT_SOURCES_DIR)
@@ -315,9 +366,45 @@ class ConanProxy(object):
             self._registry.set_ref(package_ref.conan, remote)
         return result
 
+    def prefetch_packages_info(self, references):
+        """ Gets with one request per remote the info of the packages that are not in the
+        local cache, which will be used later by package_available
+        param references: list of (package_ref, short_paths)
+        """
+        refs_by_remote = OrderedDict()
+        for package_ref, short_paths in references:
+            if package_ref in self._packages_info:
+                continue
+            if os.path.exists(self._client_cache.package(package_ref, short_paths=short_paths)):
+                continue
+            try:
+                remote, ref_remote = self._get_remote(package_ref.conan)
+            except ConanException:  # No remotes, package_available will tell
+                continue
+            refs_by_remote.setdefault((remote, ref_remote), []).append(package_ref)
+
+        for (remote, ref_remote), package_refs in refs_by_remote.items():
+            try:
+                infos = self._remote_manager.get_packages_info(package_refs, remote)
+            except ConanException as e:
+                # They will be checked one by one
+                logger.debug("Could not get packages info from %s: %s" % (remote.name, str(e)))
+                continue
+            for package_ref in package_refs:
+                info = infos.get(package_ref)
+                self._packages_info[package_ref] = info[0] if info else None
+                if info and not ref_remote:
+                    self._registry.set_ref(package_ref.conan, remote)
+
     def get_package_info(self, package_ref):
         """ Gets the package info to check if outdated
         """
+        if package_ref in self._packages_info:
+            info = self._packages_info[package_ref]
+            if info is None:
+                raise NotFoundException("Package not found!")
+            return info
+
         remote, ref_remote = self._get_remote(package_ref.conan)
         result = self._remote_manager.get_package_info(package_ref, remote)
         if not ref_remote:
@@ -334,7 +421,19 @@ class ConanProxy(object):
             search_result = self._remote_manager.search(remote, pattern, ignorecase)
             return search_result
 
-        for remote in self._registry.remotes:
+        remotes = self._registry.remotes
+        if len(remotes) > 1 and self._client_cache.conan_config.parallel_remotes:
+            def search(remote):
+                return self._remote_manager.search(remote, pattern, ignorecase)
+            # The first remote with results wins, as in the sequential search
+            for _, search_result, exc in run_in_threads(search, remotes, len(remotes)):
+                if exc is not None:
+                    raise exc
+                if search_result:
+                    return search_result
+            return
+
+        for remote in remotes:
             search_result = self._remote_manager.search(remote, pattern, ignorecase)
             if search_result:
                 return search_result
@@ -363,17 +462,19 @@ class ConanProxy(object):
         assert(isinstance(package_ids, list))
         remote, _ = self._get_remote(reference)
         export_path = self._client_cache.export(reference)
-        self._remote_manager.get_recipe(reference, export_path, remote)
+        output = ScopedOutput(str(reference), self._out)
+        with self._client_cache.writing(reference, output):
+            self._remote_manager.get_recipe(reference, export_path, remote)
         conanfile_path = self._client_cache.conanfile(reference)
         loader = ConanFileLoader(None, None, None, None, None, None, None)
         conanfile = loader.load_class(conanfile_path)
         short_paths = conanfile.short_paths
         self._registry.set_ref(reference, remote)
-        output = ScopedOutput(str(reference), self._out)
         for package_id in package_ids:
             package_ref = PackageReference(reference, package_id)
             package_folder = self._client_cache.package(package_ref, short_paths=short_paths)
-            self._retrieve_remote_package(package_ref, package_folder, output, remote)
+            with self._client_cache.writing(package_ref, output):
+                self._retrieve_remote_package(package_ref, package_folder, output, remote)
 
     def _retrieve_remote_package(self, package_ref, package_folder, output, remote=None):
 
@@ -7,12 +7,14 @@ import traceback
 from requests.exceptions import ConnectionError
 
 from conans.errors import ConanException, ConanConnectionError, NotFoundException
-from conans.util.files import tar_extract, rmdir, exception_message_safe, mkdir
+from conans.util.files import tar_extract, rmdir, exception_message_safe, mkdir, load,\
+    sha1sum
 from conans.util.log import logger
 from conans.paths import PACKAGE_TGZ_NAME, CONANINFO, CONAN_MANIFEST, CONANFILE, EXPORT_TGZ_NAME,\
     rm_conandir, EXPORT_SOURCES_TGZ_NAME, EXPORT_SOURCES_DIR
 from conans.util.files import gzopen_without_timestamps
-from conans.util.files import touch
+from conans.client.store.blob_cache import BlobCache
+from conans.client.store.metadata_cache import RemoteMetadataCache
 from conans.model.manifest import gather_files
 from conans.util.tracer import log_package_upload, log_recipe_upload,\
     log_recipe_download, log_package_download, log_recipe_sources_download
@@ -27,6 +29,44 @@ class RemoteManager(object):
         self._output = output
         self._remote_client = remote_client
 
+    @property
+    def _blob_cache(self):
+        """ The machine wide store of downloaded archives, if configured, is looked up
+        before downloading them from the remotes
+        """
+        conan_config = self._client_cache.conan_config
+        if not conan_config.blob_cache_path:
+            return None
+        return BlobCache(conan_config.blob_cache_path, conan_config.blob_cache_size)
+
+    @property
+    def _metadata_cache(self):
+        """ The manifests and infos got from the remotes, if a ttl is configured, are reused
+        without asking the remotes again until they expire
+        """
+        ttl = self._client_cache.conan_config.remote_metadata_ttl
+        if not ttl:
+            return None
+        return RemoteMetadataCache(self._client_cache.metadata_cache_path, ttl)
+
+    def _store_metadata(self, reference, remote, folder, filenames):
+        """ The metadata files of the just downloaded recipe or package are cached, so the next
+        update checks don't need to download them. The ETag of the conan server files is
+        their sha1, so they can be revalidated too
+        """
+        metadata_cache = self._metadata_cache
+        if metadata_cache:
+            for filename in filenames:
+                path = os.path.join(folder, filename)
+                if os.path.exists(path):
+                    metadata_cache.put(remote.url, reference, filename, load(path),
+                                       '"%s"' % sha1sum(path))
+
+    def _invalidate_metadata(self, conan_reference, remote):
+        metadata_cache = self._metadata_cache
+        if metadata_cache:
+            metadata_cache.invalidate(remote.url, conan_reference)
+
     def upload_conan(self, conan_reference, remote, retry, retry_wait, ignore_deleted_file):
         """Will upload the conans to the first remote"""
 
@@ -39,8 +79,11 @@ class RemoteManager(object):
 
         the_files = compress_recipe_files(files, export_folder, self._output)
 
-        ret = self._call_remote(remote, "upload_conan", conan_reference, the_files,
-                                retry, retry_wait, ignore_deleted_file)
+        try:
+            ret = self._call_remote(remote, "upload_conan", conan_reference, the_files,
+                                    retry, retry_wait, ignore_deleted_file)
+        finally:
+            self._invalidate_metadata(conan_reference, remote)
         duration = time.time() - t1
         log_recipe_upload(conan_reference, duration, the_files)
         msg = "Uploaded conan recipe '%s' to '%s'" % (str(conan_reference), remote.name)
@@ -58,6 +101,7 @@ class RemoteManager(object):
         t1 = time.time()
         # existing package, will use short paths if defined
         package_folder = self._client_cache.package(package_reference, short_paths=None)
+        remove_partial_tgz(os.path.join(package_folder, PACKAGE_TGZ_NAME))
         # Get all the files in that directory
         files = gather_files(package_folder)
 
@@ -94,8 +138,11 @@ class RemoteManager(object):
 
         the_files = compress_package_files(files, package_folder, self._output)
 
-        tmp = self._call_remote(remote, "upload_package", package_reference, the_files,
-                                retry, retry_wait)
+        try:
+            tmp = self._call_remote(remote, "upload_package", package_reference, the_files,
+                                    retry, retry_wait)
+        finally:
+            self._invalidate_metadata(package_reference.conan, remote)
         duration = time.time() - t1
         log_package_upload(package_reference, duration, the_files)
         logger.debug("====> Time remote_manager upload_package: %f" % (duration))
@@ -107,7 +154,8 @@ class RemoteManager(object):
         Will iterate the remotes to find the conans unless remote was specified
 
         returns (ConanDigest, remote_name)"""
-        return self._call_remote(remote, "get_conan_digest", conan_reference)
+        return self._call_remote(remote, "get_conan_digest", conan_reference,
+                                 self._metadata_cache)
 
     def get_package_digest(self, package_reference, remote):
         """
@@ -115,7 +163,8 @@ class RemoteManager(object):
         Will iterate the remotes to find the conans unless remote was specified
 
         returns (ConanDigest, remote_name)"""
-        return self._call_remote(remote, "get_package_digest", package_reference)
+        return self._call_remote(remote, "get_package_digest", package_reference,
+                                 self._metadata_cache)
 
     def get_package_info(self, package_reference, remote):
         """
@@ -123,7 +172,16 @@ class RemoteManager(object):
         Will iterate the remotes to find the conans unless remote was specified
 
         returns (ConanInfo, remote_name)"""
-        return self._call_remote(remote, "get_package_info", package_reference)
+        return self._call_remote(remote, "get_package_info", package_reference,
+                                 self._metadata_cache)
+
+    def get_packages_info(self, package_references, remote):
+        """
+        Read the ConanInfo and the manifest of several packages from a remote, in one request
+
+        returns {package_reference: (ConanInfo, FileTreeManifest)}, without the missing ones"""
+        return self._call_remote(remote, "get_packages_info", package_references,
+                                 self._metadata_cache)
 
     def get_recipe(self, conan_reference, dest_folder, remote):
         """
@@ -142,16 +200,14 @@ class RemoteManager(object):
             return urls
 
         zipped_files = self._call_remote(remote, "get_recipe", conan_reference, dest_folder,
-                                         filter_function)
+                                         filter_function, self._blob_cache)
         duration = time.time() - t1
         log_recipe_download(conan_reference, duration, remote, zipped_files)
 
         unzip_and_get_files(zipped_files, dest_folder, EXPORT_TGZ_NAME)
+        self._store_metadata(conan_reference, remote, dest_folder, [CONAN_MANIFEST])
         # Make sure that the source dir is deleted
         rm_conandir(self._client_cache.source(conan_reference))
-        for dirname, _, filenames in os.walk(dest_folder):
-            for fname in filenames:
-                touch(os.path.join(dirname, fname))
 
     def get_recipe_sources(self, conan_reference, export_folder, remote):
         t1 = time.time()
@@ -164,8 +220,8 @@ class RemoteManager(object):
                 return None
             return urls
 
-        zipped_files = self._call_remote(remote, "get_recipe",
-                                         conan_reference, export_folder, filter_function)
+        zipped_files = self._call_remote(remote, "get_recipe", conan_reference, export_folder,
+                                         filter_function, self._blob_cache)
         duration = time.time() - t1
         log_recipe_sources_download(conan_reference, duration, remote, zipped_files)
 
@@ -175,9 +231,6 @@ class RemoteManager(object):
             return
 
         unzip_and_get_files(zipped_files, export_folder, EXPORT_SOURCES_TGZ_NAME)
-        for dirname, _, filenames in os.walk(sources_folder):
-            for fname in filenames:
-                touch(os.path.join(dirname, fname))
 
     def get_package(self, package_reference, dest_folder, remote):
         """
@@ -187,14 +240,17 @@ class RemoteManager(object):
         returns (dict relative_filepath:abs_path , remote_name)"""
         rm_conandir(dest_folder)  # Remove first the destination folder
         t1 = time.time()
-        zipped_files = self._call_remote(remote, "get_package", package_reference, dest_folder)
+        try:
+            zipped_files = self._call_remote(remote, "get_package", package_reference,
+                                             dest_folder, self._blob_cache)
+        except ConanException:
+            # The package might be partially downloaded (or extracted, if streamed)
+            rm_conandir(dest_folder)
+            raise
         duration = time.time() - t1
         log_package_download(package_reference, duration, remote, zipped_files)
         unzip_and_get_files(zipped_files, dest_folder, PACKAGE_TGZ_NAME)
-        # Issue #214 https://github.com/conan-io/conan/issues/214
-        for dirname, _, filenames in os.walk(dest_folder):
-            for fname in filenames:
-                touch(os.path.join(dirname, fname))
+        self._store_metadata(package_reference, remote, dest_folder, [CONANINFO, CONAN_MANIFEST])
 
     def search(self, remote, pattern=None, ignorecase=True):
         """
@@ -210,13 +266,19 @@ class RemoteManager(object):
         """
         Removed conans or packages from remote
         """
-        return self._call_remote(remote, "remove", conan_ref)
+        try:
+            return self._call_remote(remote, "remove", conan_ref)
+        finally:
+            self._invalidate_metadata(conan_ref, remote)
 
     def remove_packages(self, conan_ref, remove_ids, remote):
         """
         Removed conans or packages from remote
         """
-        return self._call_remote(remote, "remove_packages", conan_ref, remove_ids)
+        try:
+            return self._call_remote(remote, "remove_packages", conan_ref, remove_ids)
+        finally:
+            self._invalidate_metadata(conan_ref, remote)
 
     def authenticate(self, remote, name, password):
         return self._call_remote(remote, 'authenticate', name, password)
@@ -264,10 +326,19 @@ def compress_recipe_files(files, dest_folder, output):
     return result
 
 
+def compress_package(package_folder):
+    """ Creates the conan_package.tgz of a package folder if it doesn't exist, so it can be
+    done in advance, in other process, before uploading it
+    """
+    files = gather_files(package_folder)
+    return compress_package_files(files, package_folder, output=None)[PACKAGE_TGZ_NAME]
+
+
 def compress_package_files(files, dest_folder, output):
     tgz_path = files.get(PACKAGE_TGZ_NAME)
     if not tgz_path:
-        output.rewrite_line("Compressing package...")
+        if output:
+            output.rewrite_line("Compressing package...")
         tgz_files = {f: path for f, path in files.items() if f not in [CONANINFO, CONAN_MANIFEST]}
         tgz_path = compress_files(tgz_files, PACKAGE_TGZ_NAME, dest_dir=dest_folder)
 
@@ -282,27 +353,47 @@ def compress_files(files, name, dest_dir):
 
     # FIXME, better write to disk sequentially and not keep tgz contents in memory
     tgz_path = os.path.join(dest_dir, name)
-    with open(tgz_path, "wb") as tgz_handle:
-        # tgz_contents = BytesIO()
-        tgz = gzopen_without_timestamps(name, mode="w", fileobj=tgz_handle)
-
-        for filename, abs_path in files.items():
-            info = tarfile.TarInfo(name=filename)
-            info.size = os.stat(abs_path).st_size
-            info.mode = os.stat(abs_path).st_mode
-            if os.path.islink(abs_path):
-                info.type = tarfile.SYMTYPE
-                info.linkname = os.readlink(abs_path)  # @UndefinedVariable
-                tgz.addfile(tarinfo=info)
-            else:
-                with open(abs_path, 'rb') as file_handler:
-                    tgz.addfile(tarinfo=info, fileobj=file_handler)
-
-        tgz.close()
+    # Renamed once complete, an interrupted compression never leaves a truncated tgz
+    tmp_path = partial_tgz_path(tgz_path)
+    try:
+        with open(tmp_path, "wb") as tgz_handle:
+            # tgz_contents = BytesIO()
+            tgz = gzopen_without_timestamps(name, mode="w", fileobj=tgz_handle)
+
+            for filename, abs_path in files.items():
+                info = tarfile.TarInfo(name=filename)
+                info.size = os.stat(abs_path).st_size
+                info.mode = os.stat(abs_path).st_mode
+                if os.path.islink(abs_path):
+                    info.type = tarfile.SYMTYPE
+                    info.linkname = os.readlink(abs_path)  # @UndefinedVariable
+                    tgz.addfile(tarinfo=info)
+                else:
+                    with open(abs_path, 'rb') as file_handler:
+                        tgz.addfile(tarinfo=info, fileobj=file_handler)
+
+            tgz.close()
+        os.rename(tmp_path, tgz_path)
+    except BaseException:
+        remove_partial_tgz(tgz_path)
+        raise
 
     return tgz_path
 
 
+def partial_tgz_path(tgz_path):
+    return tgz_path + ".tmp"
+
+
+def remove_partial_tgz(tgz_path):
+    """ The leftover of a compression killed before finishing, it is not part of the package
+    """
+    try:
+        os.remove(partial_tgz_path(tgz_path))
+    except OSError:
+        pass
+
+
 def unzip_and_get_files(files, destination_dir, tgz_name):
     '''Moves all files from package_files, {relative_name: tmp_abs_path}
     to destination_dir, unzipping the "tgz_name" if found'''
@@ -314,9 +405,12 @@ def unzip_and_get_files(files, destination_dir, tgz_name):
 
 
 def uncompress_file(src_path, dest_folder):
+    """ The extracted files get the current time, not the one stored in the tgz, as they are new
+    for the build systems. Issue #214 https://github.com/conan-io/conan/issues/214
+    """
     try:
         with open(src_path, 'rb') as file_handler:
-            tar_extract(file_handler, dest_folder)
+            tar_extract(file_handler, dest_folder, mtime=time.time())
     except Exception as e:
         error_msg = "Error while downloading/extracting files to %s\n%s\n" % (dest_folder, str(e))
         # try to remove the files
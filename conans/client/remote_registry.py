@@ -1,4 +1,6 @@
 import os
+import threading
+from contextlib import contextmanager
 from conans.errors import ConanException
 from conans.util.files import load, save
 from collections import OrderedDict, namedtuple
@@ -12,6 +14,9 @@ default_remotes = """conan.io https://server.conan.io True
 
 Remote = namedtuple("Remote", "name url verify_ssl")
 
+# File locks only protect from other processes, not from other threads of this one
+_registry_thread_lock = threading.RLock()
+
 
 class RemoteRegistry(object):
     """ conan_ref: remote
@@ -21,6 +26,12 @@ class RemoteRegistry(object):
         self._filename = filename
         self._output = output
 
+    @contextmanager
+    def _lock(self):
+        with _registry_thread_lock:
+            with fasteners.InterProcessLock(self._filename + ".lock", logger=logger):
+                yield
+
     def _parse(self, contents):
         remotes = OrderedDict()
         refs = {}
@@ -81,18 +92,18 @@ class RemoteRegistry(object):
 
     @property
     def remotes(self):
-        with fasteners.InterProcessLock(self._filename + ".lock", logger=logger):
+        with self._lock():
             remotes, _ = self._load()
             return [Remote(ref, remote, verify_ssl) for ref, (remote, verify_ssl) in remotes.items()]
 
     @property
     def refs(self):
-        with fasteners.InterProcessLock(self._filename + ".lock", logger=logger):
+        with self._lock():
             _, refs = self._load()
             return refs
 
     def remote(self, name):
-        with fasteners.InterProcessLock(self._filename + ".lock", logger=logger):
+        with self._lock():
             remotes, _ = self._load()
             try:
                 return Remote(name, remotes[name][0], remotes[name][1])
@@ -101,7 +112,7 @@ class RemoteRegistry(object):
                                      % (name, self._filename))
 
     def get_ref(self, conan_reference):
-        with fasteners.InterProcessLock(self._filename + ".lock", logger=logger):
+        with self._lock():
             remotes, refs = self._load()
             remote_name = refs.get(str(conan_reference))
             try:
@@ -110,7 +121,7 @@ class RemoteRegistry(object):
                 return None
 
     def remove_ref(self, conan_reference, quiet=False):
-        with fasteners.InterProcessLock(self._filename + ".lock", logger=logger):
+        with self._lock():
             conan_reference = str(conan_reference)
             remotes, refs = self._load()
             try:
@@ -122,14 +133,14 @@ class RemoteRegistry(object):
                                       % conan_reference)
 
     def set_ref(self, conan_reference, remote):
-        with fasteners.InterProcessLock(self._filename + ".lock", logger=logger):
+        with self._lock():
             conan_reference = str(conan_reference)
             remotes, refs = self._load()
             refs[conan_reference] = remote.name
             self._save(remotes, refs)
 
     def add_ref(self, conan_reference, remote):
-        with fasteners.InterProcessLock(self._filename + ".lock", logger=logger):
+        with self._lock():
             conan_reference = str(conan_reference)
             remotes, refs = self._load()
             if conan_reference in refs:
@@ -140,7 +151,7 @@ class RemoteRegistry(object):
             self._save(remotes, refs)
 
     def update_ref(self, conan_reference, remote):
-        with fasteners.InterProcessLock(self._filename + ".lock", logger=logger):
+        with self._lock():
             conan_reference = str(conan_reference)
             remotes, refs = self._load()
             if conan_reference not in refs:
@@ -158,7 +169,7 @@ class RemoteRegistry(object):
         self._add_update(remote_name, remote, verify_ssl, exists_function)
 
     def remove(self, remote_name):
-        with fasteners.InterProcessLock(self._filename + ".lock", logger=logger):
+        with self._lock():
             remotes, refs = self._load()
             if remote_name not in remotes:
                 raise ConanException("Remote '%s' not found in remotes" % remote_name)
@@ -173,7 +184,7 @@ class RemoteRegistry(object):
         self._add_update(remote_name, remote, verify_ssl, exists_function)
 
     def _add_update(self, remote_name, remote, verify_ssl, exists_function):
-        with fasteners.InterProcessLock(self._filename + ".lock", logger=logger):
+        with self._lock():
             remotes, refs = self._load()
             exists_function(remotes)
             urls = {r[0]: name for name, r in remotes.items() if name != remote_name}
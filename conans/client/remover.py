@@ -94,30 +94,33 @@ class ConanRemover(object):
             return
 
         deleted_refs = []
-        for conan_ref in search_info:
-            assert(isinstance(conan_ref, ConanFileReference))
-            if self._ask_permission(conan_ref, src, build_ids, package_ids_filter, force):
-                if has_remote:
-                    if package_ids_filter is None:
-                        self._remote_proxy.remove(conan_ref)
+        try:
+            for conan_ref in search_info:
+                assert(isinstance(conan_ref, ConanFileReference))
+                if self._ask_permission(conan_ref, src, build_ids, package_ids_filter, force):
+                    if has_remote:
+                        if package_ids_filter is None:
+                            self._remote_proxy.remove(conan_ref)
+                        else:
+                            self._remote_proxy.remove_packages(conan_ref, package_ids_filter)
                     else:
-                        self._remote_proxy.remove_packages(conan_ref, package_ids_filter)
-                else:
-                    deleted_refs.append(conan_ref)
-                    remover = DiskRemover(self._client_cache)
-                    if src:
-                        remover.remove_src(conan_ref)
-                    if build_ids is not None:
-                        remover.remove_builds(conan_ref, build_ids)
-                    if package_ids_filter is not None:
-                        remover.remove_packages(conan_ref, package_ids_filter)
-                    if not src and build_ids is None and package_ids_filter is None:
-                        remover.remove(conan_ref)
-                        registry = self._remote_proxy.registry
-                        registry.remove_ref(conan_ref, quiet=True)
-
-        if not has_remote:
-            self._client_cache.delete_empty_dirs(deleted_refs)
+                        deleted_refs.append(conan_ref)
+                        remover = DiskRemover(self._client_cache)
+                        with self._client_cache.writing(conan_ref, self._user_io.out):
+                            if src:
+                                remover.remove_src(conan_ref)
+                            if build_ids is not None:
+                                remover.remove_builds(conan_ref, build_ids)
+                            if package_ids_filter is not None:
+                                remover.remove_packages(conan_ref, package_ids_filter)
+                            if not src and build_ids is None and package_ids_filter is None:
+                                remover.remove(conan_ref)
+                                registry = self._remote_proxy.registry
+                                registry.remove_ref(conan_ref, quiet=True)
+        finally:
+            if not has_remote:
+                self._client_cache.delete_empty_dirs(deleted_refs)
+                self._client_cache.update_catalog(deleted_refs)
 
     def _ask_permission(self, conan_ref, src, build_ids, package_ids_filter, force):
         if force:
@@ -17,9 +17,14 @@ from conans.errors import AuthenticationException, ForbiddenException,\
     ConanException
 from uuid import getnode as get_mac
 import hashlib
+import threading
 from conans.util.log import logger
 
 
+# Only one thread at a time can ask the user for credentials
+_login_lock = threading.RLock()
+
+
 def input_credentials_if_unauthorized(func):
     """Decorator. Handles AuthenticationException and request user
     to input a user and a password"""
@@ -58,8 +63,19 @@ def input_credentials_if_unauthorized(func):
         """Try LOGIN_RETRIES to obtain a password from user input for which
         we can get a valid token from api_client. If a token is returned,
         credentials are stored in localdb and rest method is called"""
+        with _login_lock:
+            # Other thread could have logged in while this one was waiting for the lock
+            user, token = self._localdb.get_login(self.remote.url)
+            if token and token != self._rest_client.token:
+                self._rest_client.token = token
+                self.user = user
+                self.set_custom_headers(user)
+                return wrapper(self, *args, **kwargs)
+            return _retry_with_new_token(self, *args, **kwargs)
+
+    def _retry_with_new_token(self, *args, **kwargs):
         for _ in range(LOGIN_RETRIES):
-            user, password = self._user_io.request_login(self._remote.name, self.user)
+            user, password = self._user_io.request_login(self.remote.name, self.user)
             token = None
             try:
                 token = self.authenticate(user, password)
@@ -84,28 +100,44 @@ def input_credentials_if_unauthorized(func):
     return wrapper
 
 
+class _RemoteLogin(threading.local):
+    """ Current remote and user, per thread as the RestApiClient remote state
+    """
+    def __init__(self):
+        self.remote = None
+        self.user = None
+
+
 class ConanApiAuthManager(object):
 
     def __init__(self, rest_client, user_io, localdb):
         self._user_io = user_io
         self._rest_client = rest_client
         self._localdb = localdb
-        self._remote = None
+        self._login = _RemoteLogin()
 
     @property
     def remote(self):
-        return self._remote
+        return self._login.remote
 
     @remote.setter
     def remote(self, remote):
-        self._remote = remote
+        self._login.remote = remote
         self._rest_client.remote_url = remote.url
         self._rest_client.verify_ssl = remote.verify_ssl
         self.user, self._rest_client.token = self._localdb.get_login(remote.url)
 
+    @property
+    def user(self):
+        return self._login.user
+
+    @user.setter
+    def user(self, user):
+        self._login.user = user
+
     def _store_login(self, login):
         try:
-            self._localdb.set_login(login, self._remote.url)
+            self._localdb.set_login(login, self.remote.url)
         except Exception as e:
             self._user_io.out.error(
                 'Your credentials could not be stored in local cache\n')
@@ -136,24 +168,29 @@ class ConanApiAuthManager(object):
         return self._rest_client.upload_package(package_reference, the_files, retry, retry_wait)
 
     @input_credentials_if_unauthorized
-    def get_conan_digest(self, conan_reference):
-        return self._rest_client.get_conan_digest(conan_reference)
+    def get_conan_digest(self, conan_reference, metadata_cache=None):
+        return self._rest_client.get_conan_digest(conan_reference, metadata_cache)
+
+    @input_credentials_if_unauthorized
+    def get_package_digest(self, package_reference, metadata_cache=None):
+        return self._rest_client.get_package_digest(package_reference, metadata_cache)
 
     @input_credentials_if_unauthorized
-    def get_package_digest(self, package_reference):
-        return self._rest_client.get_package_digest(package_reference)
+    def get_recipe(self, conan_reference, dest_folder, filter_function, blob_cache=None):
+        return self._rest_client.get_recipe(conan_reference, dest_folder, filter_function,
+                                            blob_cache)
 
     @input_credentials_if_unauthorized
-    def get_recipe(self, conan_reference, dest_folder, filter_function):
-        return self._rest_client.get_recipe(conan_reference, dest_folder, filter_function)
+    def get_package(self, package_reference, dest_folder, blob_cache=None):
+        return self._rest_client.get_package(package_reference, dest_folder, blob_cache)
 
     @input_credentials_if_unauthorized
-    def get_package(self, package_reference, dest_folder):
-        return self._rest_client.get_package(package_reference, dest_folder)
+    def get_package_info(self, package_reference, metadata_cache=None):
+        return self._rest_client.get_package_info(package_reference, metadata_cache)
 
     @input_credentials_if_unauthorized
-    def get_package_info(self, package_reference):
-        return self._rest_client.get_package_info(package_reference)
+    def get_packages_info(self, package_references, metadata_cache=None):
+        return self._rest_client.get_packages_info(package_references, metadata_cache)
 
     @input_credentials_if_unauthorized
     def search(self, pattern, ignorecase):
@@ -172,11 +209,11 @@ class ConanApiAuthManager(object):
         return self._rest_client.remove_packages(conan_reference, package_ids)
 
     def authenticate(self, user, password):
-        remote_url = self._remote.url
+        remote_url = self.remote.url
         prev_user = self._localdb.get_username(remote_url)
         prev_username = prev_user or "None (anonymous)"
         if not user:
-            self._user_io.out.info("Current '%s' user: %s" % (self._remote.name, prev_username))
+            self._user_io.out.info("Current '%s' user: %s" % (self.remote.name, prev_username))
         else:
             user = None if user.lower() == 'none' else user
             if user and password is not None:
@@ -185,11 +222,11 @@ class ConanApiAuthManager(object):
                 token = None
             if prev_user == user:
                 self._user_io.out.info("Current '%s' user already: %s"
-                                       % (self._remote.name, prev_username))
+                                       % (self.remote.name, prev_username))
             else:
                 username = user or "None (anonymous)"
                 self._user_io.out.info("Change '%s' user from %s to %s"
-                                       % (self._remote.name, prev_username, username))
+                                       % (self.remote.name, prev_username, username))
             self._localdb.set_login((user, token), remote_url)
             return token
 
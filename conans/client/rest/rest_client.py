@@ -2,19 +2,22 @@ from conans.errors import EXCEPTION_CODE_MAPPING, NotFoundException, ConanExcept
 from requests.auth import AuthBase, HTTPBasicAuth
 from conans.util.log import logger
 import json
-from conans.paths import CONAN_MANIFEST, CONANINFO
+from conans.paths import CONAN_MANIFEST, CONANINFO, PACKAGE_TGZ_NAME
 import time
 from conans.client.rest.differ import diff_snapshots
-from conans.util.files import decode_text, md5sum
+from conans.util.files import decode_text, exception_message_safe, mkdir
 import os
-from conans.model.manifest import FileTreeManifest
+import threading
+from conans.model.manifest import FileTreeManifest, checksum_files
 from conans.client.rest.uploader_downloader import Uploader, Downloader
 from conans.model.ref import ConanFileReference
 from six.moves.urllib.parse import urlsplit, parse_qs, urlencode
-from conans import COMPLEX_SEARCH_CAPABILITY
+from conans import COMPLEX_SEARCH_CAPABILITY, BATCH_PACKAGES_INFO_CAPABILITY
 from conans.search.search import filter_packages
 from conans.model.info import ConanInfo
 from conans.util.tracer import log_client_rest_api_call
+from conans.util.parallel import run_in_threads
+from conans.client.output import ScopedOutput
 
 
 def handle_return_deserializer(deserializer=None):
@@ -62,25 +65,62 @@ class JWTAuth(AuthBase):
         return request
 
 
+class _RemoteState(threading.local):
+    """ The remote and credentials in use. They are assigned before every call, so keeping
+    them per thread allows concurrent calls to different remotes with the same client
+    """
+    def __init__(self):
+        self.token = None
+        self.remote_url = None
+        self.custom_headers = {}  # Can set custom headers to each request
+        self.verify_ssl = True
+
+
 class RestApiClient(object):
     """
         Rest Api Client for handle remote.
     """
 
-    def __init__(self, output, requester):
+    def __init__(self, output, requester, parallel_transfers=1, stream_extract=False,
+                 download_retry=1, checksum_cache=None):
 
         # Set to instance
-        self.token = None
-        self.remote_url = None
-        self.custom_headers = {}  # Can set custom headers to each request
+        self._state = _RemoteState()
         self._output = output
         self.requester = requester
-        self._verify_ssl = True
+        # Max number of files of the same recipe or package transferred concurrently
+        self.parallel_transfers = parallel_transfers
+        # Extract the package tgz while downloading it, it is not stored
+        self.stream_extract = stream_extract
+        # Attempts to download a file, interrupted downloads are resumed
+        self.download_retry = download_retry
+        # Stored checksums of the local files, the unchanged ones are not read to diff them
+        self.checksum_cache = checksum_cache
+
+    @property
+    def token(self):
+        return self._state.token
+
+    @token.setter
+    def token(self, token):
+        self._state.token = token
+
+    @property
+    def remote_url(self):
+        return self._state.remote_url
+
+    @remote_url.setter
+    def remote_url(self, url):
+        self._state.remote_url = url
+
+    @property
+    def custom_headers(self):
+        return self._state.custom_headers
 
     @property
     def verify_ssl(self):
         from conans.client.rest import cacert
-        if self._verify_ssl:
+        if self._state.verify_ssl:
             # Necessary for pyinstaller, because it doesn't copy the cacert.
             # It should not be necessary anymore the own conan.io certificate (fixed in server)
             return cacert.file_path
@@ -90,60 +130,119 @@ class RestApiClient(object):
     @verify_ssl.setter
     def verify_ssl(self, check):
         assert(isinstance(check, bool))
-        self._verify_ssl = check
+        self._state.verify_ssl = check
 
     @property
     def auth(self):
         return JWTAuth(self.token)
 
-    def get_conan_digest(self, conan_reference):
+    def get_conan_digest(self, conan_reference, metadata_cache=None):
         """Gets a FileTreeManifest from conans"""
-
-        # Obtain the URLs
         url = "%s/conans/%s/digest" % (self._remote_api_url, "/".join(conan_reference))
-        urls = self._get_json(url)
-
-        # Get the digest
-        contents = self.download_files(urls)
-        # Unroll generator and decode shas (plain text)
-        contents = {key: decode_text(value) for key, value in dict(contents).items()}
-        return FileTreeManifest.loads(contents[CONAN_MANIFEST])
+        content = self._get_metadata_file(url, CONAN_MANIFEST, conan_reference, metadata_cache)
+        return FileTreeManifest.loads(content)
 
-    def get_package_digest(self, package_reference):
+    def get_package_digest(self, package_reference, metadata_cache=None):
         """Gets a FileTreeManifest from a package"""
-
-        # Obtain the URLs
         url = "%s/conans/%s/packages/%s/digest" % (self._remote_api_url,
                                                    "/".join(package_reference.conan),
                                                    package_reference.package_id)
-        urls = self._get_json(url)
+        content = self._get_metadata_file(url, CONAN_MANIFEST, package_reference,
+                                          metadata_cache)
+        return FileTreeManifest.loads(content)
 
-        # Get the digest
-        contents = self.download_files(urls)
-        # Unroll generator and decode shas (plain text)
-        contents = {key: decode_text(value) for key, value in dict(contents).items()}
-        return FileTreeManifest.loads(contents[CONAN_MANIFEST])
-
-    def get_package_info(self, package_reference):
+    def get_package_info(self, package_reference, metadata_cache=None):
         """Gets a ConanInfo file from a package"""
-
         url = "%s/conans/%s/packages/%s/download_urls" % (self._remote_api_url,
                                                           "/".join(package_reference.conan),
                                                           package_reference.package_id)
-        urls = self._get_json(url)
+        content = self._get_metadata_file(url, CONANINFO, package_reference, metadata_cache)
+        return ConanInfo.loads(content)
+
+    def _get_metadata_file(self, urls_url, filename, reference, metadata_cache):
+        """ Gets the text of a recipe or package file, from the metadata cache if it is fresh.
+        Otherwise it is downloaded, just if it has changed when there is a cached copy
+        param urls_url: url of the endpoint with the download urls of the file
+        """
+        entry = None
+        if metadata_cache:
+            entry = metadata_cache.get(self.remote_url, reference, filename)
+            if metadata_cache.is_fresh(entry):
+                return entry.content
+
+        urls = self._get_json(urls_url)
         if not urls:
             raise NotFoundException("Package not found!")
+        if filename not in urls:
+            raise NotFoundException("%s doesn't have the %s file!" % (str(reference), filename))
+
+        resource_url = urls[filename]
+        auth, _ = self._file_server_capabilities(resource_url)
+        headers = {"If-None-Match": entry.etag} if entry and entry.etag else None
+        response = self.requester.get(resource_url, auth=auth, headers=headers,
+                                      verify=self.verify_ssl)
+        if response.status_code == 304 and entry:
+            content, etag = entry.content, entry.etag
+        elif response.ok:
+            content, etag = decode_text(response.content), response.headers.get("ETag")
+        else:
+            response.charset = "utf-8"  # To be able to access ret.text (ret.content are bytes)
+            raise get_exception_from_error(response.status_code)(response.text)
+
+        if metadata_cache:
+            metadata_cache.put(self.remote_url, reference, filename, content, etag)
+        return content
+
+    def get_packages_info(self, package_references, metadata_cache=None):
+        """Gets the ConanInfo and the FileTreeManifest of several packages, in a single
+        request if the server supports it.
+        returns {package_reference: (ConanInfo, FileTreeManifest)}, without the missing packages.
+        The manifest is None if the server can't send them in batch"""
+        result = {}
+        if metadata_cache:  # The fresh ones are not requested
+            pending = []
+            for package_reference in package_references:
+                info, manifest = [metadata_cache.get(self.remote_url, package_reference, f)
+                                  for f in (CONANINFO, CONAN_MANIFEST)]
+                if metadata_cache.is_fresh(info) and metadata_cache.is_fresh(manifest):
+                    result[package_reference] = (ConanInfo.loads(info.content),
+                                                 FileTreeManifest.loads(manifest.content))
+                else:
+                    pending.append(package_reference)
+            package_references = pending
 
-        if CONANINFO not in urls:
-            raise NotFoundException("Package %s doesn't have the %s file!" % (package_reference,
-                                                                              CONANINFO))
-        # Get the info (in memory)
-        contents = self.download_files({CONANINFO: urls[CONANINFO]})
-        # Unroll generator and decode shas (plain text)
-        contents = {key: decode_text(value) for key, value in dict(contents).items()}
-        return ConanInfo.loads(contents[CONANINFO])
+        if not package_references:
+            return result
 
-    def get_recipe(self, conan_reference, dest_folder, filter_files_function):
+        try:
+            _, _, capabilities = self.server_info()
+        except NotFoundException:
+            capabilities = []
+
+        if BATCH_PACKAGES_INFO_CAPABILITY in capabilities:
+            url = "%s/conans/packages/info" % self._remote_api_url
+            payload = {"packages": [repr(ref) for ref in package_references]}
+            contents = self._get_json(url, data=payload)
+            for package_reference in package_references:
+                files = contents.get(repr(package_reference))
+                if files is None:
+                    continue
+                if metadata_cache:
+                    for filename in (CONANINFO, CONAN_MANIFEST):
+                        metadata_cache.put(self.remote_url, package_reference, filename,
+                                           files[filename])
+                result[package_reference] = (ConanInfo.loads(files[CONANINFO]),
+                                             FileTreeManifest.loads(files[CONAN_MANIFEST]))
+        else:
+            for package_reference in package_references:
+                try:
+                    info = self.get_package_info(package_reference, metadata_cache)
+                    result[package_reference] = (info, None)
+                except NotFoundException:
+                    pass
+        return result
+
+    def get_recipe(self, conan_reference, dest_folder, filter_files_function, blob_cache=None):
         """Gets a dict of filename:contents from conans"""
         # Get the conanfile snapshot first
         url = "%s/conans/%s/download_urls" % (self._remote_api_url, "/".join(conan_reference))
@@ -154,10 +253,11 @@ class RestApiClient(object):
             return None
 
         # TODO: Get fist an snapshot and compare files and download only required?
-        file_paths = self.download_files_to_folder(urls, dest_folder, self._output)
+        file_paths = self.download_files_to_folder(urls, dest_folder, self._output,
+                                                   blob_cache=blob_cache)
         return file_paths
 
-    def get_package(self, package_reference, dest_folder):
+    def get_package(self, package_reference, dest_folder, blob_cache=None):
         """Gets a dict of filename:contents from package"""
         url = "%s/conans/%s/packages/%s/download_urls" % (self._remote_api_url,
                                                           "/".join(package_reference.conan),
@@ -168,9 +268,17 @@ class RestApiClient(object):
         # TODO: Get fist an snapshot and compare files and download only required?
 
         # Download the resources
-        file_paths = self.download_files_to_folder(urls, dest_folder, self._output)
+        extract = [PACKAGE_TGZ_NAME] if self.stream_extract else None
+        file_paths = self.download_files_to_folder(urls, dest_folder, self._output,
+                                                   extract=extract, blob_cache=blob_cache)
         return file_paths
 
+    def _local_snapshot(self, the_files):
+        """ return {filename: md5} of the files to be uploaded
+        """
+        checksums = checksum_files(list(the_files.values()), ["md5"], self.checksum_cache)
+        return {filename: checksums[abs_path][0] for filename, abs_path in the_files.items()}
+
     def upload_conan(self, conan_reference, the_files, retry, retry_wait, ignore_deleted_file):
         """
         the_files: dict with relative_path: content
@@ -179,7 +287,7 @@ class RestApiClient(object):
 
         # Get the remote snapshot
         remote_snapshot = self._get_conan_snapshot(conan_reference)
-        local_snapshot = {filename: md5sum(abs_path) for filename, abs_path in the_files.items()}
+        local_snapshot = self._local_snapshot(the_files)
 
         # Get the diff
         new, modified, deleted = diff_snapshots(local_snapshot, remote_snapshot)
@@ -208,7 +316,7 @@ class RestApiClient(object):
         t1 = time.time()
         # Get the remote snapshot
         remote_snapshot = self._get_package_snapshot(package_reference)
-        local_snapshot = {filename: md5sum(abs_path) for filename, abs_path in the_files.items()}
+        local_snapshot = self._local_snapshot(the_files)
 
         # Get the diff
         new, modified, deleted = diff_snapshots(local_snapshot, remote_snapshot)
@@ -437,48 +545,130 @@ class RestApiClient(object):
                 output.writeln("")
             yield os.path.normpath(filename), contents
 
-    def download_files_to_folder(self, file_urls, to_folder, output=None):
+    def download_files_to_folder(self, file_urls, to_folder, output=None, extract=None,
+                                 blob_cache=None):
         """
         :param: file_urls is a dict with {filename: abs_path}
+        :param: extract is a list of tgz filenames, that are extracted in to_folder while
+                being downloaded, instead of saved. They are not returned
+        :param: blob_cache is a BlobCache, the tgz files are looked up there first by their
+                checksum, if the server declares it, and stored there once downloaded
 
         It writes downloaded files to disk (appending to file, only keeps chunks in memory)
         """
-        downloader = Downloader(self.requester, output, self.verify_ssl)
-        ret = {}
         # Take advantage of filenames ordering, so that conan_package.tgz and conan_export.tgz
         # can be < conanfile, conaninfo, and sent always the last, so smaller files go first
-        for filename, resource_url in sorted(file_urls.items(), reverse=True):
-            if output:
-                output.writeln("Downloading %s" % filename)
+        sorted_urls = sorted(file_urls.items(), reverse=True)
+        extract = extract or []
+        if self.parallel_transfers > 1 and len(sorted_urls) > 1:
+            return self._parallel_download_files_to_folder(sorted_urls, to_folder, output,
+                                                           extract, blob_cache)
+
+        downloader = Downloader(self.requester, output, self.verify_ssl)
+        ret = {}
+        for filename, resource_url in sorted_urls:
             auth, _ = self._file_server_capabilities(resource_url)
-            abs_path = os.path.join(to_folder, filename)
-            downloader.download(resource_url, abs_path, auth=auth)
-            if output:
-                output.writeln("")
-            ret[filename] = abs_path
+            abs_path = self._download_file_to_folder(downloader, filename, resource_url,
+                                                     to_folder, auth, filename in extract,
+                                                     blob_cache, output)
+            if abs_path:
+                ret[filename] = abs_path
         return ret
 
+    def _download_file_to_folder(self, downloader, filename, resource_url, to_folder, auth,
+                                 extract, blob_cache, output):
+        """ return the path of the file in to_folder, None if it was extracted there
+        """
+        abs_path = os.path.join(to_folder, filename)
+        checksum = None
+        if blob_cache and filename.endswith(".tgz"):
+            checksum = downloader.checksum(resource_url, auth=auth)
+            if checksum:
+                mkdir(to_folder)
+                if blob_cache.get(checksum, abs_path):
+                    if output:
+                        output.writeln("Got %s from blob cache" % filename)
+                    return abs_path
+                extract = False  # It has to be in disk to be stored in the blob cache
+
+        if output:
+            output.writeln("Downloading %s" % filename)
+        if extract:
+            downloader.download_extract(resource_url, to_folder, auth=auth,
+                                        retry=self.download_retry)
+            abs_path = None
+        else:
+            downloader.download(resource_url, abs_path, auth=auth, retry=self.download_retry)
+            if checksum:
+                blob_cache.put(checksum, abs_path)
+        if output:
+            output.writeln("")
+        return abs_path
+
+    def _parallel_download_files_to_folder(self, sorted_urls, to_folder, output, extract,
+                                           blob_cache):
+        """ Same as download_files_to_folder, but with up to 'parallel_transfers' files
+        being downloaded at the same time. Every file reports its own progress, scoped with
+        its name, and all the errors are reported together at the end
+        """
+        # The remote state is per thread, it has to be read before launching the workers
+        verify_ssl = self.verify_ssl
+        capabilities = {url: self._file_server_capabilities(url) for _, url in sorted_urls}
+
+        def download(item):
+            filename, resource_url = item
+            file_output = ScopedOutput(filename, output) if output else None
+            downloader = Downloader(self.requester, file_output, verify_ssl)
+            auth, _ = capabilities[resource_url]
+            return self._download_file_to_folder(downloader, filename, resource_url, to_folder,
+                                                 auth, filename in extract, blob_cache, output)
+
+        results = run_in_threads(download, sorted_urls, self.parallel_transfers)
+        failed = [(item[0], exc) for item, _, exc in results if exc is not None]
+        if failed:
+            if len(failed) == 1:
+                raise failed[0][1]
+            msg = "\n".join("%s: %s" % (filename, exception_message_safe(exc))
+                            for filename, exc in failed)
+            raise ConanException("Error downloading files:\n%s" % msg)
+        return {item[0]: abs_path for item, abs_path, _ in results if abs_path is not None}
+
     def upload_files(self, file_urls, files, output, retry, retry_wait):
         t1 = time.time()
-        failed = []
-        uploader = Uploader(self.requester, output, self.verify_ssl)
-        # Take advantage of filenames ordering, so that conan_package.tgz and conan_export.tgz
-        # can be < conanfile, conaninfo, and sent always the last, so smaller files go first
-        for filename, resource_url in sorted(file_urls.items(), reverse=True):
-            output.rewrite_line("Uploading %s" % filename)
-            auth, dedup = self._file_server_capabilities(resource_url)
+        parallel = self.parallel_transfers > 1 and len(file_urls) > 1
+        # The remote state is per thread, it has to be read before launching the workers
+        verify_ssl = self.verify_ssl
+        capabilities = {url: self._file_server_capabilities(url) for url in file_urls.values()}
+        uploader = Uploader(self.requester, output, verify_ssl)
+
+        def upload(item):
+            filename, resource_url = item
+            if parallel:
+                output.writeln("Uploading %s" % filename)
+                file_uploader = Uploader(self.requester, ScopedOutput(filename, output),
+                                         verify_ssl)
+            else:
+                output.rewrite_line("Uploading %s" % filename)
+                file_uploader = uploader
+            auth, dedup = capabilities[resource_url]
             try:
-                response = uploader.upload(resource_url, files[filename], auth=auth, dedup=dedup,
-                                           retry=retry, retry_wait=retry_wait)
+                response = file_uploader.upload(resource_url, files[filename], auth=auth,
+                                                dedup=dedup, retry=retry, retry_wait=retry_wait)
                 output.writeln("")
                 if not response.ok:
-                    output.error("\nError uploading file: %s, '%s'" % (filename, response.content))
-                    failed.append(filename)
-                else:
-                    pass
+                    output.error("\nError uploading file: %s, '%s'" % (filename,
+                                                                      response.content))
+                    return False
             except Exception as exc:
                 output.error("\nError uploading file: %s, '%s'" % (filename, exc))
-                failed.append(filename)
+                return False
+            return True
+
+        # Take advantage of filenames ordering, so that conan_package.tgz and conan_export.tgz
+        # can be < conanfile, conaninfo, and sent always the last, so smaller files go first
+        sorted_urls = sorted(file_urls.items(), reverse=True)
+        results = run_in_threads(upload, sorted_urls, self.parallel_transfers)
+        failed = [item[0] for item, uploaded, _ in results if not uploaded]
 
         if failed:
             raise ConanException("Execute upload again to retry upload the failed files: %s" % ", ".join(failed))
@@ -1,16 +1,35 @@
+import io
+import hashlib
 from conans.errors import ConanException, ConanConnectionError
 from conans.util.log import logger
 import traceback
-from conans.util.files import save, sha1sum, exception_message_safe
+from conans.util.files import sha1sum, exception_message_safe, tar_extract, mkdir, rmdir
 import os
 import time
 from conans.util.tracer import log_download
 
 
+# Where download_extract extracts the files until the whole download is validated
+EXTRACT_FOLDER = ".conan_extract"
+
+# Transfer buffers grow with the size of the file, within these limits
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def adaptive_chunk_size(total_size):
+    """ Around a hundred chunks per transfer, so the progress is still smooth, but
+    big files do not need thousands of python iterations
+    """
+    if not total_size:
+        return MIN_CHUNK_SIZE
+    return max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, total_size // 100))
+
+
 class Uploader(object):
 
-    def __init__(self, requester, output, verify, chunk_size=1000):
-        self.chunk_size = chunk_size
+    def __init__(self, requester, output, verify, chunk_size=None):
+        self.chunk_size = chunk_size  # None => adapted to the size of every file
         self.output = output
         self.requester = requester
         self.verify = verify
@@ -26,19 +45,18 @@ class Uploader(object):
 
         self.output.info("")
         # Actual transfer of the real content
-        it = load_in_chunks(abs_path, self.chunk_size)
-        # Now it is a chunked read file
         file_size = os.stat(abs_path).st_size
-        it = upload_with_progress(file_size, it, self.chunk_size, self.output)
-        # Now it will print progress in each iteration
-        iterable_to_file = IterableToFileAdapter(it, file_size)
-        # Now it is prepared to work with request
-        ret = call_with_retry(self.output, retry, retry_wait, self._upload_file, url,
-                              data=iterable_to_file, headers=None, auth=auth)
-
+        chunk_size = self.chunk_size or adaptive_chunk_size(file_size)
+        with io.open(abs_path, "rb") as file_handler:
+            # Now it is prepared to work with request, and will print progress while read
+            reader = FileReader(file_handler, file_size, chunk_size, self.output)
+            ret = call_with_retry(self.output, retry, retry_wait, self._upload_file, url,
+                                  data=reader, headers=None, auth=auth)
+        reader.progress.finish()
         return ret
 
     def _upload_file(self, url, data,  headers, auth):
+        data.rewind()  # A retry has to send the whole file again
         try:
             response = self.requester.put(url, data=data, verify=self.verify,
                                           headers=headers, auth=auth)
@@ -48,61 +66,72 @@ class Uploader(object):
         return response
 
 
-class IterableToFileAdapter(object):
-    def __init__(self, iterable, total_size):
-        self.iterator = iter(iterable)
+class FileReader(object):
+    """ File-like object to upload an already open file. It reads chunk_size blocks into
+    a single reusable buffer, returning views of it, so there are no copies. The size
+    requested to read() is ignored, http clients ask for too small blocks
+    """
+    def __init__(self, file_handler, total_size, chunk_size, output):
+        self._file = file_handler
         self.total_size = total_size
+        self._buffer = memoryview(bytearray(chunk_size))
+        self.progress = TransferProgress(output, total_size)
+
+    def rewind(self):
+        self._file.seek(0)
+        self.progress.reset()
 
     def read(self, size=-1):  # @UnusedVariable
-        return next(self.iterator, b'')
+        read = self._file.readinto(self._buffer)
+        if not read:
+            return b""
+        self.progress.update(read)
+        return self._buffer[:read]
 
     def __len__(self):
         return self.total_size
 
     def __iter__(self):
-        return self.iterator.__iter__()
-
-
-class upload_with_progress(object):
-    def __init__(self, totalsize, iterator, chunk_size, output):
-        self.totalsize = totalsize
-        self.output = output
-        self.aprox_chunks = self.totalsize * 1.0 / chunk_size
-        self.groups = iterator
-
-    def __iter__(self):
-        last_progress = None
-        for index, chunk in enumerate(self.groups):
-            if self.aprox_chunks == 0:
-                index = self.aprox_chunks
+        while True:
+            data = self.read()
+            if not data:
+                break
+            yield data
 
-            units = progress_units(index, self.aprox_chunks)
-            if last_progress != units:  # Avoid screen refresh if nothing has change
-                print_progress(self.output, units)
-                last_progress = units
-            yield chunk
 
-        print_progress(self.output, progress_units(100, 100))
+class TransferProgress(object):
+    """ Prints the progress of a transfer of total_size bytes, whatever the size of the
+    pieces being transferred. The screen is only refreshed when the progress bar changes
+    """
+    def __init__(self, output, total_size):
+        self._output = output
+        self.total_size = total_size
+        self._transferred = 0
+        self._last_units = None
 
-    def __len__(self):
-        return self.totalsize
+    def reset(self):
+        self._transferred = 0
+        self._last_units = None
 
+    def update(self, size):
+        self._transferred += size
+        if self._output and self.total_size:
+            units = progress_units(self._transferred, self.total_size)
+            if self._last_units != units:  # Avoid screen refresh if nothing has change
+                print_progress(self._output, units)
+                self._last_units = units
 
-def load_in_chunks(path, chunk_size=1024):
-    """Lazy function (generator) to read a file piece by piece.
-    Default chunk size: 1k."""
-    with open(path, 'rb') as file_object:
-        while True:
-            data = file_object.read(chunk_size)
-            if not data:
-                break
-            yield data
+    def finish(self):
+        units = progress_units(100, 100)
+        if self._output and self._last_units != units:
+            print_progress(self._output, units)
+            self._last_units = units
 
 
 class Downloader(object):
 
-    def __init__(self, requester, output, verify, chunk_size=1000):
-        self.chunk_size = chunk_size
+    def __init__(self, requester, output, verify, chunk_size=None):
+        self.chunk_size = chunk_size  # None => adapted to the size of every file
         self.output = output
         self.requester = requester
         self.verify = verify
@@ -114,60 +143,249 @@ class Downloader(object):
             raise ConanException("Error, the file to download already exists: '%s'" % file_path)
 
         t1 = time.time()
-        ret = bytearray()
-        response = call_with_retry(self.output, retry, retry_wait, self._download_file, url, auth)
-        if not response.ok:  # Do not retry if not found or whatever controlled error
-            raise ConanException("Error %d downloading file %s" % (response.status_code, url))
-
-        try:
-            total_length = response.headers.get('content-length')
+        if file_path:
+            self._download_resumable(url, file_path, auth, retry, retry_wait)
+            ret = None
+        else:
+            response = call_with_retry(self.output, retry, retry_wait, self._download_file,
+                                       url, auth)
+            if not response.ok:  # Do not retry if not found or whatever controlled error
+                raise ConanException("Error %d downloading file %s" % (response.status_code, url))
+            try:
+                total_length = response.headers.get('content-length')
+                total_length = int(total_length) if total_length is not None else None
+                progress = TransferProgress(self.output, total_length)
+                chunk_size = self.chunk_size or adaptive_chunk_size(total_length)
+                ret = bytearray()
+                for data in response.iter_content(chunk_size=chunk_size):
+                    ret.extend(data)
+                    progress.update(len(data))
+                ret = bytes(ret)
+            except Exception as e:
+                logger.debug(e.__class__)
+                logger.debug(traceback.format_exc())
+                # If this part failed, it means problems with the connection to server
+                raise ConanConnectionError("Download failed, check server, possibly try again\n%s"
+                                           % str(e))
+
+        duration = time.time() - t1
+        log_download(url, duration)
+        return ret
 
-            if total_length is None:  # no content length header
-                if not file_path:
-                    ret += response.content
-                else:
-                    save(file_path, response.content, append=True)
+    def _download_resumable(self, url, file_path, auth, retry, retry_wait):
+        """ The bytes are written to a "file_path.part" file, renamed to file_path once
+        complete and validated. If the connection is lost, the next attempts resume the
+        transfer from the bytes already received, with a HTTP Range request
+        """
+        part_path = file_path + ".part"
+        folder = os.path.dirname(file_path)
+        if folder:
+            mkdir(folder)
+        if os.path.exists(part_path):  # Leftover of another execution, could be anything
+            os.remove(part_path)
+
+        checksum = None
+        progress = TransferProgress(self.output, None)
+        for counter in range(retry):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            headers = {"Range": "bytes=%d-" % offset} if offset else None
+            try:
+                response = self._download_file(url, auth, headers)
+            except ConanException as exc:  # Connection error, the next attempt resumes
+                error = exc
             else:
-                dl = 0
-                total_length = int(total_length)
-                last_progress = None
-                chunk_size = 1024 if not file_path else 1024 * 100
+                if offset and response.status_code == 416:  # Nothing left, range not satisfiable
+                    break
+                if not response.ok:  # Do not retry if not found or whatever controlled error
+                    raise ConanException("Error %d downloading file %s"
+                                         % (response.status_code, url))
+                if response.status_code != 206:  # The server ignored the range, start again
+                    offset = 0
+                checksum = response.headers.get("X-Checksum-Sha1") or checksum
+                try:
+                    self._save_response(response, part_path, offset, progress)
+                    break
+                except ConanConnectionError as exc:
+                    error = exc
+            if counter == (retry - 1):
+                raise error
+            self.output.error(exception_message_safe(error))
+            self.output.info("Waiting %d seconds to retry..." % retry_wait)
+            time.sleep(retry_wait)
+
+        if checksum and sha1sum(part_path) != checksum.lower():
+            os.remove(part_path)
+            raise ConanException("Error downloading file %s: the sha1 checksum doesn't match "
+                                 "the one declared by the server" % url)
+        os.rename(part_path, file_path)
+
+    def _save_response(self, response, part_path, offset, progress):
+        """ Writes the response body in the .part file, from the given offset, checking that
+        all the announced bytes are received
+        """
+        try:
+            length = response.headers.get('content-length')
+            length = int(length) if length is not None else None
+            total_length = offset + length if length is not None else None
+            progress.reset()
+            progress.total_size = total_length
+            progress.update(offset)
+            chunk_size = self.chunk_size or adaptive_chunk_size(length)
+            received = 0
+            with open(part_path, "ab" if offset else "wb") as file_handler:
                 for data in response.iter_content(chunk_size=chunk_size):
-                    dl += len(data)
-                    if not file_path:
-                        ret.extend(data)
-                    else:
-                        save(file_path, data, append=True)
-
-                    units = progress_units(dl, total_length)
-                    if last_progress != units:  # Avoid screen refresh if nothing has change
-                        if self.output:
-                            print_progress(self.output, units)
-                        last_progress = units
-
-            duration = time.time() - t1
-            log_download(url, duration)
-
-            if not file_path:
-                return bytes(ret)
-            else:
-                return
+                    file_handler.write(data)
+                    received += len(data)
+                    progress.update(len(data))
         except Exception as e:
             logger.debug(e.__class__)
             logger.debug(traceback.format_exc())
             # If this part failed, it means problems with the connection to server
             raise ConanConnectionError("Download failed, check server, possibly try again\n%s"
                                        % str(e))
+        if length is not None and received != length:
+            raise ConanConnectionError("Download failed, incomplete transfer: %d of %d bytes"
+                                       % (offset + received, total_length))
+
+    def download_extract(self, url, dest_folder, auth=None, retry=1, retry_wait=0):
+        """ Downloads a tgz file, extracting its contents in dest_folder while the bytes
+        arrive, so the compressed file is never written to disk. They are extracted in a
+        temporary subfolder, moved to dest_folder once the whole file is received and matches
+        the sha1 declared by the server, so a failed attempt is retried from scratch
+        """
+        t1 = time.time()
+        tmp_folder = os.path.join(dest_folder, EXTRACT_FOLDER)
+        try:
+            for counter in range(retry):
+                rmdir(tmp_folder)
+                try:
+                    response = self._download_file(url, auth)
+                except ConanException as exc:  # Connection error
+                    error = exc
+                else:
+                    if not response.ok:  # Do not retry if not found or whatever controlled error
+                        raise ConanException("Error %d downloading file %s"
+                                             % (response.status_code, url))
+                    reader = ResponseReader(response, self.output, self.chunk_size)
+                    try:
+                        # Downloaded files are new for the build systems, Issue #214
+                        tar_extract(reader, tmp_folder, stream=True, mtime=time.time())
+                        reader.read()  # What is left after the last member, to check it all
+                        break
+                    except ConanConnectionError as exc:
+                        error = exc
+                    except ConanException:
+                        raise
+                    except Exception as e:
+                        logger.debug(traceback.format_exc())
+                        raise ConanException("Error while downloading/extracting files to %s\n%s"
+                                             % (dest_folder, str(e)))
+                if counter == (retry - 1):
+                    raise error
+                self.output.error(exception_message_safe(error))
+                self.output.info("Waiting %d seconds to retry..." % retry_wait)
+                time.sleep(retry_wait)
+
+            checksum = response.headers.get("X-Checksum-Sha1")
+            if checksum and reader.sha1 != checksum.lower():
+                raise ConanException("Error downloading file %s: the sha1 checksum doesn't match "
+                                     "the one declared by the server" % url)
+            _move_contents(tmp_folder, dest_folder)
+        except BaseException:
+            rmdir(tmp_folder)
+            raise
+        duration = time.time() - t1
+        log_download(url, duration)
+
+    def checksum(self, url, auth=None):
+        """ The sha1 of the file, if the server declares it, without downloading it
+        """
+        try:
+            response = self.requester.head(url, verify=self.verify, auth=auth)
+        except Exception as exc:
+            logger.debug("Error getting checksum of %s: %s" % (url, str(exc)))
+            return None
+        if not response.ok:
+            return None
+        return response.headers.get("X-Checksum-Sha1")
 
-    def _download_file(self, url, auth):
+    def _download_file(self, url, auth, headers=None):
         try:
-            response = self.requester.get(url, stream=True, verify=self.verify, auth=auth)
+            response = self.requester.get(url, stream=True, verify=self.verify, auth=auth,
+                                          headers=headers)
         except Exception as exc:
             raise ConanException("Error downloading file %s: '%s'" % (url, exception_message_safe(exc)))
 
         return response
 
 
+class ResponseReader(object):
+    """ Read-only file-like view of a streamed response, so it can be consumed while being
+    downloaded. Prints the progress of the download if the size is known
+    """
+    def __init__(self, response, output, chunk_size=None):
+        total_length = response.headers.get('content-length')
+        total_length = int(total_length) if total_length is not None else None
+        chunk_size = chunk_size or adaptive_chunk_size(total_length)
+        self._chunks = iter(response.iter_content(chunk_size=chunk_size))
+        self._buffer = bytearray()
+        self._progress = TransferProgress(output, total_length)
+        self._total_length = total_length
+        self._received = 0
+        self._sha1 = hashlib.sha1()
+
+    @property
+    def sha1(self):
+        """ of the bytes received so far
+        """
+        return self._sha1.hexdigest()
+
+    def read(self, size=-1):
+        chunk = b""
+        try:
+            while size < 0 or len(self._buffer) < size:
+                chunk = next(self._chunks, None)
+                if not chunk:
+                    if chunk is None:
+                        break
+                    continue
+                self._buffer.extend(chunk)
+                self._received += len(chunk)
+                self._sha1.update(chunk)
+        except Exception as e:
+            logger.debug(traceback.format_exc())
+            raise ConanConnectionError("Download failed, check server, possibly try again\n%s"
+                                       % str(e))
+        if chunk is None and self._total_length is not None and \
+                self._received < self._total_length:
+            raise ConanConnectionError("Download failed, incomplete transfer: %d of %d bytes"
+                                       % (self._received, self._total_length))
+
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self._progress.update(len(data))
+        return data
+
+
+def _move_contents(src_folder, dst_folder):
+    """ moves the files of src_folder to dst_folder, merging the existing subfolders, and
+    removes src_folder
+    """
+    for name in os.listdir(src_folder):
+        src = os.path.join(src_folder, name)
+        dst = os.path.join(dst_folder, name)
+        if os.path.isdir(dst) and not os.path.islink(dst) and os.path.isdir(src) and \
+                not os.path.islink(src):
+            _move_contents(src, dst)
+            continue
+        if os.path.lexists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+    os.rmdir(src_folder)
+
+
 def progress_units(progress, total):
     return int(50 * progress / total)
 
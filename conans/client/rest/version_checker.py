@@ -21,6 +21,13 @@ class VersionCheckerRequester(object):
         self._handle_ret(ret)
         return ret
 
+    def head(self, url, auth=None, headers=None, verify=None):
+        headers = headers or {}
+        headers['X-Conan-Client-Version'] = str(self.client_version)
+        ret = self.requester.head(url, auth=auth, headers=headers, verify=verify)
+        self._handle_ret(ret)
+        return ret
+
     def put(self, url, data, headers=None, verify=None, auth=None):
         headers = headers or {}
         headers['X-Conan-Client-Version'] = str(self.client_version)
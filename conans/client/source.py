@@ -2,14 +2,17 @@ from conans.paths import DIRTY_FILE, EXPORT_SOURCES_DIR, EXPORT_TGZ_NAME, EXPORT
     CONANFILE
 import os
 from conans.util.files import rmdir, save
+from conans.util.staging import stage_tree, COPY, HARDLINK, SYMLINK
 import six
 from conans.errors import ConanException, format_conanfile_exception
 import shutil
 
 
-def config_source(export_folder, src_folder, conan_file, output, force=False):
+def config_source(export_folder, src_folder, conan_file, output, force=False, staging=COPY):
     """ creates src folder and retrieve, calling source() from conanfile
     the necessary source code
+    param staging: how the export folder files are brought to the src folder. They are never
+    linked, source() could modify the exported files through the links
     """
     dirty = os.path.join(src_folder, DIRTY_FILE)
 
@@ -39,7 +42,7 @@ def config_source(export_folder, src_folder, conan_file, output, force=False):
 
     if not os.path.exists(src_folder):
         output.info('Configuring sources in %s' % src_folder)
-        shutil.copytree(export_folder, src_folder, symlinks=True)
+        stage_tree(export_folder, src_folder, COPY if staging in (HARDLINK, SYMLINK) else staging)
         # Now move the export-sources to the right location
         source_sources_folder = os.path.join(src_folder, EXPORT_SOURCES_DIR)
         if os.path.exists(source_sources_folder):
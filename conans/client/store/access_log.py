@@ -0,0 +1,95 @@
+import time
+from conans.client.store.sqlite import SQLiteDB
+from conans.util.log import logger
+
+ACCESS_TABLE = "access"
+
+# The kinds of folders of the local cache that are garbage collected
+PACKAGES = "packages"
+BUILDS = "builds"
+SOURCES = "sources"
+FOLDER_KINDS = (PACKAGES, BUILDS, SOURCES)
+
+
+class AccessLog(SQLiteDB):
+    """ When the package, build and source folders of the local cache were used for the last
+    time, for the garbage collection of the least recently used ones.
+    The entries are keyed by kind and reference, str(PackageReference) for packages and builds,
+    str(ConanFileReference) for sources
+    """
+
+    def __init__(self, dbfile):
+        super(AccessLog, self).__init__(dbfile)
+        self.connect()
+        self.init()
+
+    def init(self):
+        with self.lock:
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute("create table if not exists %s (kind TEXT, reference TEXT, "
+                               "last_access REAL, PRIMARY KEY (kind, reference))"
+                               % ACCESS_TABLE)
+                self.connection.commit()
+            finally:
+                cursor.close()
+
+    def _execute(self, function):
+        with self.lock:
+            cursor = self.connection.cursor()
+            try:
+                ret = function(cursor)
+                self.connection.commit()
+                return ret
+            except Exception:
+                self.connection.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def touch(self, accesses, timestamp=None):
+        """ param accesses: [(kind, reference)] of the folders just used
+        """
+        timestamp = timestamp or time.time()
+        rows = [(kind, str(reference)) for kind, reference in set(accesses)]
+
+        def touch(cursor):
+            cursor.executemany("insert or ignore into %s (kind, reference) values (?, ?)"
+                               % ACCESS_TABLE, rows)
+            cursor.executemany("update %s set last_access = ? where kind = ? and reference = ?"
+                               % ACCESS_TABLE, [(timestamp, kind, ref) for kind, ref in rows])
+        try:
+            self._execute(touch)
+        except Exception as e:
+            logger.warn("Could not record the access to the local cache: %s" % str(e))
+
+    def entries(self, kind):
+        """ return {reference string: last access time} of the known folders of that kind
+        """
+        def entries(cursor):
+            cursor.execute("select reference, last_access from %s where kind = ?"
+                           % ACCESS_TABLE, (kind, ))
+            return dict(cursor.fetchall())
+        return self._execute(entries)
+
+    def update(self, kind, last_accesses):
+        """ param last_accesses: {reference string: time}, stores them unless the recorded
+        ones are more recent
+        """
+        rows = [(ref, kind, last_access) for ref, last_access in last_accesses.items()]
+
+        def update(cursor):
+            cursor.executemany("insert or ignore into %s (reference, kind) values (?, ?)"
+                               % ACCESS_TABLE, [row[:2] for row in rows])
+            cursor.executemany("update %s set last_access = max(ifnull(last_access, 0), ?) "
+                               "where reference = ? and kind = ?"
+                               % ACCESS_TABLE, [row[2:] + row[:2] for row in rows])
+        self._execute(update)
+
+    def forget(self, kind, references):
+        """ removes the entries of the given reference strings
+        """
+        def forget(cursor):
+            cursor.executemany("delete from %s where kind = ? and reference = ?" % ACCESS_TABLE,
+                               [(kind, ref) for ref in references])
+        self._execute(forget)
@@ -0,0 +1,108 @@
+import os
+import re
+import shutil
+import time
+import uuid
+import fasteners
+from conans.util.files import mkdir
+from conans.util.log import logger
+
+
+_SHA1_RE = re.compile("^[0-9a-f]{40}$")
+
+
+class BlobCache(object):
+    """ Machine wide content-addressed store of downloaded archives (conan_package.tgz,
+    conan_export.tgz...), keyed by their sha1. It can be shared by several conan user homes,
+    and avoids downloading again the same archives, for example after a "conan remove".
+    The least recently used blobs are removed when the store exceeds max_size (MB)
+    """
+
+    def __init__(self, folder, max_size):
+        self._folder = folder
+        self._max_size = max_size * 1024 * 1024
+
+    def _blob_path(self, checksum):
+        return os.path.join(self._folder, checksum[:2], checksum)
+
+    def get(self, checksum, dest_path):
+        """ Places the blob with the given sha1 in dest_path, linking it if possible.
+        return True if found, False otherwise
+        """
+        checksum = checksum.lower()
+        if not _SHA1_RE.match(checksum):
+            return False
+        blob_path = self._blob_path(checksum)
+        try:
+            os.utime(blob_path, None)  # Mark it as recently used
+            _link_or_copy(blob_path, dest_path)
+            return True
+        except (IOError, OSError):  # Not there, or just evicted by other process
+            return False
+
+    def put(self, checksum, src_path):
+        """ Stores a copy of src_path, which contents have the given sha1
+        """
+        checksum = checksum.lower()
+        if not _SHA1_RE.match(checksum):
+            return
+        blob_path = self._blob_path(checksum)
+        if os.path.exists(blob_path):
+            return
+        try:
+            mkdir(os.path.dirname(blob_path))
+            # Other processes could be reading the store, make the blob appear atomically
+            tmp_path = "%s.%s.tmp" % (blob_path, uuid.uuid4().hex)
+            _link_or_copy(src_path, tmp_path)
+            os.rename(tmp_path, blob_path)
+        except (IOError, OSError) as e:
+            logger.warn("Could not store %s in blob cache: %s" % (src_path, str(e)))
+            return
+        self.evict()
+
+    def evict(self):
+        """ Removes the least recently used blobs, until the total size fits in max_size
+        """
+        with fasteners.InterProcessLock(os.path.join(self._folder, ".lock"), logger=logger):
+            blobs = []
+            total_size = 0
+            for subdir in os.listdir(self._folder):
+                subdir_path = os.path.join(self._folder, subdir)
+                if not os.path.isdir(subdir_path):
+                    continue
+                for name in os.listdir(subdir_path):
+                    path = os.path.join(subdir_path, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    if name.endswith(".tmp"):
+                        # Leftover of a killed process, or being written right now
+                        if stat.st_mtime < time.time() - 3600:
+                            _remove(path)
+                        continue
+                    blobs.append((stat.st_mtime, stat.st_size, path))
+                    total_size += stat.st_size
+
+            for _, size, path in sorted(blobs):
+                if total_size <= self._max_size:
+                    break
+                if _remove(path):
+                    total_size -= size
+
+
+def _link_or_copy(src, dst):
+    """ A hard link is cheaper, and the archives are never modified, just read or removed
+    """
+    try:
+        os.link(src, dst)
+    except (AttributeError, OSError):  # Not supported (py2 Windows) or other filesystem
+        shutil.copyfile(src, dst)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
@@ -0,0 +1,178 @@
+import os
+import json
+from conans.client.store.sqlite import SQLiteDB
+from conans.errors import ConanException
+from conans.model.info import ConanInfo
+from conans.model.ref import ConanFileReference, PackageReference
+from conans.paths import CONANINFO
+from conans.search.search import DiskSearchManager
+from conans.util.files import list_folder_subdirs, load
+from conans.util.log import logger
+
+RECIPES_TABLE = "recipes"
+PACKAGES_TABLE = "packages"
+STATE_TABLE = "catalog_state"
+
+
+def _info_stat(info_path):
+    """ What identifies a version of a conaninfo.txt: (size, mtime in ns)
+    """
+    stat = os.stat(info_path)
+    return stat.st_size, getattr(stat, "st_mtime_ns", None) or int(stat.st_mtime * 1e9)
+
+
+class CacheCatalog(SQLiteDB):
+    """ Index of the recipes and binary packages of the local cache, with the conaninfo of every
+    package, so the searches don't have to walk the store and parse all the conaninfo.txt.
+    The commands that modify the store update the references they touched, if it is ever out
+    of sync, "conan search --rebuild-index" builds it again from the store contents
+    """
+
+    def __init__(self, dbfile, paths):
+        super(CacheCatalog, self).__init__(dbfile)
+        self._paths = paths
+        self.connect()
+        self.init()
+
+    def init(self):
+        with self.lock:
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute("create table if not exists %s (reference TEXT PRIMARY KEY)"
+                               % RECIPES_TABLE)
+                cursor.execute("create table if not exists %s (reference TEXT, package_id TEXT, "
+                               "size INTEGER, mtime INTEGER, info TEXT, "
+                               "PRIMARY KEY (reference, package_id))" % PACKAGES_TABLE)
+                cursor.execute("create table if not exists %s (key TEXT PRIMARY KEY, value TEXT)"
+                               % STATE_TABLE)
+                self.connection.commit()
+            except Exception as e:
+                raise ConanException("Could not initialize the cache catalog", e)
+            finally:
+                cursor.close()
+
+    def _is_built(self, cursor):
+        cursor.execute("select value from %s where key = 'built'" % STATE_TABLE)
+        return cursor.fetchone() is not None
+
+    def _transaction(self, function):
+        """ Runs function(cursor) in a single transaction, so other processes never see
+        a half updated catalog
+        """
+        with self.lock:
+            cursor = self.connection.cursor()
+            try:
+                ret = function(cursor)
+                self.connection.commit()
+                return ret
+            except Exception:
+                self.connection.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def _sync_reference(self, cursor, conan_ref):
+        """ Makes the entries of a reference match the store contents. Only the conaninfo.txt
+        of the new or modified packages are parsed
+        """
+        ref_str = str(conan_ref)
+        if not os.path.isdir(self._paths.conan(conan_ref)):
+            cursor.execute("delete from %s where reference = ?" % RECIPES_TABLE, (ref_str, ))
+            cursor.execute("delete from %s where reference = ?" % PACKAGES_TABLE, (ref_str, ))
+            return
+        cursor.execute("insert or ignore into %s values (?)" % RECIPES_TABLE, (ref_str, ))
+
+        cursor.execute("select package_id, size, mtime from %s where reference = ?"
+                       % PACKAGES_TABLE, (ref_str, ))
+        indexed = {package_id: (size, mtime) for package_id, size, mtime in cursor.fetchall()}
+        package_ids = self._paths.conan_packages(conan_ref)
+        removed = [(ref_str, package_id) for package_id in indexed
+                   if package_id not in package_ids]
+        cursor.executemany("delete from %s where reference = ? and package_id = ?"
+                           % PACKAGES_TABLE, removed)
+
+        for package_id in package_ids:
+            package_ref = PackageReference(conan_ref, package_id)
+            info_path = os.path.join(self._paths.package(package_ref, short_paths=None),
+                                     CONANINFO)
+            try:
+                stat = _info_stat(info_path)
+            except OSError:
+                stat = None
+            if stat is not None and indexed.get(package_id) == stat:
+                continue
+            info = None
+            try:
+                info = json.dumps(ConanInfo.loads(load(info_path)).serialize_min())
+            except Exception as exc:
+                logger.error("Package %s has not ConanInfo file" % str(package_ref))
+                if str(exc):
+                    logger.error(str(exc))
+            size, mtime = stat or (None, None)
+            cursor.execute("insert or replace into %s values (?, ?, ?, ?, ?)" % PACKAGES_TABLE,
+                           (ref_str, package_id, size, mtime, info))
+
+    def _rebuild(self, cursor):
+        cursor.execute("delete from %s" % RECIPES_TABLE)
+        cursor.execute("delete from %s" % PACKAGES_TABLE)
+        for folder in list_folder_subdirs(self._paths.store, level=4):
+            try:
+                conan_ref = ConanFileReference(*folder.split("/"))
+            except Exception:
+                continue
+            self._sync_reference(cursor, conan_ref)
+        cursor.execute("insert or replace into %s values ('built', '1')" % STATE_TABLE)
+
+    def rebuild(self):
+        """ Discards the indexed data and reads again the whole store
+        """
+        self._transaction(self._rebuild)
+
+    def update(self, conan_refs):
+        """ To be called after modifying the recipes or packages of the given references
+        in the store. Nothing to do if the catalog has never been built, the first search will
+        read the whole store anyway
+        """
+        def update(cursor):
+            if self._is_built(cursor):
+                for conan_ref in conan_refs:
+                    self._sync_reference(cursor, conan_ref)
+        self._transaction(update)
+
+    def _ensure_built(self, cursor):
+        if not self._is_built(cursor):
+            self._rebuild(cursor)
+
+    def references(self):
+        """ return the list of the "name/version/user/channel" of the stored recipes
+        """
+        def references(cursor):
+            self._ensure_built(cursor)
+            cursor.execute("select reference from %s" % RECIPES_TABLE)
+            return [ref_str.replace("@", "/") for (ref_str, ) in cursor.fetchall()]
+        return self._transaction(references)
+
+    def package_infos(self, conan_ref):
+        """ return {package_id: conaninfo.serialize_min()} of the stored packages of a recipe
+        """
+        def package_infos(cursor):
+            self._ensure_built(cursor)
+            cursor.execute("select package_id, info from %s where reference = ? and "
+                           "info is not null" % PACKAGES_TABLE, (str(conan_ref), ))
+            return {package_id: json.loads(info) for package_id, info in cursor.fetchall()}
+        return self._transaction(package_infos)
+
+
+class CatalogSearchManager(DiskSearchManager):
+    """ Answers the local searches with the CacheCatalog instead of reading the store
+    """
+
+    def __init__(self, paths, catalog):
+        super(CatalogSearchManager, self).__init__(paths, None)
+        self._catalog = catalog
+
+    def _stored_references(self):
+        return self._catalog.references()
+
+    def _get_local_infos_min(self, reference):
+        return self._catalog.package_infos(reference)
@@ -0,0 +1,103 @@
+import os
+import time
+from conans.client.store.sqlite import SQLiteDB
+from conans.util.log import logger
+
+CHECKSUMS_TABLE = "checksums"
+# Files modified so recently could change again without changing its stat (coarse timestamps)
+_RACY_SECONDS = 2
+# Beyond that, the entries of the files that no longer exist are removed
+_MAX_ENTRIES = 200000
+
+
+def file_stat_key(file_path):
+    """ What identifies a version of a file: (size, mtime in ns, inode)
+    """
+    stat = os.stat(file_path)
+    mtime = getattr(stat, "st_mtime_ns", None) or int(stat.st_mtime * 1e9)
+    return stat.st_size, mtime, stat.st_ino
+
+
+class ChecksumCache(SQLiteDB):
+    """ Persistent cache of the checksums of the files of the local cache, so the manifests
+    of the unchanged recipes and packages can be checked without reading them again.
+    The files whose size, mtime or inode changed are hashed again
+    """
+
+    def __init__(self, dbfile):
+        super(ChecksumCache, self).__init__(dbfile)
+        self.connect()
+        self.init()
+
+    def init(self):
+        with self.lock:
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute("create table if not exists %s (path TEXT, algorithm TEXT, "
+                               "size INTEGER, mtime INTEGER, inode INTEGER, digest TEXT, "
+                               "PRIMARY KEY (path, algorithm))" % CHECKSUMS_TABLE)
+                self.connection.commit()
+            finally:
+                cursor.close()
+
+    def lookup(self, file_paths, algorithms):
+        """ return ({path: [digest for every algorithm]} of the unchanged files,
+                    {path: stat_key} of all of them, to store the new checksums later)
+        """
+        stat_keys = {path: file_stat_key(path) for path in file_paths}
+        found = {}
+        paths = list(stat_keys.keys())
+        try:
+            with self.lock:
+                cursor = self.connection.cursor()
+                try:
+                    for i in range(0, len(paths), 500):  # Limit of sql variables
+                        chunk = paths[i:i + 500]
+                        cursor.execute("select path, algorithm, size, mtime, inode, digest "
+                                       "from %s where path in (%s)"
+                                       % (CHECKSUMS_TABLE, ",".join("?" * len(chunk))), chunk)
+                        for path, algorithm, size, mtime, inode, digest in cursor.fetchall():
+                            if (size, mtime, inode) == stat_keys[path]:
+                                found.setdefault(path, {})[algorithm] = digest
+                finally:
+                    cursor.close()
+        except Exception as e:
+            logger.warn("Could not read the checksums cache: %s" % str(e))
+            return {}, stat_keys
+
+        ret = {}
+        for path, digests in found.items():
+            if all(algorithm in digests for algorithm in algorithms):
+                ret[path] = [digests[algorithm] for algorithm in algorithms]
+        return ret, stat_keys
+
+    def store(self, checksums, stat_keys, algorithms):
+        """ param checksums: {path: [digest for every algorithm]}
+            param stat_keys: {path: stat_key} of the files before they were hashed
+        """
+        limit = (time.time() - _RACY_SECONDS) * 1e9
+        rows = [(path, algorithm, stat_keys[path][0], stat_keys[path][1], stat_keys[path][2],
+                 digest)
+                for path, digests in checksums.items() if stat_keys[path][1] < limit
+                for algorithm, digest in zip(algorithms, digests)]
+        if not rows:
+            return
+        try:
+            with self.lock:
+                cursor = self.connection.cursor()
+                try:
+                    cursor.executemany("insert or replace into %s values (?, ?, ?, ?, ?, ?)"
+                                       % CHECKSUMS_TABLE, rows)
+                    cursor.execute("select count(*) from %s" % CHECKSUMS_TABLE)
+                    if cursor.fetchone()[0] > _MAX_ENTRIES:
+                        self._prune(cursor)
+                    self.connection.commit()
+                finally:
+                    cursor.close()
+        except Exception as e:
+            logger.warn("Could not write the checksums cache: %s" % str(e))
+
+    def _prune(self, cursor):
+        cursor.execute("select distinct path from %s" % CHECKSUMS_TABLE)
+        removed = [(path, ) for (path, ) in cursor.fetchall() if not os.path.exists(path)]
+        cursor.executemany("delete from %s where path = ?" % CHECKSUMS_TABLE, removed)
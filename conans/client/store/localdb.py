@@ -32,10 +32,11 @@ class LocalDB(SQLiteDB):
         This method is also in charge of expiring them.
         '''
         try:
-            statement = self.connection.cursor()
-            statement.execute('select user, token from %s where remote_url="%s"'
-                              % (REMOTES_USER_TABLE, remote_url))
-            rs = statement.fetchone()
+            with self.lock:
+                statement = self.connection.cursor()
+                statement.execute('select user, token from %s where remote_url="%s"'
+                                  % (REMOTES_USER_TABLE, remote_url))
+                rs = statement.fetchone()
             if not rs:
                 return None, None
             name = rs[0]
@@ -50,10 +51,11 @@ class LocalDB(SQLiteDB):
     def set_login(self, login, remote_url):
         """Login is a tuple of (user, token)"""
         try:
-            statement = self.connection.cursor()
-            statement.execute("INSERT OR REPLACE INTO %s (remote_url, user, token) "
-                              "VALUES (?, ?, ?)" % REMOTES_USER_TABLE,
-                              (remote_url, login[0], login[1]))
-            self.connection.commit()
+            with self.lock:
+                statement = self.connection.cursor()
+                statement.execute("INSERT OR REPLACE INTO %s (remote_url, user, token) "
+                                  "VALUES (?, ?, ?)" % REMOTES_USER_TABLE,
+                                  (remote_url, login[0], login[1]))
+                self.connection.commit()
         except Exception as e:
             raise ConanException("Could not store credentials %s" % str(e))
@@ -0,0 +1,72 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+from conans.model.ref import PackageReference
+from conans.util.files import load, save, rmdir
+from conans.util.log import logger
+
+
+class MetadataEntry(object):
+
+    def __init__(self, content, etag, timestamp):
+        self.content = content
+        self.etag = etag
+        self.timestamp = timestamp
+
+
+class RemoteMetadataCache(object):
+    """ Persistent cache of the small metadata files of the remotes (recipe and package
+    manifests, conaninfo), so "install -u" doesn't ask the remotes again and again for the same
+    data. The entries younger than ttl (seconds) are used without any request, the older ones
+    have to be revalidated with a conditional request (ETag)
+    """
+
+    def __init__(self, folder, ttl):
+        self._folder = folder
+        self._ttl = ttl
+
+    def _reference_folder(self, remote_url, conan_reference):
+        remote_folder = hashlib.md5(remote_url.rstrip("/").encode()).hexdigest()
+        return os.path.join(self._folder, remote_folder, "/".join(conan_reference))
+
+    def _entry_path(self, remote_url, reference, filename):
+        if isinstance(reference, PackageReference):
+            return os.path.join(self._reference_folder(remote_url, reference.conan),
+                                "package", reference.package_id, filename)
+        return os.path.join(self._reference_folder(remote_url, reference), "export", filename)
+
+    def get(self, remote_url, reference, filename):
+        """ return the MetadataEntry of the file of the given ConanFileReference or
+        PackageReference, None if not cached
+        """
+        try:
+            data = json.loads(load(self._entry_path(remote_url, reference, filename)))
+            return MetadataEntry(data["content"], data["etag"], data["timestamp"])
+        except (IOError, OSError, ValueError, KeyError):
+            return None
+
+    def is_fresh(self, entry):
+        return entry is not None and 0 <= time.time() - entry.timestamp < self._ttl
+
+    def put(self, remote_url, reference, filename, content, etag=None):
+        path = self._entry_path(remote_url, reference, filename)
+        data = json.dumps({"content": content, "etag": etag, "timestamp": time.time()})
+        # Other processes could be reading it, make it appear atomically
+        tmp_path = "%s.%s.tmp" % (path, uuid.uuid4().hex)
+        try:
+            save(tmp_path, data)
+            try:
+                os.rename(tmp_path, path)
+            except OSError:  # Windows doesn't replace existing files
+                os.remove(path)
+                os.rename(tmp_path, path)
+        except (IOError, OSError) as e:
+            logger.warn("Could not cache %s metadata: %s" % (path, str(e)))
+
+    def invalidate(self, remote_url, conan_reference):
+        """ Removes everything cached of a recipe and its packages, after they are uploaded or
+        removed from the remote
+        """
+        rmdir(self._reference_folder(remote_url, conan_reference))
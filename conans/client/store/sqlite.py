@@ -1,5 +1,6 @@
 import sqlite3
 import os
+import threading
 from conans.errors import ConanException
 
 
@@ -12,11 +13,14 @@ class SQLiteDB(object):
             dbfile = open(dbfile_path, 'w+')
             dbfile.close()
         self.dbfile = dbfile_path
+        # The connection can be shared by several threads, but not used concurrently
+        self.lock = threading.RLock()
 
     def connect(self):
         try:
             self.connection = sqlite3.connect(self.dbfile,
-                                              detect_types=sqlite3.PARSE_DECLTYPES)
+                                              detect_types=sqlite3.PARSE_DECLTYPES,
+                                              check_same_thread=False)
             self.connection.text_factory = str
             statement = None
             try:
@@ -1,5 +1,10 @@
 import os
+from collections import OrderedDict
+from multiprocessing import Pool, cpu_count
+from multiprocessing.pool import ThreadPool
+from conans.client.remote_manager import compress_package
 from conans.errors import ConanException, NotFoundException
+from conans.util.files import exception_message_safe
 from conans.model.ref import PackageReference, is_a_reference,\
     ConanFileReference
 from conans.util.log import logger
@@ -32,6 +37,15 @@ class ConanUploader(object):
         if not references:
             raise NotFoundException("No packages found matching pattern '%s'" % pattern)
 
+        workers = self._paths.conan_config.parallel_uploads
+        if workers > 1 and (all_packages or len(references) > 1):
+            if not confirm:
+                references = [conan_ref for conan_ref in references
+                              if self._user_io.request_boolean("Are you sure you want to "
+                                                               "upload '%s'?" % str(conan_ref))]
+            self._parallel_upload(references, force, all_packages, retry, retry_wait, workers)
+            return
+
         for conan_ref in references:
             upload = True
             if not confirm:
@@ -42,18 +56,104 @@ class ConanUploader(object):
 
     def _upload_conan(self, conan_ref, force, all_packages, retry, retry_wait):
         """Uploads the conans identified by conan_ref"""
+        self._upload_recipe(conan_ref, force, retry, retry_wait)
+
+        if all_packages:
+            self.check_reference(conan_ref)
+            package_ids = self._paths.conan_packages(conan_ref)
+            total = len(package_ids)
+            for index, package_id in enumerate(package_ids):
+                self.upload_package(PackageReference(conan_ref, package_id), index + 1, total,
+                                    retry, retry_wait)
+
+    def _upload_recipe(self, conan_ref, force, retry, retry_wait):
         if not force:
             self._check_package_date(conan_ref)
 
         self._user_io.out.info("Uploading %s" % str(conan_ref))
         self._remote_proxy.upload_conan(conan_ref, retry, retry_wait)
 
-        if all_packages:
-            self.check_reference(conan_ref)
-            for index, package_id in enumerate(self._paths.conan_packages(conan_ref)):
-                total = len(self._paths.conan_packages(conan_ref))
-                self.upload_package(PackageReference(conan_ref, package_id), index + 1, total,
-                                    retry, retry_wait)
+    def _parallel_upload(self, references, force, all_packages, retry, retry_wait, workers):
+        """ Uploads the recipes and their packages with a pool of threads. The packages of
+        a recipe are uploaded after the recipe, and they are compressed in advance by a pool
+        of processes. A failure doesn't stop the other uploads, all of them are reported
+        together at the end
+        """
+        failures = []
+        packages = OrderedDict()
+        for conan_ref in references:
+            packages[conan_ref] = []
+            if all_packages:
+                try:
+                    self.check_reference(conan_ref)
+                    packages[conan_ref] = self._paths.conan_packages(conan_ref)
+                except ConanException as exc:
+                    failures.append((conan_ref, exc))
+
+        package_refs = [PackageReference(conan_ref, package_id)
+                        for conan_ref, package_ids in packages.items()
+                        for package_id in package_ids]
+        compress_pool = None
+        if package_refs:
+            compress_pool = Pool(min(cpu_count(), len(package_refs)))
+        upload_pool = ThreadPool(workers)
+        try:
+            compressions = {}
+            for package_ref in package_refs:
+                package_folder = self._paths.package(package_ref, short_paths=None)
+                compressions[package_ref] = compress_pool.apply_async(compress_package,
+                                                                      (package_folder, ))
+
+            recipe_uploads = [(conan_ref, upload_pool.apply_async(self._upload_recipe,
+                                                                  (conan_ref, force, retry,
+                                                                   retry_wait)))
+                              for conan_ref in references]
+            package_uploads = []
+            for conan_ref, recipe_upload in recipe_uploads:
+                try:
+                    recipe_upload.get()
+                except Exception as exc:
+                    failures.append((conan_ref, exc))
+                    continue
+                package_ids = packages[conan_ref]
+                total = len(package_ids)
+                for index, package_id in enumerate(package_ids):
+                    package_ref = PackageReference(conan_ref, package_id)
+                    args = (package_ref, compressions[package_ref], index + 1, total, retry,
+                            retry_wait)
+                    package_uploads.append((package_ref,
+                                            upload_pool.apply_async(self._upload_compressed,
+                                                                    args)))
+            for package_ref, package_upload in package_uploads:
+                try:
+                    package_upload.get()
+                except Exception as exc:
+                    failures.append((package_ref, exc))
+        except:  # Ctrl+C, do not wait for the pending uploads
+            upload_pool.terminate()
+            if compress_pool:
+                compress_pool.terminate()
+            raise
+        finally:
+            upload_pool.close()
+            upload_pool.join()
+            if compress_pool:
+                compress_pool.close()
+                compress_pool.join()
+
+        if failures:
+            summary = "\n".join("    %s: %s" % (repr(ref), exception_message_safe(exc))
+                                for ref, exc in failures)
+            raise ConanException("Errors uploading:\n%s" % summary)
+
+    def _upload_compressed(self, package_ref, compression, index, total, retry, retry_wait):
+        try:
+            compression.get()
+        except Exception as exc:
+            logger.debug("Error compressing %s: %s" % (repr(package_ref), str(exc)))
+            raise ConanException("Error compressing the package: %s"
+                                 % exception_message_safe(exc))
+        self.upload_package(package_ref, index, total, retry, retry_wait)
 
     def check_reference(self, conan_reference):
         try:
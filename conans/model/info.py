@@ -200,6 +200,7 @@ class ConanInfo(object):
         result.recipe_hash = parser.recipe_hash or None
         # TODO: Missing handling paring of requires, but not necessary now
         result.scope = Scopes.loads(parser.scope)
+        result._non_devs_requirements = None
         return result
 
     def dumps(self):
@@ -1,7 +1,9 @@
 import os
 import calendar
 import time
-from conans.util.files import md5sum, md5
+from multiprocessing import cpu_count
+from conans.util.files import file_checksums, md5
+from conans.util.parallel import run_in_threads
 from conans.paths import PACKAGE_TGZ_NAME, EXPORT_TGZ_NAME, CONAN_MANIFEST, EXPORT_SOURCES_TGZ_NAME
 from conans.errors import ConanException
 import datetime
@@ -31,6 +33,34 @@ def gather_files(folder):
     return file_dict
 
 
+_HASH_WORKERS = min(8, cpu_count())
+
+
+def checksum_files(file_paths, algorithms, checksum_cache=None):
+    """ Computes the checksums of many files, several at a time
+    param checksum_cache: optional ChecksumCache, only the files changed since they were
+    stored there are read
+    return {file_path: [hexdigest, ...]} with a hexdigest for every algorithm
+    """
+    ret = {}
+    if checksum_cache is not None:
+        ret, stat_keys = checksum_cache.lookup(file_paths, algorithms)
+        file_paths = [path for path in file_paths if path not in ret]
+    # The biggest files first, so they don't delay the end
+    file_paths = sorted(file_paths, key=lambda path: -os.path.getsize(path))
+    workers = _HASH_WORKERS if len(file_paths) > 4 else 1
+    computed = {}
+    for file_path, checksums, exc in run_in_threads(lambda path: file_checksums(path, algorithms),
+                                                    file_paths, workers):
+        if exc is not None:
+            raise exc
+        computed[file_path] = checksums
+    if checksum_cache is not None and computed:
+        checksum_cache.store(computed, stat_keys, algorithms)
+    ret.update(computed)
+    return ret
+
+
 class FileTreeManifest(object):
 
     def __init__(self, time, file_sums):
@@ -38,18 +68,19 @@ class FileTreeManifest(object):
         self.time = time
         self.file_sums = file_sums
 
-    def __repr__(self):
-        ret = "%s\n" % (self.time)
+    def _file_lines(self):
+        ret = ""
         for filepath, file_md5 in sorted(self.file_sums.items()):
             ret += "%s: %s\n" % (filepath, file_md5)
         return ret
 
+    def __repr__(self):
+        return "%s\n%s" % (self.time, self._file_lines())
+
     @property
     def summary_hash(self):
-        ret = ""  # Do not include the timestamp in the summary hash
-        for filepath, file_md5 in sorted(self.file_sums.items()):
-            ret += "%s: %s\n" % (filepath, file_md5)
-        return md5(ret)
+        # Do not include the timestamp in the summary hash
+        return md5(self._file_lines())
 
     @property
     def time_str(self):
@@ -71,17 +102,20 @@ class FileTreeManifest(object):
         return FileTreeManifest(time, file_sums)
 
     @classmethod
-    def create(cls, folder):
+    def create(cls, folder, checksum_cache=None):
         """ Walks a folder and create a FileTreeManifest for it, reading file contents
         from disk, and capturing current time
+        param checksum_cache: optional ChecksumCache to avoid reading the unchanged files
         """
         files = gather_files(folder)
         for f in (PACKAGE_TGZ_NAME, EXPORT_TGZ_NAME, CONAN_MANIFEST, EXPORT_SOURCES_TGZ_NAME):
             files.pop(f, None)
 
+        checksums = checksum_files(list(files.values()), ["md5"], checksum_cache)
+
         file_dict = {}
         for name, filepath in files.items():
-            file_dict[name] = md5sum(filepath)
+            file_dict[name] = checksums[filepath][0]
 
         date = calendar.timegm(time.gmtime())
 
@@ -37,6 +37,7 @@ EXPORT_SOURCES_DIR = ".c_src"
 CONAN_LINK = ".conan_link"
 
 RUN_LOG_NAME = "conan_run.log"
+SOURCES_MANIFEST = "conan_sources_manifest.txt"
 
 
 def conan_expand_user(path):
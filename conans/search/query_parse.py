@@ -1,3 +1,6 @@
+import re
+from fnmatch import fnmatchcase
+from conans.model.version import Version
 from conans.util.log import logger
 
 
@@ -122,3 +125,185 @@ def infix_to_postfix(exp):
         raise Exception("Bad expression, not balanced parenthesis")
     output.extend(stack)
     return output
+
+
+_SETTINGS = ("os", "compiler", "arch", "build_type")
+_COMPARISON_OPERATORS = ("!=", "<=", ">=", "=", "<", ">")  # The longest first
+_NAME_PATTERN = re.compile(r"[^\s=!<>()&|,]+")
+_GLOB_CHARS = ("*", "?", "[")
+
+
+def _property_getter(name):
+    """ return a function that gets the value of the property from a serialize_min() info, the
+    settings and the options are distinguished by name, as in the conaninfo.txt
+    """
+    section = "settings" if name in _SETTINGS or name.startswith("compiler.") else "options"
+
+    def get(info):
+        return (info.get(section) or {}).get(name)
+    return get
+
+
+def _matcher(value):
+    """ return a function that checks if a value equals to the given one, or matches it
+    if it is a glob pattern like "4.*"
+    """
+    if any(c in value for c in _GLOB_CHARS):
+        return lambda actual: fnmatchcase(actual, value)
+    return lambda actual: actual == value
+
+
+def _comparison(name, operator, values):
+    """ return the predicate of a single comparison. Like in the plain "=" of the previous
+    queries, the packages without the property are compatible with any condition
+    """
+    get = _property_getter(name)
+    if operator == "IN":
+        matchers = [_matcher(value) for value in values]
+        test = lambda actual: any(match(actual) for match in matchers)
+    elif operator in ("=", "!="):
+        test = _matcher(values[0])
+        if operator == "!=":
+            equal = test
+            test = lambda actual: not equal(actual)
+    else:
+        version = Version(values[0])
+        compare = {"<": Version.__lt__, "<=": Version.__le__,
+                   ">": Version.__gt__, ">=": Version.__ge__}[operator]
+        results = {}  # Few different values among many packages, compare each once
+
+        def test(actual):
+            try:
+                return results[actual]
+            except KeyError:
+                result = results[actual] = compare(Version(actual), version)
+                return result
+
+    def predicate(info):
+        actual = get(info)
+        return actual is None or test(actual)
+    return predicate
+
+
+class _QueryCompiler(object):
+    """ Recursive descent parser of the package queries, that builds the predicate while parsing.
+    AND has a higher priority than OR:
+        query := and_query (OR and_query)*
+        and_query := factor (AND factor)*
+        factor := "(" query ")" | name operator value | name IN "(" value ("," value)* ")"
+    """
+
+    def __init__(self, query):
+        self._query = query
+        self._pos = 0
+
+    def compile(self):
+        predicate = self._or_query()
+        self._skip_spaces()
+        if self._pos < len(self._query):
+            raise Exception("Unexpected '%s'" % self._query[self._pos:])
+        return predicate
+
+    def _skip_spaces(self):
+        while self._pos < len(self._query) and self._query[self._pos].isspace():
+            self._pos += 1
+
+    def _peek(self):
+        self._skip_spaces()
+        return self._query[self._pos:self._pos + 1]
+
+    def _keyword(self, symbol, words):
+        """ consumes the symbol, or one of the words surrounded by spaces or parenthesis
+        """
+        start = self._pos
+        if self._peek() == symbol:
+            self._pos += 1
+            return True
+        for word in words:
+            end = self._pos + len(word)
+            if (self._query[self._pos:end] == word and self._pos > start and
+                    (end == len(self._query) or self._query[end].isspace() or
+                     self._query[end] == "(")):
+                self._pos = end
+                return True
+        self._pos = start
+        return False
+
+    def _or_query(self):
+        predicate = self._and_query()
+        while self._keyword("|", ("OR", "or")):
+            left, right = predicate, self._and_query()
+            predicate = lambda info, left=left, right=right: left(info) or right(info)
+        return predicate
+
+    def _and_query(self):
+        predicate = self._factor()
+        while self._keyword("&", ("AND", "and")):
+            left, right = predicate, self._factor()
+            predicate = lambda info, left=left, right=right: left(info) and right(info)
+        return predicate
+
+    def _factor(self):
+        if self._peek() == "(":
+            self._pos += 1
+            predicate = self._or_query()
+            if self._peek() != ")":
+                raise Exception("Bad expression, not balanced parenthesis")
+            self._pos += 1
+            return predicate
+        match = _NAME_PATTERN.match(self._query, self._pos)
+        if not match:
+            raise Exception("Invalid expression: %s" % self._query[self._pos:])
+        name = match.group(0)
+        self._pos = match.end()
+        for operator in _COMPARISON_OPERATORS:
+            if self._query.startswith(operator, self._pos):
+                self._pos += len(operator)
+                return _comparison(name, operator, [self._value(stop=" ()&|")])
+        if self._keyword(None, ("IN", "in")):
+            return _comparison(name, "IN", self._values())
+        raise Exception("Invalid expression: %s" % name)
+
+    def _value(self, stop):
+        """ a quoted string, or the characters until the first stop one
+        """
+        query = self._query
+        if self._pos < len(query) and query[self._pos] in "\"'":
+            end = query.find(query[self._pos], self._pos + 1)
+            if end == -1:
+                raise Exception("Not closed quotes: %s" % query[self._pos:])
+            value = query[self._pos + 1:end]
+            self._pos = end + 1
+            return value
+        start = self._pos
+        while self._pos < len(query) and query[self._pos] not in stop \
+                and not query[self._pos].isspace():
+            self._pos += 1
+        return query[start:self._pos]
+
+    def _values(self):
+        if self._peek() != "(":
+            raise Exception("Expected '(' after IN")
+        self._pos += 1
+        values = []
+        while True:
+            self._skip_spaces()
+            values.append(self._value(stop="(),"))
+            separator = self._peek()
+            self._pos += 1
+            if separator == ")":
+                return values
+            if separator != ",":
+                raise Exception("Expected ',' or ')' in IN list")
+
+
+def compile_query(query):
+    """ Parses a package query once, like:
+        os=Windows AND (compiler.version>=7 OR compiler IN (clang, "apple-clang"))
+    supporting the =, !=, <, <=, >, >= (comparing versions) and IN operators, and glob patterns
+    in the values of =, != and IN.
+    @return: function receiving a ConanInfo.serialize_min() dict that returns if it matches
+    """
+    if not query or not query.strip():
+        return lambda info: True
+    return _QueryCompiler(query).compile()
@@ -9,7 +9,7 @@ from conans.model.ref import PackageReference, ConanFileReference
 from conans.paths import CONANINFO
 from conans.util.log import logger
 import os
-from conans.search.query_parse import infix_to_postfix, evaluate_postfix
+from conans.search.query_parse import compile_query
 
 
 class SearchAdapterABC(object):
@@ -67,52 +67,17 @@ def filter_packages(query, package_infos):
     if query is None:
         return package_infos
     try:
-        if "!" in query:
+        if re.search(r"!(?!=)", query):
             raise ConanException("'!' character is not allowed")
         if " not " in query or query.startswith("not "):
             raise ConanException("'not' operator is not allowed")
-        result = {}
-        postfix = infix_to_postfix(query) if query else []
-        for package_id, info in package_infos.items():
-            if evaluate_postfix_with_info(postfix, info):
-                result[package_id] = info
-        return result
+        predicate = compile_query(query)
+        return {package_id: info for package_id, info in package_infos.items()
+                if predicate(info)}
     except Exception as exc:
         raise ConanException("Invalid package query: %s. %s" % (query, exc))
 
 
-def evaluate_postfix_with_info(postfix, conan_vars_info):
-
-    # Evaluate conaninfo with the expression
-
-    def evaluate_info(expression):
-        """Receives an expression like compiler.version="12"
-        Uses conan_vars_info in the closure to evaluate it"""
-        name, value = expression.split("=", 1)
-        value = value.replace("\"", "")
-        return evaluate(name, value, conan_vars_info)
-
-    return evaluate_postfix(postfix, evaluate_info)
-
-
-def evaluate(prop_name, prop_value, conan_vars_info):
-    """
-    Evaluates a single prop_name, prop_value like "os", "Windows" against conan_vars_info.serialize_min()
-    """
-
-    def compatible_prop(setting_value, prop_value):
-        return setting_value is None or prop_value == setting_value
-
-    info_settings = conan_vars_info.get("settings", [])
-    info_options = conan_vars_info.get("options", [])
-
-    if prop_name in ["os", "compiler", "arch", "build_type"] or prop_name.startswith("compiler."):
-        return compatible_prop(info_settings.get(prop_name, None), prop_value)
-    else:
-        return compatible_prop(info_options.get(prop_name, None), prop_value)
-    return False
-
-
 class DiskSearchManager(SearchManagerABC):
     """Will search recipes and packages using a file system.
     Can be used with a SearchAdapter"""
@@ -127,7 +92,7 @@ class DiskSearchManager(SearchManagerABC):
             pattern = translate(pattern)
             pattern = re.compile(pattern, re.IGNORECASE) if ignorecase else re.compile(pattern)
 
-        subdirs = self._adapter.list_folder_subdirs(basedir=self._paths.store, level=4)
+        subdirs = self._stored_references()
         if not pattern:
             return sorted([ConanFileReference(*folder.split("/")) for folder in subdirs])
         else:
@@ -139,6 +104,11 @@ class DiskSearchManager(SearchManagerABC):
                         ret.append(conan_ref)
             return sorted(ret)
 
+    def _stored_references(self):
+        """ return the "name/version/user/channel" folders of the store
+        """
+        return self._adapter.list_folder_subdirs(basedir=self._paths.store, level=4)
+
     def search_packages(self, reference, query):
         """ Return a dict like this:
 
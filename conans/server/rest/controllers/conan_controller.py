@@ -127,6 +127,18 @@ class ConanController(Controller):
             urls_norm = {filename.replace("\\", "/"): url for filename, url in urls.items()}
             return urls_norm
 
+        @app.route('%s/packages/info' % self.route, method=["POST"])
+        def get_packages_info(auth_user):
+            """
+            Get the conaninfo and manifest of a list of packages
+            """
+            conan_service = ConanService(app.authorizer, app.file_manager, auth_user)
+            reader = codecs.getreader("utf-8")
+            package_references = [PackageReference.loads(ref)
+                                  for ref in json.load(reader(request.body))["packages"]]
+            infos = conan_service.get_packages_info(package_references)
+            return {repr(ref): contents for ref, contents in infos.items()}
+
         @app.route('%s/search' % self.route, method=["GET"])
         def search(auth_user):
             pattern = request.params.get("q", None)
@@ -1,5 +1,5 @@
 from conans.server.rest.controllers.controller import Controller
-from bottle import request, static_file, FileUpload, cached_property
+from bottle import request, static_file, FileUpload, cached_property, HTTPResponse
 from conans.server.service.service import FileUploadDownloadService
 import os
 from unicodedata import normalize
@@ -22,9 +22,20 @@ class FileUploadDownloadController(Controller):
             file_path = service.get_file_path(filepath, token)
             # https://github.com/kennethreitz/requests/issues/1586
             mimetype = "x-gzip" if filepath.endswith(".tgz") else "auto"
-            return static_file(os.path.basename(file_path),
-                               root=os.path.dirname(file_path),
-                               mimetype=mimetype)
+            # static_file honours "Range" requests (206 Partial Content), so the clients
+            # can resume interrupted downloads
+            ret = static_file(os.path.basename(file_path),
+                              root=os.path.dirname(file_path),
+                              mimetype=mimetype)
+            # Also for HEAD requests, so clients can check it before downloading the file
+            if os.path.isfile(file_path):
+                checksum = service.get_file_checksum(file_path)
+                etag = '"%s"' % checksum
+                if request.headers.get("If-None-Match") == etag:  # Client copy still valid
+                    ret = HTTPResponse(status=304)
+                ret.set_header("X-Checksum-Sha1", checksum)
+                ret.set_header("ETag", etag)
+            return ret
 
         @app.route(self.route + '/<filepath:path>', method=["PUT"])
         def put(filepath):
@@ -2,7 +2,7 @@ from conans.errors import RequestErrorException, NotFoundException, ForbiddenExc
 from conans.server.store.file_manager import FileManager
 import os
 import jwt
-from conans.util.files import mkdir
+from conans.util.files import mkdir, sha1sum
 from conans.model.ref import PackageReference
 from conans.util.log import logger
 
@@ -13,6 +13,20 @@ class FileUploadDownloadService(object):
     def __init__(self, updown_auth_manager, base_store_folder):
         self.updown_auth_manager = updown_auth_manager
         self.base_store_folder = base_store_folder
+        self._checksums = {}  # {(path, size, mtime): sha1}
+
+    def get_file_checksum(self, file_path):
+        """ sha1 of a stored file, computed just once while the file is not modified
+        """
+        stat = os.stat(file_path)
+        key = (file_path, stat.st_size, stat.st_mtime)
+        checksum = self._checksums.get(key)
+        if checksum is None:
+            if len(self._checksums) > 10000:
+                self._checksums.clear()
+            checksum = sha1sum(file_path)
+            self._checksums[key] = checksum
+        return checksum
 
     def get_file_path(self, filepath, token):
         try:
@@ -170,6 +184,15 @@ class ConanService(object):
                                                             files_subset=files_subset)
         return urls
 
+    def get_packages_info(self, package_references):
+        """Gets the conaninfo and manifest contents of several packages at once:
+            {package_reference: {"conaninfo.txt": text, "conanmanifest.txt": text}}
+        Missing packages are not in the result
+        """
+        for package_reference in package_references:
+            self._authorizer.check_read_package(self._auth_user, package_reference)
+        return self._file_manager.get_packages_info(package_references)
+
     def get_package_upload_urls(self, package_reference, filesizes):
         """
         :param package_reference: PackageReference
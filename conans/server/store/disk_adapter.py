@@ -3,7 +3,7 @@ import os
 from abc import ABCMeta, abstractmethod
 from conans.errors import NotFoundException
 from conans.util.files import relative_dirs, rmdir, md5sum, decode_text
-from conans.util.files import path_exists
+from conans.util.files import path_exists, load
 from conans.paths import SimplePaths
 
 
@@ -22,6 +22,10 @@ class ServerStorageAdapter(object):
     def get_snapshot(self, absolute_path="", files_subset=None):
         raise NotImplementedError()
 
+    @abstractmethod
+    def get_file(self, path):
+        raise NotImplementedError()
+
     @abstractmethod
     def delete_folder(self, path):
         raise NotImplementedError()
@@ -88,6 +92,12 @@ class ServerDiskAdapter(ServerStorageAdapter):
         abs_paths = [os.path.join(absolute_path, relpath) for relpath in paths]
         return {filepath: md5sum(filepath) for filepath in abs_paths}
 
+    def get_file(self, path):
+        '''Returns the text contents of a file. Path already contains base dir'''
+        if not path_exists(path, self._store_folder):
+            raise NotFoundException("")
+        return load(path)
+
     def delete_folder(self, path):
         '''Delete folder from disk. Path already contains base dir'''
         if not path_exists(path, self._store_folder):
@@ -1,5 +1,6 @@
 import os
-from conans.paths import SimplePaths
+from conans.paths import SimplePaths, CONANINFO, CONAN_MANIFEST
+from conans.errors import NotFoundException
 from conans.model.ref import ConanFileReference, PackageReference
 from conans.server.store.disk_adapter import ServerStorageAdapter
 
@@ -32,6 +33,22 @@ class FileManager(object):
         path = self.paths.package(package_reference)
         return self._get_snapshot_of_files(path)
 
+    def get_packages_info(self, package_references):
+        """Returns a {package_reference: {CONANINFO: text, CONAN_MANIFEST: text}}
+        with the packages that exist, the missing ones are not in the result"""
+        ret = {}
+        for package_reference in package_references:
+            assert isinstance(package_reference, PackageReference)
+            path = self.paths.package(package_reference)
+            try:
+                ret[package_reference] = {
+                    CONANINFO: self._storage_adapter.get_file(os.path.join(path, CONANINFO)),
+                    CONAN_MANIFEST: self._storage_adapter.get_file(os.path.join(path,
+                                                                                CONAN_MANIFEST))}
+            except NotFoundException:
+                pass
+        return ret
+
     # ############ DOWNLOAD URLS
     def get_download_conanfile_urls(self, reference, files_subset=None, user=None):
         """Returns a {filepath: url} """
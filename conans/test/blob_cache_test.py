@@ -0,0 +1,91 @@
+import unittest
+import os
+import time
+import hashlib
+from conans.client.store.blob_cache import BlobCache
+from conans.test.tools import TestClient, TestServer
+from conans.test.utils.cpp_test_files import cpp_hello_conan_files
+from conans.test.utils.test_files import temp_folder
+from conans.model.ref import ConanFileReference, PackageReference
+from conans.util.files import load, save
+
+
+def _sha1(content):
+    return hashlib.sha1(content.encode()).hexdigest()
+
+
+class BlobCacheTest(unittest.TestCase):
+
+    def get_put_test(self):
+        tmp_dir = temp_folder()
+        cache = BlobCache(os.path.join(tmp_dir, "blobs"), max_size=1)
+        dest = os.path.join(tmp_dir, "dest.tgz")
+        self.assertFalse(cache.get(_sha1("hello"), dest))
+        self.assertFalse(cache.get("../../etc/passwd", dest))
+
+        src = os.path.join(tmp_dir, "src.tgz")
+        save(src, "hello")
+        cache.put(_sha1("hello"), src)
+        os.remove(src)
+        self.assertTrue(cache.get(_sha1("hello"), dest))
+        self.assertEqual(load(dest), "hello")
+
+    def lru_evict_test(self):
+        tmp_dir = temp_folder()
+        cache = BlobCache(os.path.join(tmp_dir, "blobs"), max_size=1)
+        contents = ["%s%s" % (i, "x" * 400 * 1024) for i in range(3)]
+        for i, content in enumerate(contents[:2]):
+            src = os.path.join(tmp_dir, "src%d.tgz" % i)
+            save(src, content)
+            cache.put(_sha1(content), src)
+        # Use the first one, so the second one is the least recently used
+        old = time.time() - 100
+        os.utime(cache._blob_path(_sha1(contents[1])), (old, old))
+        self.assertTrue(cache.get(_sha1(contents[0]), os.path.join(tmp_dir, "dest0.tgz")))
+
+        src = os.path.join(tmp_dir, "src2.tgz")
+        save(src, contents[2])
+        cache.put(_sha1(contents[2]), src)  # 1.2 MB > 1 MB, one has to be evicted
+        self.assertTrue(cache.get(_sha1(contents[0]), os.path.join(tmp_dir, "d0.tgz")))
+        self.assertFalse(cache.get(_sha1(contents[1]), os.path.join(tmp_dir, "d1.tgz")))
+        self.assertTrue(cache.get(_sha1(contents[2]), os.path.join(tmp_dir, "d2.tgz")))
+
+    def shared_between_user_homes_test(self):
+        servers = {"default": TestServer()}
+        client = TestClient(servers=servers, users={"default": [("lasote", "mypass")]})
+        client.save(cpp_hello_conan_files("Hello0", "1.0", build=False))
+        client.run("export lasote/stable")
+        client.run("install Hello0/1.0@lasote/stable --build missing")
+        client.run("upload Hello0/1.0@lasote/stable --all")
+
+        blobs_folder = temp_folder()
+
+        def new_client():
+            client = TestClient(servers=servers, users={"default": [("lasote", "mypass")]})
+            conf = load(client.paths.conan_conf_path)
+            save(client.paths.conan_conf_path,
+                 conf.replace("[general]", "[general]\nblob_cache_path: %s" % blobs_folder))
+            return client
+
+        client2 = new_client()
+        client2.run("install Hello0/1.0@lasote/stable")
+        self.assertIn("Downloading conan_package.tgz", client2.user_io.out)
+        self.assertNotIn("from blob cache", client2.user_io.out)
+
+        client3 = new_client()
+        client3.run("install Hello0/1.0@lasote/stable")
+        self.assertIn("Got conan_export.tgz from blob cache", client3.user_io.out)
+        self.assertIn("Got conan_package.tgz from blob cache", client3.user_io.out)
+        self.assertNotIn("Downloading conan_package.tgz", client3.user_io.out)
+
+        ref = ConanFileReference.loads("Hello0/1.0@lasote/stable")
+        package_ids = client3.paths.conan_packages(ref)
+        package_folder = client3.paths.package(PackageReference(ref, package_ids[0]))
+        self.assertTrue(os.path.exists(os.path.join(package_folder, "include/helloHello0.h")))
+        self.assertFalse(os.path.exists(os.path.join(package_folder, "conan_package.tgz")))
+
+        # After a remove, it is not downloaded again
+        client3.run("remove Hello0* -f")
+        client3.run("install Hello0/1.0@lasote/stable")
+        self.assertIn("Got conan_package.tgz from blob cache", client3.user_io.out)
+        self.assertTrue(os.path.exists(os.path.join(package_folder, "include/helloHello0.h")))
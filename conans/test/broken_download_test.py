@@ -1,11 +1,39 @@
 import unittest
-from conans.test.tools import TestServer, TestClient
+from conans.test.tools import TestServer, TestClient, TestRequester
 from conans.test.utils.cpp_test_files import cpp_hello_conan_files
-from conans.model.ref import ConanFileReference
+from conans.model.ref import ConanFileReference, PackageReference
 import os
 from conans.util.files import save
 
 
+class _BrokenResponse(object):
+    """ The connection is lost after sending the first half of the body """
+    def __init__(self, response):
+        self._response = response
+        self.ok = response.ok
+        self.status_code = response.status_code
+        self.headers = response.headers
+
+    def iter_content(self, chunk_size=1):  # @UnusedVariable
+        content = self._response.content
+        yield content[:len(content) // 2]
+        raise Exception("Connection lost by the evil mock")
+
+
+class BrokenConnectionRequester(TestRequester):
+    ranges = []
+
+    def get(self, url, auth=None, headers=None, verify=None, stream=None):
+        response = super(BrokenConnectionRequester, self).get(url, auth=auth, headers=headers,
+                                                              verify=verify, stream=stream)
+        if "conan_package.tgz" not in url:
+            return response
+        if headers and "Range" in headers:
+            BrokenConnectionRequester.ranges.append((headers["Range"], response.status_code))
+            return response
+        return _BrokenResponse(response)
+
+
 class BrokenDownloadTest(unittest.TestCase):
 
     def basic_test(self):
@@ -26,3 +54,29 @@ class BrokenDownloadTest(unittest.TestCase):
         client.run("install Hello/0.1@lasote/stable --build", ignore_error=True)
         self.assertIn("ERROR: Error while downloading/extracting files to", client.user_io.out)
         self.assertFalse(os.path.exists(client.paths.export(ref)))
+
+    def resume_test(self):
+        server = TestServer()
+        servers = {"default": server}
+        client = TestClient(servers=servers, users={"default": [("lasote", "mypass")]})
+        client.save(cpp_hello_conan_files("Hello0", "1.0", build=False))
+        client.run("export lasote/stable")
+        client.run("install Hello0/1.0@lasote/stable --build missing")
+        client.run("upload Hello0/1.0@lasote/stable --all")
+
+        client2 = TestClient(servers=servers, users={"default": [("lasote", "mypass")]},
+                             requester_class=BrokenConnectionRequester)
+        client2.run("install Hello0/1.0@lasote/stable")
+        self.assertIn("Connection lost by the evil mock", client2.user_io.out)
+        self.assertIn("Waiting 0 seconds to retry...", client2.user_io.out)
+        self.assertEqual(len(BrokenConnectionRequester.ranges), 1)
+        range_header, status_code = BrokenConnectionRequester.ranges[0]
+        self.assertTrue(range_header.startswith("bytes="))
+        self.assertNotEqual(range_header, "bytes=0-")
+        self.assertEqual(status_code, 206)
+
+        ref = ConanFileReference.loads("Hello0/1.0@lasote/stable")
+        package_ids = client2.paths.conan_packages(ref)
+        package_folder = client2.paths.package(PackageReference(ref, package_ids[0]))
+        self.assertTrue(os.path.exists(os.path.join(package_folder, "include/helloHello0.h")))
+        self.assertFalse(os.path.exists(os.path.join(package_folder, "conan_package.tgz.part")))
@@ -0,0 +1,119 @@
+import unittest
+import os
+import time
+from conans.client.cache_gc import CacheCollector
+from conans.client.store.access_log import PACKAGES, BUILDS, SOURCES
+from conans.model.ref import ConanFileReference, PackageReference
+from conans.test.tools import TestClient, TestBufferConanOutput
+from conans.test.utils.cpp_test_files import cpp_hello_conan_files
+from conans.util.files import save
+
+
+class CacheCollectorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient()
+        self.paths = self.client.paths
+        self.output = TestBufferConanOutput()
+        self.ref = ConanFileReference.loads("Hello/0.1@lasote/stable")
+        self.other_ref = ConanFileReference.loads("Bye/0.1@lasote/stable")
+
+    def _save_folder(self, folder, size_kb):
+        save(os.path.join(folder, "file.bin"), "x" * size_kb * 1024)
+
+    def lru_packages_test(self):
+        old = PackageReference(self.ref, "1")
+        recent = PackageReference(self.ref, "2")
+        other = PackageReference(self.other_ref, "1")
+        for package_ref in (old, recent, other):
+            self._save_folder(self.paths.package(package_ref), 100)
+        access_log = self.paths.access_log
+        access_log.touch([(PACKAGES, old)], time.time() - 1000)
+        access_log.touch([(PACKAGES, other)], time.time() - 100)
+        access_log.touch([(PACKAGES, recent)], time.time())
+
+        collector = CacheCollector(self.paths, self.output)
+        freed = collector.collect({PACKAGES: 0.25}, dry_run=True)
+        self.assertEqual(freed, 100 * 1024)
+        self.assertTrue(os.path.exists(self.paths.package(old)))
+
+        freed = collector.collect({PACKAGES: 0.25})
+        self.assertEqual(freed, 100 * 1024)
+        self.assertIn("Removed package %s" % str(old), str(self.output))
+        self.assertFalse(os.path.exists(self.paths.package(old)))
+        self.assertTrue(os.path.exists(self.paths.package(recent)))
+        self.assertTrue(os.path.exists(self.paths.package(other)))
+        self.assertEqual(sorted(access_log.entries(PACKAGES).keys()),
+                         sorted([str(recent), str(other)]))
+
+        # Under the quota, nothing to do
+        self.assertEqual(collector.collect({PACKAGES: 0.25}), 0)
+
+    def in_use_skipped_test(self):
+        package_ref = PackageReference(self.ref, "1")
+        other = PackageReference(self.other_ref, "1")
+        self._save_folder(self.paths.package(package_ref), 100)
+        self._save_folder(self.paths.package(other), 100)
+        self.paths.access_log.touch([(PACKAGES, package_ref)], time.time() - 1000)
+        self.paths.access_log.touch([(PACKAGES, other)], time.time())
+
+        with self.paths.using([self.ref]):
+            CacheCollector(self.paths, self.output).collect({PACKAGES: 0.15})
+        self.assertIn("Skipping package %s" % str(package_ref), str(self.output))
+        self.assertTrue(os.path.exists(self.paths.package(package_ref)))
+        self.assertFalse(os.path.exists(self.paths.package(other)))
+
+    def builds_and_sources_test(self):
+        build_ref = PackageReference(self.ref, "1")
+        self._save_folder(self.paths.build(build_ref), 100)
+        self._save_folder(self.paths.source(self.ref), 100)
+        self._save_folder(self.paths.source(self.other_ref), 100)
+        # Never recorded, the folder mtime is used
+        past = time.time() - 1000
+        os.utime(self.paths.source(self.other_ref), (past, past))
+
+        CacheCollector(self.paths, self.output).collect({BUILDS: 0.5, SOURCES: 0.15})
+        self.assertTrue(os.path.exists(self.paths.build(build_ref)))
+        self.assertTrue(os.path.exists(self.paths.source(self.ref)))
+        self.assertFalse(os.path.exists(self.paths.source(self.other_ref)))
+
+    def nested_growth_test(self):
+        old = PackageReference(self.ref, "1")
+        recent = PackageReference(self.ref, "2")
+        for build_ref in (old, recent):
+            self._save_folder(os.path.join(self.paths.build(build_ref), "obj"), 100)
+        self.paths.access_log.touch([(BUILDS, old)], time.time() - 1000)
+        self.paths.access_log.touch([(BUILDS, recent)], time.time())
+        collector = CacheCollector(self.paths, self.output)
+        self.assertEqual(collector.collect({BUILDS: 0.25}), 0)
+
+        # The build grows in a subfolder, the mtime of the build folder doesn't change
+        build_folder = self.paths.build(recent)
+        mtime = os.path.getmtime(build_folder)
+        save(os.path.join(build_folder, "obj", "other.bin"), "x" * 100 * 1024)
+        os.utime(build_folder, (mtime, mtime))
+        self.assertEqual(collector.collect({BUILDS: 0.25}), 100 * 1024)
+        self.assertFalse(os.path.exists(self.paths.build(old)))
+
+
+class CacheGCCommandTest(unittest.TestCase):
+
+    def install_records_access_test(self):
+        client = TestClient()
+        for name in ("Hello0", "Hello1"):
+            client.save(cpp_hello_conan_files(name, "0.1", build=False), clean_first=True)
+            client.run("export lasote/stable")
+            client.run("install %s/0.1@lasote/stable --build missing" % name)
+        ref = ConanFileReference.loads("Hello0/0.1@lasote/stable")
+        entries = client.paths.access_log.entries(PACKAGES)
+        package_ids = client.paths.conan_packages(ref)
+        self.assertIn(str(PackageReference(ref, package_ids[0])), entries)
+        self.assertIn(str(ref), client.paths.access_log.entries(SOURCES))
+
+        client.run("cache gc --sources-quota 0.000001")
+        self.assertIn("Removed source Hello0/0.1@lasote/stable", client.user_io.out)
+        self.assertIn("Freed", client.user_io.out)
+        self.assertFalse(os.path.exists(client.paths.source(ref)))
+
+        client.run("cache gc")
+        self.assertIn("No quotas defined for the local cache", client.user_io.out)
@@ -0,0 +1,141 @@
+import unittest
+import os
+from mock import patch
+from conans.client.remover import DiskRemover
+from conans.client.store.catalog import CacheCatalog
+from conans.test.tools import TestClient
+from conans.test.utils.cpp_test_files import cpp_hello_conan_files
+from conans.test.utils.test_files import temp_folder
+from conans.model.ref import ConanFileReference, PackageReference
+from conans.paths import CONANINFO
+from conans.tools import environment_append
+from conans.errors import ConanException
+from conans.util.files import save, rmdir
+
+
+conan_vars = '''
+[settings]
+    os=%s
+    arch=x86
+[options]
+    shared=True
+'''
+
+
+class CacheCatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient()
+        self.paths = self.client.paths
+        self.catalog = CacheCatalog(os.path.join(temp_folder(), "catalog.db"), self.paths)
+        self.ref = ConanFileReference.loads("Hello/0.1@lasote/stable")
+
+    def _save_package(self, package_id, os_name):
+        package_ref = PackageReference(self.ref, package_id)
+        save(os.path.join(self.paths.package(package_ref), CONANINFO), conan_vars % os_name)
+
+    def build_on_first_use_test(self):
+        self._save_package("1", "Windows")
+        self._save_package("2", "Linux")
+        self.assertEqual(self.catalog.references(), ["Hello/0.1/lasote/stable"])
+        infos = self.catalog.package_infos(self.ref)
+        self.assertEqual(sorted(infos.keys()), ["1", "2"])
+        self.assertEqual(infos["1"]["settings"]["os"], "Windows")
+        self.assertEqual(infos["2"]["options"]["shared"], "True")
+
+    def update_test(self):
+        self._save_package("1", "Windows")
+        self.catalog.references()
+        other_ref = ConanFileReference.loads("Bye/0.1@lasote/stable")
+        save(self.paths.conanfile(other_ref), "")
+        self._save_package("2", "Linux")
+        # Not updated yet
+        self.assertEqual(self.catalog.references(), ["Hello/0.1/lasote/stable"])
+        self.assertEqual(list(self.catalog.package_infos(self.ref).keys()), ["1"])
+
+        self.catalog.update([self.ref, other_ref])
+        self.assertEqual(sorted(self.catalog.references()),
+                         ["Bye/0.1/lasote/stable", "Hello/0.1/lasote/stable"])
+        self.assertEqual(sorted(self.catalog.package_infos(self.ref).keys()), ["1", "2"])
+
+        rmdir(self.paths.package(PackageReference(self.ref, "1")))
+        rmdir(self.paths.conan(other_ref))
+        self.catalog.update([self.ref, other_ref])
+        self.assertEqual(self.catalog.references(), ["Hello/0.1/lasote/stable"])
+        self.assertEqual(list(self.catalog.package_infos(self.ref).keys()), ["2"])
+
+    def rebuild_test(self):
+        self._save_package("1", "Windows")
+        self.catalog.references()
+        rmdir(self.paths.conan(self.ref))
+        self.assertEqual(self.catalog.references(), ["Hello/0.1/lasote/stable"])
+        self.catalog.rebuild()
+        self.assertEqual(self.catalog.references(), [])
+
+
+class CatalogSearchTest(unittest.TestCase):
+
+    def commands_update_test(self):
+        with environment_append({"CONAN_SEARCH_INDEX": "1"}):
+            client = TestClient()
+            files = cpp_hello_conan_files("Hello0", "0.1", build=False)
+            client.save(files)
+            client.run("export lasote/stable")
+            client.run("search")
+            self.assertIn("Hello0/0.1@lasote/stable", client.user_io.out)
+
+            client.run("install Hello0/0.1@lasote/stable --build missing")
+            client.run("search Hello0/0.1@lasote/stable")
+            self.assertIn("Package_ID:", client.user_io.out)
+
+            client.run("copy Hello0/0.1@lasote/stable lasote/testing --all")
+            client.run("search")
+            self.assertIn("Hello0/0.1@lasote/testing", client.user_io.out)
+
+            client.run("remove Hello0* -f")
+            client.run("search")
+            self.assertNotIn("Hello0/0.1@lasote", client.user_io.out)
+
+    def failed_remove_update_test(self):
+        remove = DiskRemover.remove
+
+        def failing_remove(remover, conan_ref):
+            if conan_ref.name == "Hello1":
+                raise ConanException("Hello1 is being used")
+            remove(remover, conan_ref)
+
+        with environment_append({"CONAN_SEARCH_INDEX": "1"}):
+            client = TestClient()
+            for name in ("Hello0", "Hello1"):
+                client.save(cpp_hello_conan_files(name, "0.1", build=False), clean_first=True)
+                client.run("export lasote/stable")
+            client.run("search")
+            self.assertIn("Hello0/0.1@lasote/stable", client.user_io.out)
+
+            with patch.object(DiskRemover, "remove", failing_remove):
+                error = client.run("remove Hello* -f", ignore_error=True)
+            self.assertTrue(error)
+            self.assertIn("Hello1 is being used", client.user_io.out)
+            # The index is updated with the recipes removed before the failure
+            client.run("search")
+            self.assertNotIn("Hello0/0.1@lasote/stable", client.user_io.out)
+            self.assertIn("Hello1/0.1@lasote/stable", client.user_io.out)
+
+    def rebuild_index_test(self):
+        with environment_append({"CONAN_SEARCH_INDEX": "1"}):
+            client = TestClient()
+            client.run("search")
+            ref = ConanFileReference.loads("Hello/0.1@lasote/stable")
+            save(client.paths.conanfile(ref), "")
+            client.run("search")
+            self.assertNotIn("Hello/0.1@lasote/stable", client.user_io.out)
+            client.run("search --rebuild-index")
+            self.assertIn("Rebuilt the search index", client.user_io.out)
+            client.run("search")
+            self.assertIn("Hello/0.1@lasote/stable", client.user_io.out)
+
+    def rebuild_index_disabled_test(self):
+        client = TestClient()
+        error = client.run("search --rebuild-index", ignore_error=True)
+        self.assertTrue(error)
+        self.assertIn("The search index is disabled", client.user_io.out)
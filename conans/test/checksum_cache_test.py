@@ -0,0 +1,63 @@
+import unittest
+import os
+import time
+from conans.client.store.checksum_cache import ChecksumCache
+from conans.model.manifest import FileTreeManifest, checksum_files
+from conans.test.utils.test_files import temp_folder
+from conans.util.files import save, md5sum
+
+
+def _save_old(path, content, age=10):
+    """ The files modified in the last seconds are not cached
+    """
+    save(path, content)
+    past = time.time() - age
+    os.utime(path, (past, past))
+
+
+class ChecksumCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = temp_folder()
+        self.cache = ChecksumCache(os.path.join(self.tmp_dir, "checksums.db"))
+
+    def reuse_unchanged_test(self):
+        path = os.path.join(self.tmp_dir, "folder", "file.txt")
+        _save_old(path, "hello")
+        checksum_files([path], ["md5"], self.cache)
+        found, _ = self.cache.lookup([path], ["md5"])
+        self.assertEqual(found, {path: [md5sum(path)]})
+        # Not cached for a different set of algorithms
+        found, _ = self.cache.lookup([path], ["md5", "sha1"])
+        self.assertEqual(found, {})
+
+    def rehash_changed_test(self):
+        path = os.path.join(self.tmp_dir, "folder", "file.txt")
+        _save_old(path, "hello")
+        checksum_files([path], ["md5"], self.cache)
+        _save_old(path, "bye!!", age=5)
+        found, _ = self.cache.lookup([path], ["md5"])
+        self.assertEqual(found, {})
+        self.assertEqual(checksum_files([path], ["md5"], self.cache), {path: [md5sum(path)]})
+
+    def racy_files_not_stored_test(self):
+        path = os.path.join(self.tmp_dir, "folder", "file.txt")
+        save(path, "hello")
+        checksum_files([path], ["md5"], self.cache)
+        found, _ = self.cache.lookup([path], ["md5"])
+        self.assertEqual(found, {})
+
+    def manifest_test(self):
+        folder = os.path.join(self.tmp_dir, "folder")
+        for i in range(10):
+            _save_old(os.path.join(folder, "file%d.txt" % i), "content %d" % i)
+        manifest = FileTreeManifest.create(folder)
+        cached = FileTreeManifest.create(folder, checksum_cache=self.cache)
+        self.assertEqual(manifest.file_sums, cached.file_sums)
+        cached = FileTreeManifest.create(folder, checksum_cache=self.cache)
+        self.assertEqual(manifest.file_sums, cached.file_sums)
+
+        _save_old(os.path.join(folder, "file3.txt"), "modified", age=5)
+        cached = FileTreeManifest.create(folder, checksum_cache=self.cache)
+        self.assertEqual(FileTreeManifest.create(folder).file_sums, cached.file_sums)
+        self.assertNotEqual(manifest.file_sums, cached.file_sums)
@@ -1,6 +1,8 @@
 import unittest
+import platform
 from conans.test.tools import TestClient
 import os
+from conans.tools import environment_append
 from conans.client.importer import IMPORTS_MANIFESTS
 from conans.util.files import load
 from conans.model.manifest import FileTreeManifest
@@ -174,3 +176,27 @@ class ConanLib(ConanFile):
         self.client.run("imports -f conanfile.txt")
         self.assertIn("file1.txt", os.listdir(self.client.current_folder))
         self.assertIn("file2.txt", os.listdir(self.client.current_folder))
+
+    def _imports_mode(self, mode):
+        self.client.save({"conanfile.txt": test1}, clean_first=True)
+        with environment_append({"CONAN_IMPORTS_MODE": mode}):
+            self.client.run("install -g txt")
+            file1 = os.path.join(self.client.current_folder, "file1.txt")
+            self.assertEqual(load(file1), "Hello")
+            manifest_content = load(os.path.join(self.client.current_folder, IMPORTS_MANIFESTS))
+            manifest = FileTreeManifest.loads(manifest_content)
+            self.assertTrue(manifest.file_sums[file1].startswith("%s:" % mode))
+            # Imported again, the existing links are kept
+            self.client.run("imports")
+            self.assertEqual(load(file1), "Hello")
+        self.client.run("imports --undo")
+        self.assertNotIn("file1.txt", os.listdir(self.client.current_folder))
+        self.assertIn("Removed 2 imported files", self.client.user_io.out)
+
+    @unittest.skipIf(platform.system() == "Windows", "Needs symlinks")
+    def imports_symlink_mode_test(self):
+        self._imports_mode("symlink")
+
+    @unittest.skipIf(platform.system() == "Windows", "Needs hard links")
+    def imports_hardlink_mode_test(self):
+        self._imports_mode("hardlink")
@@ -72,6 +72,10 @@ class RemoveTest(unittest.TestCase):
                             {"H1": [1, 2], "H2": [1, 2], "B": [1, 2], "O": [1, 2]},
                             {"H1": True, "H2": True, "B": True, "O": True})
 
+    def _store_folders(self):
+        # Not the hidden ones of the cache itself, as the locks
+        return [f for f in os.listdir(self.client.storage_folder) if not f.startswith(".")]
+
     def assert_folders(self, local_folders, remote_folders, build_folders, src_folders):
         for base_path, folders in [(self.client.paths, local_folders),
                                    (self.server.paths, remote_folders)]:
@@ -115,7 +119,7 @@ class RemoveTest(unittest.TestCase):
                             {"H1": [1, 2], "H2": [1, 2], "B": [1, 2], "O": [1, 2]},
                             {"H1": None, "H2": None, "B": [1, 2], "O": [1, 2]},
                             {"H1": False, "H2": False, "B": True, "O": True})
-        folders = os.listdir(self.client.storage_folder)
+        folders = self._store_folders()
         six.assertCountEqual(self, ["Other", "Bye"], folders)
 
     def basic_mocked_test(self):
@@ -126,7 +130,7 @@ class RemoveTest(unittest.TestCase):
                             {"H1": [1, 2], "H2": [1, 2], "B": [1, 2], "O": [1, 2]},
                             {"H1": None, "H2": None, "B": [1, 2], "O": [1, 2]},
                             {"H1": False, "H2": False, "B": True, "O": True})
-        folders = os.listdir(self.client.storage_folder)
+        folders = self._store_folders()
         six.assertCountEqual(self, ["Other", "Bye"], folders)
 
     def basic_packages_test(self):
@@ -135,7 +139,7 @@ class RemoveTest(unittest.TestCase):
                             {"H1": [1, 2], "H2": [1, 2], "B": [1, 2], "O": [1, 2]},
                             {"H1": [1, 2], "H2": [1, 2], "B": [1, 2], "O": [1, 2]},
                             {"H1": True, "H2": True, "B": True, "O": True})
-        folders = os.listdir(self.client.storage_folder)
+        folders = self._store_folders()
         six.assertCountEqual(self, ["Hello", "Other", "Bye"], folders)
         six.assertCountEqual(self, ["build", "source", "export"],
                               os.listdir(os.path.join(self.client.storage_folder,
@@ -152,7 +156,7 @@ class RemoveTest(unittest.TestCase):
                             {"H1": [1, 2], "H2": [1, 2], "B": [1, 2], "O": [1, 2]},
                             {"H1": [], "H2": [], "B": [1, 2], "O": [1, 2]},
                             {"H1": True, "H2": True, "B": True, "O": True})
-        folders = os.listdir(self.client.storage_folder)
+        folders = self._store_folders()
         six.assertCountEqual(self, ["Hello", "Other", "Bye"], folders)
         six.assertCountEqual(self, ["package", "source", "export"],
                               os.listdir(os.path.join(self.client.storage_folder,
@@ -169,7 +173,7 @@ class RemoveTest(unittest.TestCase):
                             {"H1": [1, 2], "H2": [1, 2], "B": [1, 2], "O": [1, 2]},
                             {"H1": [1, 2], "H2": [1, 2], "B": [1, 2], "O": [1, 2]},
                             {"H1": False, "H2": False, "B": True, "O": True})
-        folders = os.listdir(self.client.storage_folder)
+        folders = self._store_folders()
         six.assertCountEqual(self, ["Hello", "Other", "Bye"], folders)
         six.assertCountEqual(self, ["package", "build", "export"],
                               os.listdir(os.path.join(self.client.storage_folder,
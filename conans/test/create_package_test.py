@@ -12,6 +12,7 @@ from conans.model.options import OptionsValues
 from conans.model.settings import Settings
 from conans.client.output import ScopedOutput
 from conans.model.scope import Scopes
+from conans.util.files import load
 
 
 myconan1 = """
@@ -122,3 +123,32 @@ class ExporterTest(unittest.TestCase):
         self.assertFalse(exist("include/opencv2/opencv_mod.hpp"))
         self.assertFalse(exist("include/include/no_copy/lib0.h"))
         self.assertFalse(exist("res/my_data/readme.md"))
+
+    def use_copied_files_test(self):
+        """ package() can work with the files it has just copied
+        """
+        conanfile = """from conans import ConanFile, tools
+import os
+
+class HelloConan(ConanFile):
+    name = "Hello"
+    version = "0.1"
+    exports = "*"
+
+    def package(self):
+        copied = self.copy("*.h", dst="include")
+        header = os.path.join(self.package_folder, "include", "a.h")
+        assert os.path.exists(header)
+        tools.replace_in_file(header, "HELLO", "BYE")
+        self.output.info("COPIED %s" % [os.path.basename(f) for f in copied])
+"""
+        client = TestClient()
+        client.save({CONANFILE: conanfile,
+                     "a.h": "HELLO"})
+        client.run("export lasote/stable")
+        client.run("install Hello/0.1@lasote/stable --build")
+        self.assertIn("COPIED ['a.h']", client.user_io.out)
+        conan_ref = ConanFileReference.loads("Hello/0.1@lasote/stable")
+        package_id = os.listdir(client.paths.packages(conan_ref))[0]
+        package_folder = client.paths.package(PackageReference(conan_ref, package_id))
+        self.assertEqual(load(os.path.join(package_folder, "include", "a.h")), "BYE")
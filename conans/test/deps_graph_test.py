@@ -1,7 +1,10 @@
 import unittest
+import random
 from conans.client.deps_builder import DepsGraph, Node
+from conans.errors import ConanException
 from conans.model.ref import ConanFileReference
 from conans.model.conan_file import ConanFile
+from conans.model.requires import Requirements
 from conans.model.settings import Settings
 
 
@@ -68,3 +71,126 @@ class DepsGraphTest(unittest.TestCase):
         deps.add_edge(2, 32)
         deps.add_edge(32, 5)
         self.assertEqual([[5, 31], [32], [2], [1]], deps.by_levels())
+
+    def cache_invalidation_test(self):
+        deps = DepsGraph()
+        deps.add_node(1)
+        deps.add_node(2)
+        self.assertEqual([[1, 2]], deps.by_levels())
+        deps.add_edge(1, 2)
+        self.assertEqual([[2], [1]], deps.by_levels())
+        self.assertEqual([[1], [2]], deps.inverse_levels())
+        deps.add_node(3)
+        deps.add_edge(2, 3)
+        self.assertEqual([[3], [2], [1]], deps.by_levels())
+        self.assertEqual([[1], [2], [3]], deps.inverse_levels())
+        # The cached levels are not modified by the callers
+        deps.by_levels()[0].append(4)
+        self.assertEqual([[3], [2], [1]], deps.by_levels())
+
+
+def _rescan_levels(nodes, neighbours):
+    """ the previous DepsGraph._order_levels, rescanning all the open nodes on each level
+    """
+    current_level = []
+    result = [current_level]
+    opened = nodes.copy()
+    while opened:
+        current = opened.copy()
+        for o in opened:
+            if not any(n in opened for n in neighbours[o]):
+                current_level.append(o)
+                current.discard(o)
+        current_level.sort()
+        opened = current
+        if opened:
+            current_level = []
+            result.append(current_level)
+    return result
+
+
+class DepsGraphLevelsTest(unittest.TestCase):
+
+    def levels_equivalence_test(self):
+        # Same levels as the previous algorithm, on a random graph
+        deps = synthetic_graph(60, 8, 3)
+        self.assertEqual(deps.by_levels(), _rescan_levels(deps.nodes, deps._neighbors))
+        self.assertEqual(deps.inverse_levels(),
+                         _rescan_levels(deps.nodes, deps._inverse_neighbors))
+
+    def loop_test(self):
+        deps = DepsGraph()
+        for node in (1, 2, 3, 4):
+            deps.add_node(node)
+        deps.add_edge(1, 2)
+        deps.add_edge(2, 3)
+        deps.add_edge(3, 2)
+        deps.add_edge(3, 4)
+        with self.assertRaisesRegexp(ConanException, "Loop detected in the dependency graph"):
+            deps.by_levels()
+
+
+def synthetic_graph(size, window, degree):
+    """ every node depends on up to 'degree' of the previous 'window' nodes
+    """
+    rand = random.Random(size)
+    deps = DepsGraph()
+    for node in range(size):
+        deps.add_node(node)
+        candidates = list(range(max(0, node - window), node))
+        for dependency in rand.sample(candidates, min(degree, len(candidates))):
+            deps.add_edge(node, dependency)
+    return deps
+
+
+class _RequiresConanFile(object):
+    def __init__(self, requires):
+        self.requires = requires
+
+
+def _ref(name):
+    return "Pkg%s/0.1@user/stable" % name
+
+
+def requires_node(name, *requires):
+    """ a Node of the Pkg<name> reference, with a conanfile that only has requirements,
+    given by name, or by (name, "private")
+    """
+    requires = [(_ref(r[0]), ) + r[1:] if isinstance(r, tuple) else _ref(r) for r in requires]
+    return Node(ConanFileReference.loads(_ref(name)),
+                _RequiresConanFile(Requirements(*requires)))
+
+
+class DepsGraphClosureTest(unittest.TestCase):
+
+    def closures_test(self):
+        #  App -> A -> (C private), D -> E
+        #     \-> B ----------------/
+        e = requires_node("E")
+        d = requires_node("D", "E")
+        c = requires_node("C")
+        a = requires_node("A", ("C", "private"), "D")
+        b = requires_node("B", "D")
+        app = requires_node("App", "A", "B")
+        deps = DepsGraph()
+        for node in (app, a, b, c, d, e):
+            deps.add_node(node)
+        for src, dst in ((app, a), (app, b), (a, c), (a, d), (b, d), (d, e)):
+            deps.add_edge(src, dst)
+
+        # The private requirement of A is not propagated to App
+        self.assertEqual(deps.ordered_closure(app), [a, b, d, e])
+        self.assertEqual(deps.ordered_closure(a), [c, d, e])
+        self.assertEqual(deps.ordered_closure(b), [d, e])
+        self.assertEqual(deps.ordered_closure(e), [])
+        self.assertEqual(sorted(deps.public_neighbors(a)), [d])
+
+        self.assertEqual(deps._inverse_closure([_ref("E")]), set([e, d, a, b, app]))
+        self.assertEqual(deps._inverse_closure([_ref("C")]), set([c, a, app]))
+        self.assertEqual(deps._inverse_closure(["ALL"]), deps.nodes)
+
+        # Recomputed when the graph changes
+        top = requires_node("Top", "App")
+        deps.add_node(top)
+        deps.add_edge(top, app)
+        self.assertEqual(deps.ordered_closure(top), [app, a, b, d, e])
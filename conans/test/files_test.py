@@ -3,6 +3,8 @@ import os
 from conans.util.files import save, load
 from conans.test.utils.test_files import temp_folder
 import platform
+from mock import patch
+from conans.client import file_copier
 from conans.client.file_copier import FileCopier
 
 
@@ -59,3 +61,53 @@ class FileCopierTest(unittest.TestCase):
             self.assertEqual("Hello1", load(os.path.join(folder2, "texts/file1.txt")))
             self.assertEqual("Hello1 sub", load(os.path.join(folder2, "texts/sub1/file1.txt")))
             self.assertNotIn("subdir2", os.listdir(os.path.join(folder2, "texts")))
+
+    def multiple_patterns_test(self):
+        folder1 = temp_folder()
+        save(os.path.join(folder1, "include/hello.h"), "header")
+        save(os.path.join(folder1, "build/hello.lib"), "lib")
+        save(os.path.join(folder1, "build/Debug/hello.lib"), "debug lib")
+        save(os.path.join(folder1, ".git/config.h"), "git")
+
+        folder2 = temp_folder()
+        copier = FileCopier(folder1, folder2)
+        headers = copier.add("*.h", "include", "include")
+        libs = copier.add("*.lib", "lib", keep_path=False)
+        self.assertFalse(os.path.exists(os.path.join(folder2, "include")))
+        copier.execute()
+        self.assertEqual(headers, [os.path.join(folder2, "include", "hello.h")])
+        self.assertEqual(len(libs), 2)
+        self.assertEqual(["hello.lib"], os.listdir(os.path.join(folder2, "lib")))
+        self.assertFalse(os.path.exists(os.path.join(folder2, "config.h")))
+
+        # Reading the files of a pending copy does it
+        save(os.path.join(folder1, "include/bye.h"), "header")
+        files = copier.add("*.h", "include2", "include")
+        self.assertEqual(len(files), 2)
+        self.assertEqual(sorted(os.listdir(os.path.join(folder2, "include2"))),
+                         ["bye.h", "hello.h"])
+
+    def walk_once_test(self):
+        folder1 = temp_folder()
+        save(os.path.join(folder1, "include/hello.h"), "header")
+        save(os.path.join(folder1, "include/hello.hpp"), "header")
+        save(os.path.join(folder1, "build/hello.lib"), "lib")
+
+        folder2 = temp_folder()
+        copier = FileCopier(folder1, folder2)
+        walked = []
+
+        def walk_files(src):
+            walked.append(src)
+            return walk(src)
+        walk = file_copier._walk_files
+        with patch.object(file_copier, "_walk_files", walk_files):
+            headers = copier.add("*.h", "include", "include")
+            headers_pp = copier.add("*.hpp", "include", "include")
+            libs = copier.add("*.lib", "lib", keep_path=False)
+            copier.execute()
+        # Only the src subfolder, once for all its patterns
+        self.assertEqual(walked, [os.path.join(folder1, "include"), folder1])
+        self.assertEqual(headers, [os.path.join(folder2, "include", "hello.h")])
+        self.assertEqual(headers_pp, [os.path.join(folder2, "include", "hello.hpp")])
+        self.assertEqual(libs, [os.path.join(folder2, "lib", "hello.lib")])
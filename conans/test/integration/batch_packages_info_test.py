@@ -0,0 +1,91 @@
+import unittest
+from conans.test.tools import TestServer, TestClient, TestRequester
+from conans.test.utils.cpp_test_files import cpp_hello_conan_files
+
+
+class CountingRequester(TestRequester):
+    calls = []
+
+    def get(self, url, auth=None, headers=None, verify=None, stream=None):
+        CountingRequester.calls.append(("GET", url))
+        return super(CountingRequester, self).get(url, auth=auth, headers=headers,
+                                                  verify=verify, stream=stream)
+
+    def post(self, url, auth=None, headers=None, verify=None, stream=None, data=None, json=None):
+        CountingRequester.calls.append(("POST", url))
+        return super(CountingRequester, self).post(url, auth=auth, headers=headers,
+                                                   verify=verify, stream=stream, data=data,
+                                                   json=json)
+
+
+class BatchPackagesInfoTest(unittest.TestCase):
+
+    def _upload_diamond(self, servers, upload_binaries=True):
+        client = TestClient(servers=servers, users={"default": [("lasote", "mypass")]})
+
+        def export_upload(name, deps=None):
+            client.save(cpp_hello_conan_files(name, "0.1", deps, build=False), clean_first=True)
+            client.run("export lasote/stable")
+            if upload_binaries:
+                client.run("install %s/0.1@lasote/stable --build missing" % name)
+                client.run("upload %s/0.1@lasote/stable --all" % name)
+            else:
+                client.run("upload %s/0.1@lasote/stable" % name)
+
+        export_upload("Hello0")
+        export_upload("Hello1", ["Hello0/0.1@lasote/stable"])
+        export_upload("Hello2", ["Hello0/0.1@lasote/stable"])
+        export_upload("Hello3", ["Hello1/0.1@lasote/stable", "Hello2/0.1@lasote/stable"])
+
+    def _install(self, servers, command="install . -g txt"):
+        CountingRequester.calls = []
+        client = TestClient(servers=servers, users={"default": [("lasote", "mypass")]},
+                            requester_class=CountingRequester)
+        client.save(cpp_hello_conan_files("Hello4", "0.1", ["Hello3/0.1@lasote/stable"],
+                                          build=False))
+        client.run(command)
+        return client
+
+    def batch_test(self):
+        servers = {"default": TestServer()}
+        self._upload_diamond(servers)
+        client = self._install(servers)
+
+        output = str(client.user_io.out)
+        for dep in ("Hello0", "Hello1", "Hello2", "Hello3"):
+            self.assertIn("%s/0.1@lasote/stable: Installing package" % dep, output)
+        self.assertNotIn("Building", output)
+
+        batch_calls = [url for method, url in CountingRequester.calls
+                       if method == "POST" and url.endswith("/packages/info")]
+        self.assertEqual(len(batch_calls), 1)
+        # Just the ones to retrieve the binaries, none to check if they exist
+        package_urls = [url for method, url in CountingRequester.calls
+                        if method == "GET" and "/packages/" in url and
+                        url.endswith("/download_urls")]
+        self.assertEqual(len(package_urls), 4)
+
+    def missing_binaries_test(self):
+        servers = {"default": TestServer()}
+        self._upload_diamond(servers, upload_binaries=False)
+        client = self._install(servers, "install . -g txt --build missing")
+
+        output = str(client.user_io.out)
+        for dep in ("Hello0", "Hello1", "Hello2", "Hello3"):
+            self.assertIn("%s/0.1@lasote/stable: Building your package" % dep, output)
+        package_urls = [url for method, url in CountingRequester.calls
+                        if method == "GET" and "/packages/" in url]
+        self.assertEqual(package_urls, [])
+
+    def server_without_batch_test(self):
+        servers = {"default": TestServer(server_capabilities=[])}
+        self._upload_diamond(servers)
+        client = self._install(servers)
+
+        output = str(client.user_io.out)
+        for dep in ("Hello0", "Hello1", "Hello2", "Hello3"):
+            self.assertIn("%s/0.1@lasote/stable: Installing package" % dep, output)
+        self.assertNotIn("Building", output)
+        batch_calls = [url for method, url in CountingRequester.calls
+                       if url.endswith("/packages/info")]
+        self.assertEqual(batch_calls, [])
@@ -0,0 +1,87 @@
+import unittest
+import os
+from conans.model.ref import ConanFileReference, PackageReference
+from conans.paths import CONANFILE
+from conans.test.tools import TestClient
+from conans.tools import environment_append
+from conans.util.files import load
+
+
+conanfile = """from conans import ConanFile
+import os
+
+class HelloConan(ConanFile):
+    name = "Hello"
+    version = "0.1"
+    exports = "*"
+
+    def build(self):
+        builds = 1
+        if os.path.exists("output.txt"):
+            builds += int(open("output.txt").read())
+        open("output.txt", "w").write(str(builds))
+        self.output.info("BUILDS: %d" % builds)
+"""
+
+
+class IncrementalBuildTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient()
+        self.client.save({CONANFILE: conanfile,
+                          "src/main.c": "main",
+                          "src/removed.c": "removed",
+                          "src/other.c": "other"})
+        self.client.run("export lasote/stable")
+        conan_ref = ConanFileReference.loads("Hello/0.1@lasote/stable")
+        self.client.run("install %s --build" % str(conan_ref))
+        package_id = self.client.paths.conan_builds(conan_ref)[0]
+        self.build_folder = self.client.paths.build(PackageReference(conan_ref, package_id))
+
+    def _rebuild(self, incremental):
+        with environment_append({"CONAN_INCREMENTAL_BUILDS": str(incremental)}):
+            self.client.run("install Hello/0.1@lasote/stable --build")
+
+    def incremental_test(self):
+        self._rebuild(True)
+        # There was no manifest of the sources, built from scratch
+        self.assertIn("BUILDS: 1", self.client.user_io.out)
+
+        other_mtime = os.path.getmtime(os.path.join(self.build_folder, "src", "other.c"))
+        os.remove(os.path.join(self.client.current_folder, "src", "removed.c"))
+        self.client.save({"src/main.c": "main changed",
+                          "src/new.c": "new"})
+        self.client.run("export lasote/stable")
+        self._rebuild(True)
+        self.assertIn("BUILDS: 2", self.client.user_io.out)
+        # main.c, new.c and the conanmanifest.txt of the export
+        self.assertIn("Incremental build, 3 changed source files updated", self.client.user_io.out)
+        self.assertEqual(load(os.path.join(self.build_folder, "src", "main.c")), "main changed")
+        self.assertEqual(load(os.path.join(self.build_folder, "src", "new.c")), "new")
+        self.assertFalse(os.path.exists(os.path.join(self.build_folder, "src", "removed.c")))
+        self.assertEqual(os.path.getmtime(os.path.join(self.build_folder, "src", "other.c")),
+                         other_mtime)
+
+        self._rebuild(True)
+        self.assertIn("BUILDS: 3", self.client.user_io.out)
+        self.assertIn("Incremental build, 0 changed source files updated", self.client.user_io.out)
+
+    def patched_sources_test(self):
+        # The build patches its sources, the next one starts from the unpatched ones again
+        self.client.save({CONANFILE: conanfile.replace("    def build(self):", """    def build(self):
+        from conans import tools
+        tools.replace_in_file("src/main.c", "main", "main patched")
+        self.output.info("MAIN: %s" % open("src/main.c").read())""")})
+        self.client.run("export lasote/stable")
+        self._rebuild(True)
+        self.assertIn("MAIN: main patched", self.client.user_io.out)
+        self._rebuild(True)
+        self.assertIn("BUILDS: 2", self.client.user_io.out)
+        self.assertIn("Incremental build, 1 changed source files updated", self.client.user_io.out)
+        self.assertIn("MAIN: main patched\n", self.client.user_io.out)
+
+    def not_incremental_test(self):
+        self._rebuild(True)
+        self._rebuild(False)
+        self.assertIn("BUILDS: 1", self.client.user_io.out)
+        self.assertNotIn("Incremental build", self.client.user_io.out)
@@ -0,0 +1,95 @@
+import unittest
+import os
+import time
+from conans.client.build_scheduler import fork_available
+from conans.paths import CONANFILE
+from conans.test.tools import TestClient
+from conans.test.utils.test_files import temp_folder
+from conans.tools import environment_append
+from conans.util.files import load
+
+
+conanfile = """from conans import ConanFile
+import os, time
+
+class HelloConan(ConanFile):
+    name = "%s"
+    version = "0.1"
+    requires = %s
+
+    def build(self):
+        open(os.path.join(r"%s", self.name + ".start"), "w").write(repr(time.time()))
+        time.sleep(%s)
+        %s
+        open(os.path.join(r"%s", self.name + ".end"), "w").write(repr(time.time()))
+        self.output.info("BUILT")
+"""
+
+
+@unittest.skipUnless(fork_available(), "Parallel builds need fork")
+class ParallelBuildTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient()
+        self.times_folder = temp_folder()
+
+    def _export(self, name, requires=None, sleep=1, fail=False):
+        requires = ", ".join('"%s/0.1@lasote/stable"' % r for r in requires or [])
+        content = conanfile % (name, "(%s)" % requires if requires else "None",
+                               self.times_folder, sleep,
+                               "raise Exception('%s failed')" % name if fail else "",
+                               self.times_folder)
+        self.client.save({CONANFILE: content}, clean_first=True)
+        self.client.run("export lasote/stable")
+
+    def _time(self, name, event):
+        return float(load(os.path.join(self.times_folder, "%s.%s" % (name, event))))
+
+    def parallel_test(self):
+        self._export("Hello0")
+        self._export("Hello1")
+        self._export("Hello2", requires=["Hello0", "Hello1"], sleep=0)
+        with environment_append({"CONAN_PARALLEL_BUILDS": "2"}):
+            self.client.run("install Hello2/0.1@lasote/stable --build")
+
+        output = str(self.client.user_io.out)
+        for name in ("Hello0", "Hello1", "Hello2"):
+            self.assertIn("%s/0.1@lasote/stable: BUILT" % name, output)
+        # The independent ones at the same time, the consumer once both are installed
+        self.assertLess(self._time("Hello0", "start"), self._time("Hello1", "end"))
+        self.assertLess(self._time("Hello1", "start"), self._time("Hello0", "end"))
+        self.assertGreater(self._time("Hello2", "start"), self._time("Hello0", "end"))
+        self.assertGreater(self._time("Hello2", "start"), self._time("Hello1", "end"))
+        # The output of each build is not mixed with the others
+        self.assertIn("Hello0/0.1@lasote/stable: Generated txt created conanbuildinfo.txt\n"
+                      "Hello0/0.1@lasote/stable: BUILT", output)
+        self.assertIn("Hello1/0.1@lasote/stable: Generated txt created conanbuildinfo.txt\n"
+                      "Hello1/0.1@lasote/stable: BUILT", output)
+
+    def fail_fast_test(self):
+        self._export("Hello0", sleep=0, fail=True)
+        self._export("Hello1", sleep=60)
+        self._export("Hello2", requires=["Hello0", "Hello1"], sleep=0)
+        t1 = time.time()
+        with environment_append({"CONAN_PARALLEL_BUILDS": "2"}):
+            error = self.client.run("install Hello2/0.1@lasote/stable --build", ignore_error=True)
+        self.assertTrue(error)
+        self.assertLess(time.time() - t1, 30)
+        self.assertIn("Hello0 failed", str(self.client.user_io.out))
+        self.assertFalse(os.path.exists(os.path.join(self.times_folder, "Hello1.end")))
+        self.assertFalse(os.path.exists(os.path.join(self.times_folder, "Hello2.start")))
+
+    def private_and_public_test(self):
+        # Hello0 is built as private requirement of Hello1, its public node waits for it
+        self._export("Hello0")
+        self.client.save({CONANFILE: conanfile.replace("requires = %s",
+                                                       'requires = (("Hello0/0.1@lasote/stable", '
+                                                       '"private"), )')
+                          % ("Hello1", self.times_folder, 0, "", self.times_folder)})
+        self.client.run("export lasote/stable")
+        self._export("Hello2", requires=["Hello0", "Hello1"], sleep=0)
+        with environment_append({"CONAN_PARALLEL_BUILDS": "2"}):
+            self.client.run("install Hello2/0.1@lasote/stable --build missing")
+        output = str(self.client.user_io.out)
+        self.assertEqual(output.count("Hello0/0.1@lasote/stable: BUILT"), 1)
+        self.assertIn("Hello2/0.1@lasote/stable: BUILT", output)
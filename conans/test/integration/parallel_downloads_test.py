@@ -0,0 +1,126 @@
+import unittest
+import os
+from conans.test.tools import TestServer, TestClient
+from conans.test.utils.cpp_test_files import cpp_hello_conan_files
+from conans.model.build_info import DepsCppInfo
+from conans.model.ref import ConanFileReference, PackageReference
+from conans.util.files import load, save
+from conans.paths import BUILD_INFO, CONANFILE
+from conans.client.conf import ConanClientConfigParser
+from conans.test.utils.test_files import temp_folder
+from conans import tools
+
+
+class ParallelDownloadsTest(unittest.TestCase):
+
+    def conf_test(self):
+        tmp_dir = temp_folder()
+        conf_path = os.path.join(tmp_dir, "conan.conf")
+        save(conf_path, "[storage]\npath: ~/.conan/data\n")
+        self.assertEqual(ConanClientConfigParser(conf_path).parallel_downloads, 1)
+        save(conf_path, "[storage]\npath: ~/.conan/data\n[general]\nparallel_downloads: 4\n")
+        self.assertEqual(ConanClientConfigParser(conf_path).parallel_downloads, 4)
+        with tools.environment_append({"CONAN_PARALLEL_DOWNLOADS": "2"}):
+            self.assertEqual(ConanClientConfigParser(conf_path).parallel_downloads, 2)
+
+    def diamond_test(self):
+        servers = {"default": TestServer()}
+        client = TestClient(servers=servers, users={"default": [("lasote", "mypass")]})
+
+        def export_upload(name, deps=None):
+            client.save(cpp_hello_conan_files(name, "0.1", deps, build=False), clean_first=True)
+            client.run("export lasote/stable")
+            client.run("install %s/0.1@lasote/stable --build missing" % name)
+            client.run("upload %s/0.1@lasote/stable --all" % name)
+
+        export_upload("Hello0")
+        export_upload("Hello1", ["Hello0/0.1@lasote/stable"])
+        export_upload("Hello2", ["Hello0/0.1@lasote/stable"])
+        export_upload("Hello3", ["Hello1/0.1@lasote/stable", "Hello2/0.1@lasote/stable"])
+
+        client2 = TestClient(servers=servers, users={"default": [("lasote", "mypass")]})
+        conf = load(client2.paths.conan_conf_path)
+        save(client2.paths.conan_conf_path,
+             conf.replace("[general]", "[general]\nparallel_downloads: 4"))
+        client2.save(cpp_hello_conan_files("Hello4", "0.1", ["Hello3/0.1@lasote/stable"],
+                                           build=False))
+        client2.run("install . -g txt")
+
+        output = str(client2.user_io.out)
+        for dep in ("Hello0", "Hello1", "Hello2", "Hello3"):
+            self.assertIn("%s/0.1@lasote/stable: Installing package" % dep, output)
+        self.assertNotIn("Building", output)
+
+        deps_cpp_info = DepsCppInfo.loads(load(os.path.join(client2.current_folder,
+                                                            BUILD_INFO)))
+        for dep in ("Hello3", "Hello2", "Hello1", "Hello0"):
+            self.assertEqual(deps_cpp_info[dep].libs, ["hello%s" % dep])
+            self.assertTrue(os.path.exists(deps_cpp_info[dep].rootpath))
+        # Propagated in order, even if the binaries were retrieved concurrently
+        self.assertEqual(deps_cpp_info.libs,
+                         ["helloHello3", "helloHello1", "helloHello2", "helloHello0"])
+
+    def download_while_building_test(self):
+        servers = {"default": TestServer()}
+        client = TestClient(servers=servers, users={"default": [("lasote", "mypass")]})
+        client.save(cpp_hello_conan_files("Hello1", "0.1", build=False))
+        client.run("export lasote/stable")
+        client.run("install Hello1/0.1@lasote/stable --build missing")
+        client.run("upload Hello1/0.1@lasote/stable --all")
+        ref = ConanFileReference.loads("Hello1/0.1@lasote/stable")
+        package_ref = PackageReference(ref, client.paths.conan_packages(ref)[0])
+
+        client2 = TestClient(servers=servers, users={"default": [("lasote", "mypass")]})
+        package_folder = client2.paths.package(package_ref)
+        # Built before retrieving Hello1, that waits for it in background
+        client2.save({CONANFILE: """from conans import ConanFile
+import os, time
+
+class HelloConan(ConanFile):
+    name = "Hello0"
+    version = "0.1"
+
+    def build(self):
+        limit = time.time() + 20
+        while not os.path.exists(os.path.join(r"%s", "conaninfo.txt")):
+            if time.time() > limit:
+                raise Exception("Not retrieved")
+            time.sleep(0.1)
+        self.output.info("Retrieved while building")
+""" % package_folder})
+        client2.run("export lasote/stable")
+        client2.save({CONANFILE: """from conans import ConanFile
+
+class HelloConan(ConanFile):
+    requires = "Hello0/0.1@lasote/stable", "Hello1/0.1@lasote/stable"
+"""}, clean_first=True)
+        client2.run("install . --build Hello0")
+        self.assertIn("Hello0/0.1@lasote/stable: Retrieved while building", client2.user_io.out)
+        self.assertIn("Hello1/0.1@lasote/stable: Installing package", client2.user_io.out)
+
+    def _private_and_public_install(self, parallel_downloads):
+        """ glm is built as a private requirement of gf, the public node of glm is the
+        same package, it cannot be retrieved before that build
+        """
+        client = TestClient()
+        for name, deps in (("glew", None),
+                           ("glm", None),
+                           ("gf", [("glm/0.1@lasote/stable", "private"),
+                                   "glew/0.1@lasote/stable"]),
+                           ("ImGuiTest", ["glm/0.1@lasote/stable", "gf/0.1@lasote/stable"])):
+            client.save(cpp_hello_conan_files(name, "0.1", deps, build=False),
+                        clean_first=True)
+            client.run("export lasote/stable")
+        client.save(cpp_hello_conan_files("Project", "0.1", ["ImGuiTest/0.1@lasote/stable"],
+                                          build=False), clean_first=True)
+        with tools.environment_append({"CONAN_PARALLEL_DOWNLOADS": str(parallel_downloads)}):
+            client.run("install . --build=missing -g txt")
+        self.assertEqual(str(client.user_io.out).count("glm/0.1@lasote/stable: "
+                                                       "Generating the package"), 1)
+        self.assertIn("helloglm", load(os.path.join(client.current_folder, BUILD_INFO)))
+
+    def private_and_public_built_test(self):
+        self._private_and_public_install(parallel_downloads=1)
+
+    def private_and_public_parallel_test(self):
+        self._private_and_public_install(parallel_downloads=4)
@@ -0,0 +1,67 @@
+import unittest
+import os
+from conans.test.tools import TestServer, TestClient
+from conans.test.utils.cpp_test_files import cpp_hello_conan_files
+from conans.model.ref import ConanFileReference
+from conans.client.remote_registry import RemoteRegistry
+from conans.util.files import load, save
+from collections import OrderedDict
+
+
+class ParallelRemotesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.servers = OrderedDict()
+        for name in ("remote0", "remote1", "remote2"):
+            self.servers[name] = TestServer([("*/*@*/*", "*")], [("*/*@*/*", "*")],
+                                            users={"lasote": "mypass"})
+        self.users = {name: [("lasote", "mypass")] for name in self.servers}
+
+    def _upload(self, remotes, msg):
+        client = TestClient(servers=self.servers, users=self.users)
+        client.save(cpp_hello_conan_files("Hello0", "0.1", build=False, msg=msg))
+        client.run("export lasote/stable")
+        for remote in remotes:
+            client.run("upload Hello0/0.1@lasote/stable -r %s" % remote)
+
+    def _client(self):
+        client = TestClient(servers=self.servers, users=self.users)
+        conf = load(client.paths.conan_conf_path)
+        save(client.paths.conan_conf_path,
+             conf.replace("[general]", "[general]\nparallel_remotes: True"))
+        return client
+
+    def retrieve_recipe_test(self):
+        self._upload(["remote2"], "Hello from remote2")
+        self._upload(["remote1"], "Hello from remote1")
+
+        client = self._client()
+        client.run("info Hello0/0.1@lasote/stable")
+        output = str(client.user_io.out)
+        # Only the chosen remote is used to download it, and the priority is kept
+        self.assertIn("Trying with 'remote1'...", output)
+        self.assertNotIn("Trying with 'remote0'", output)
+        self.assertNotIn("Trying with 'remote2'", output)
+        self.assertIn("Remote: remote1", output)
+        ref = ConanFileReference.loads("Hello0/0.1@lasote/stable")
+        registry = RemoteRegistry(client.paths.registry, client.user_io.out)
+        self.assertEqual(registry.get_ref(ref).name, "remote1")
+        export = client.paths.export(ref)
+        sources = "".join(load(os.path.join(export, f)) for f in os.listdir(export)
+                          if f.endswith(".cpp"))
+        self.assertIn("Hello from remote1", sources)
+
+    def not_found_test(self):
+        client = self._client()
+        error = client.run("info Hello0/0.1@lasote/stable", ignore_error=True)
+        self.assertTrue(error)
+        self.assertIn("Unable to find 'Hello0/0.1@lasote/stable' in remotes",
+                      client.user_io.out)
+
+    def search_remotes_test(self):
+        self._upload(["remote2"], "Hello")
+        client = self._client()
+        client.save({"conanfile.txt": "[requires]\nHello0/[~0.1]@lasote/stable"})
+        client.run("info")
+        self.assertIn("Hello0/0.1@lasote/stable", client.user_io.out)
+        self.assertIn("Remote: remote2", client.user_io.out)
@@ -0,0 +1,92 @@
+import unittest
+import os
+from mock import patch
+from conans.client import remote_manager
+from conans.test.tools import TestServer, TestClient
+from conans.test.utils.cpp_test_files import cpp_hello_conan_files
+from conans.model.ref import ConanFileReference, PackageReference
+from conans.paths import PACKAGE_TGZ_NAME
+from conans.util.files import load, save
+
+
+class ParallelUploadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = TestServer()
+        self.client = TestClient(servers={"default": self.server},
+                                 users={"default": [("lasote", "mypass")]})
+        conf = load(self.client.paths.conan_conf_path)
+        save(self.client.paths.conan_conf_path,
+             conf.replace("[general]", "[general]\nparallel_uploads: 4"))
+        for name in ("Hello0", "Hello1"):
+            self.client.save(cpp_hello_conan_files(name, "0.1", build=False), clean_first=True)
+            self.client.run("export lasote/stable")
+            for language in (0, 1):
+                for static in (True, False):
+                    self.client.run("install %s/0.1@lasote/stable --build missing "
+                                    "-o language=%d -o static=%s" % (name, language, static))
+
+    def _server_packages(self, name):
+        ref = ConanFileReference.loads("%s/0.1@lasote/stable" % name)
+        packages_folder = self.server.paths.packages(ref)
+        return sorted(os.listdir(packages_folder)) if os.path.exists(packages_folder) else []
+
+    def _local_packages(self, name):
+        ref = ConanFileReference.loads("%s/0.1@lasote/stable" % name)
+        return sorted(self.client.paths.conan_packages(ref))
+
+    def upload_all_test(self):
+        self.client.run("upload Hello* --all --confirm")
+        output = str(self.client.user_io.out)
+        self.assertIn("Uploading Hello0/0.1@lasote/stable", output)
+        self.assertIn("Uploading Hello1/0.1@lasote/stable", output)
+        self.assertIn("Uploading package 4/4", output)
+        for name in ("Hello0", "Hello1"):
+            self.assertEqual(len(self._local_packages(name)), 4)
+            self.assertEqual(self._server_packages(name), self._local_packages(name))
+            # Compressed in advance, in the local cache
+            ref = ConanFileReference.loads("%s/0.1@lasote/stable" % name)
+            for package_id in self._local_packages(name):
+                package_folder = self.client.paths.package(PackageReference(ref, package_id))
+                self.assertTrue(os.path.exists(os.path.join(package_folder,
+                                                            PACKAGE_TGZ_NAME)))
+
+    def failure_summary_test(self):
+        ref = ConanFileReference.loads("Hello0/0.1@lasote/stable")
+        package_id = self._local_packages("Hello0")[0]
+        package_folder = self.client.paths.package(PackageReference(ref, package_id))
+        save(os.path.join(package_folder, "include", "helloHello0.h"), "corrupted")
+
+        error = self.client.run("upload Hello* --all --confirm", ignore_error=True)
+        self.assertTrue(error)
+        output = str(self.client.user_io.out)
+        self.assertIn("Errors uploading:", output)
+        self.assertIn("Hello0/0.1@lasote/stable:%s: Cannot upload corrupted package" % package_id,
+                      output)
+        # The other ones were uploaded anyway
+        self.assertEqual(self._server_packages("Hello0"), self._local_packages("Hello0")[1:])
+        self.assertEqual(self._server_packages("Hello1"), self._local_packages("Hello1"))
+
+    def compression_failure_test(self):
+        gzopen = remote_manager.gzopen_without_timestamps
+
+        def failing_gzopen(name, mode="r", fileobj=None, **kwargs):
+            tgz = gzopen(name, mode, fileobj, **kwargs)
+            if name == PACKAGE_TGZ_NAME:
+                tgz.addfile = lambda *args, **kwargs: fileobj.write(b"truncated") and 1 / 0
+            return tgz
+
+        # The compression pool is forked with the patched function
+        with patch.object(remote_manager, "gzopen_without_timestamps", failing_gzopen):
+            error = self.client.run("upload Hello0* --all --confirm", ignore_error=True)
+        self.assertTrue(error)
+        output = str(self.client.user_io.out)
+        self.assertIn("Error compressing the package", output)
+        # Nothing truncated is uploaded or left in the local cache
+        self.assertEqual(self._server_packages("Hello0"), [])
+        ref = ConanFileReference.loads("Hello0/0.1@lasote/stable")
+        for package_id in self._local_packages("Hello0"):
+            package_folder = self.client.paths.package(PackageReference(ref, package_id))
+            self.assertFalse(os.path.exists(os.path.join(package_folder, PACKAGE_TGZ_NAME)))
+            self.assertFalse(os.path.exists(os.path.join(package_folder,
+                                                         PACKAGE_TGZ_NAME + ".tmp")))
@@ -0,0 +1,101 @@
+import unittest
+import os
+import json
+from conans.client.store.metadata_cache import RemoteMetadataCache
+from conans.test.tools import TestServer, TestClient, TestRequester
+from conans.test.utils.cpp_test_files import cpp_hello_conan_files
+from conans.test.utils.test_files import temp_folder
+from conans.model.ref import ConanFileReference, PackageReference
+from conans.util.files import load, save
+
+
+class RecordingRequester(TestRequester):
+    calls = []
+
+    def get(self, url, auth=None, headers=None, verify=None, stream=None):
+        response = super(RecordingRequester, self).get(url, auth=auth, headers=headers,
+                                                       verify=verify, stream=stream)
+        RecordingRequester.calls.append(("GET", url, response.status_code))
+        return response
+
+    def post(self, url, auth=None, headers=None, verify=None, stream=None, data=None, json=None):
+        response = super(RecordingRequester, self).post(url, auth=auth, headers=headers,
+                                                        verify=verify, stream=stream,
+                                                        data=data, json=json)
+        RecordingRequester.calls.append(("POST", url, response.status_code))
+        return response
+
+
+class RemoteMetadataCacheTest(unittest.TestCase):
+
+    def cache_test(self):
+        cache = RemoteMetadataCache(temp_folder(), ttl=100)
+        ref = ConanFileReference.loads("Hello/0.1@lasote/stable")
+        package_ref = PackageReference(ref, "123")
+        self.assertIsNone(cache.get("http://remote", ref, "conanmanifest.txt"))
+        self.assertFalse(cache.is_fresh(None))
+
+        cache.put("http://remote", ref, "conanmanifest.txt", "recipe", '"etag1"')
+        cache.put("http://remote", package_ref, "conanmanifest.txt", "package")
+        entry = cache.get("http://remote/", ref, "conanmanifest.txt")
+        self.assertEqual((entry.content, entry.etag), ("recipe", '"etag1"'))
+        self.assertTrue(cache.is_fresh(entry))
+        self.assertEqual(cache.get("http://remote", package_ref, "conanmanifest.txt").content,
+                         "package")
+        self.assertIsNone(cache.get("http://other", ref, "conanmanifest.txt"))
+
+        entry.timestamp -= 101
+        self.assertFalse(cache.is_fresh(entry))
+
+        cache.invalidate("http://remote", ref)
+        self.assertIsNone(cache.get("http://remote", ref, "conanmanifest.txt"))
+        self.assertIsNone(cache.get("http://remote", package_ref, "conanmanifest.txt"))
+
+    def install_update_test(self):
+        servers = {"default": TestServer()}
+        client = TestClient(servers=servers, users={"default": [("lasote", "mypass")]})
+        client.save(cpp_hello_conan_files("Hello0", "0.1", build=False))
+        client.run("export lasote/stable")
+        client.run("install Hello0/0.1@lasote/stable --build missing")
+        client.run("upload Hello0/0.1@lasote/stable --all")
+
+        client2 = TestClient(servers=servers, users={"default": [("lasote", "mypass")]},
+                             requester_class=RecordingRequester)
+        conf = load(client2.paths.conan_conf_path)
+        save(client2.paths.conan_conf_path,
+             conf.replace("[general]", "[general]\nremote_metadata_ttl: 3600"))
+        client2.save(cpp_hello_conan_files("Hello1", "0.1", ["Hello0/0.1@lasote/stable"],
+                                           build=False))
+        client2.run("install . -u")
+        self.assertIn("Hello0/0.1@lasote/stable: Installing package", client2.user_io.out)
+
+        RecordingRequester.calls = []
+        client2.run("install . -u")
+        self.assertIn("Hello0/0.1@lasote/stable: Already installed!", client2.user_io.out)
+        self.assertEqual(RecordingRequester.calls, [])
+
+        # Once expired, the manifests are revalidated but not downloaded again
+        for root, _, files in os.walk(client2.paths.metadata_cache_path):
+            for f in files:
+                data = json.loads(load(os.path.join(root, f)))
+                data["timestamp"] -= 3600
+                save(os.path.join(root, f), json.dumps(data))
+        RecordingRequester.calls = []
+        client2.run("install . -u")
+        self.assertIn("Hello0/0.1@lasote/stable: Already installed!", client2.user_io.out)
+        manifest_calls = [code for _, url, code in RecordingRequester.calls
+                          if "conanmanifest.txt" in url]
+        self.assertEqual(manifest_calls, [304, 304])  # Recipe and package
+
+        # A new revision uploaded by this client is not hidden by the cache
+        client2.save(cpp_hello_conan_files("Hello0", "0.1", build=False,
+                                           msg="Hello World modified"), clean_first=True)
+        client2.run("export lasote/stable")
+        client2.run("upload Hello0/0.1@lasote/stable")
+        client2.save(cpp_hello_conan_files("Hello1", "0.1", ["Hello0/0.1@lasote/stable"],
+                                           build=False), clean_first=True)
+        RecordingRequester.calls = []
+        client2.run("install . -u --build missing")
+        manifest_calls = [code for _, url, code in RecordingRequester.calls
+                          if "conanmanifest.txt" in url]
+        self.assertIn(200, manifest_calls)
@@ -0,0 +1,158 @@
+import unittest
+import os
+import subprocess
+import sys
+import threading
+import time
+import conans
+from conans.client.client_cache import ClientCache
+from conans.model.ref import ConanFileReference
+from conans.test.tools import TestBufferConanOutput, TestClient
+from conans.test.utils.cpp_test_files import cpp_hello_conan_files
+from conans.test.utils.test_files import temp_folder
+from conans.util.files import save
+from conans.util.locks import ReadWriteLocks
+
+
+reader_script = """
+import os, sys, time
+from conans.util.locks import ReadWriteLocks
+
+folder, name = sys.argv[1], sys.argv[2]
+with ReadWriteLocks(folder).read([name]):
+    open(os.path.join(folder, "ready"), "w").close()
+    limit = time.time() + 30  # Not forever if the test fails
+    while not os.path.exists(os.path.join(folder, "stop")) and time.time() < limit:
+        time.sleep(0.05)
+"""
+
+
+def _wait_for(condition, timeout=20):
+    limit = time.time() + timeout
+    while not condition():
+        if time.time() > limit:
+            raise AssertionError("Timeout")
+        time.sleep(0.05)
+
+
+class ReadWriteLocksTest(unittest.TestCase):
+
+    def readers_writer_test(self):
+        locks = ReadWriteLocks(temp_folder())
+        with locks.read(["Hello/0.1@lasote/stable", "Bye/0.1@lasote/stable"]):
+            self.assertIsNone(locks.acquire_write("Hello/0.1@lasote/stable", blocking=False))
+            writer = locks.acquire_write("Other/0.1@lasote/stable", blocking=False)
+            self.assertIsNotNone(writer)
+            writer.release()
+        writer = locks.acquire_write("Hello/0.1@lasote/stable", blocking=False)
+        self.assertIsNotNone(writer)
+        writer.release()
+
+    def dead_reader_test(self):
+        folder = temp_folder()
+        # The files of a reader process that was killed, nothing holds the lock
+        save(os.path.join(folder, "readers", "1234.names"), "Hello/0.1@lasote/stable\n")
+        save(os.path.join(folder, "readers", "1234.lock"), "")
+        locks = ReadWriteLocks(folder)
+        writer = locks.acquire_write("Hello/0.1@lasote/stable", blocking=False)
+        self.assertIsNotNone(writer)
+        writer.release()
+        self.assertEqual(os.listdir(os.path.join(folder, "readers")), [])
+
+    def other_process_reader_test(self):
+        folder = temp_folder()
+        name = "Hello/0.1@lasote/stable"
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.abspath(conans.__file__)))
+        process = subprocess.Popen([sys.executable, "-c", reader_script, folder, name], env=env)
+        try:
+            _wait_for(lambda: os.path.exists(os.path.join(folder, "ready")))
+            locks = ReadWriteLocks(folder)
+            self.assertIsNone(locks.acquire_write(name, blocking=False))
+
+            waited = []
+            acquired = []
+
+            def write():
+                with locks.write(name, waiting=lambda: waited.append(True)):
+                    acquired.append(True)
+            writer = threading.Thread(target=write)
+            writer.start()
+            _wait_for(lambda: waited)
+            self.assertEqual(acquired, [])
+            save(os.path.join(folder, "stop"), "")
+            writer.join(20)
+            self.assertEqual(acquired, [True])
+        finally:
+            save(os.path.join(folder, "stop"), "")
+            process.wait()
+
+    def reader_waits_writer_test(self):
+        locks = ReadWriteLocks(temp_folder())
+        name = "Hello/0.1@lasote/stable"
+        writer = locks.acquire_write(name)
+        read = []
+
+        def reader():
+            with locks.read([name, "Bye/0.1@lasote/stable"]):
+                read.append(True)
+        thread = threading.Thread(target=reader)
+        thread.start()
+        time.sleep(0.2)
+        self.assertEqual(read, [])
+        writer.release()
+        thread.join(20)
+        self.assertEqual(read, [True])
+
+    def thread_writers_test(self):
+        locks = ReadWriteLocks(temp_folder())
+        name = "Hello/0.1@lasote/stable:1234"
+        inside = []
+        overlapped = []
+
+        def write():
+            for _ in range(10):
+                with locks.write(name):
+                    inside.append(True)
+                    if len(inside) > 1:
+                        overlapped.append(True)
+                    time.sleep(0.001)
+                    inside.pop()
+        threads = [threading.Thread(target=write) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(20)
+        self.assertEqual(overlapped, [])
+
+    def shared_store_test(self):
+        # Different conan homes using the same store exclude each other
+        store = temp_folder()
+        cache1 = ClientCache(temp_folder(), store, TestBufferConanOutput())
+        cache2 = ClientCache(temp_folder(), store, TestBufferConanOutput())
+        conan_ref = ConanFileReference.loads("Hello/0.1@lasote/stable")
+        with cache1.using([conan_ref]):
+            self.assertIsNone(cache2.locks.acquire_write(str(conan_ref), blocking=False))
+
+    def install_used_by_other_process_test(self):
+        # Other install reading the recipe doesn't block this one if it is already there
+        client = TestClient()
+        client.save(cpp_hello_conan_files("Hello0", "0.1", build=False))
+        client.run("export lasote/stable")
+        client.run("install Hello0/0.1@lasote/stable --build missing")
+
+        folder = client.paths.locks_folder
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.abspath(conans.__file__)))
+        process = subprocess.Popen([sys.executable, "-c", reader_script, folder,
+                                    "Hello0/0.1@lasote/stable"], env=env)
+        try:
+            _wait_for(lambda: os.path.exists(os.path.join(folder, "ready")))
+            t1 = time.time()
+            client.run("install Hello0/0.1@lasote/stable")
+            self.assertLess(time.time() - t1, 10)
+            self.assertNotIn("Waiting for other process", client.user_io.out)
+            self.assertIsNone(process.poll())  # Still reading meanwhile
+        finally:
+            save(os.path.join(folder, "stop"), "")
+            process.wait()
@@ -44,3 +44,18 @@ class ManifestTest(unittest.TestCase):
         # Not included the pycs or pyo
         self.assertEquals(set(read_manifest.file_sums.keys()),
                           set(["conanfile.py"]))
+
+    def many_and_big_files_test(self):
+        tmp_dir = temp_folder()
+        files = {"file%d.h" % i: "content %d" % i for i in range(50)}
+        files["lib/big.a"] = "x" * (3 * 1024 * 1024 + 7)  # Memory mapped
+        files["empty.txt"] = ""
+        for filename, content in files.items():
+            save(os.path.join(tmp_dir, filename), content)
+
+        manifest = FileTreeManifest.create(tmp_dir)
+        self.assertEqual(manifest.file_sums, {f: md5(c) for f, c in files.items()})
+        # The format every client understands, "file: md5"
+        for line in str(manifest).splitlines()[1:]:
+            filename, file_md5 = line.split(": ")
+            self.assertEqual(file_md5, md5(files[filename]))
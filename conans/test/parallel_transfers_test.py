@@ -0,0 +1,112 @@
+import unittest
+import os
+from mock import patch
+from conans.client.rest.uploader_downloader import Downloader
+from conans.test.tools import TestClient, TestServer, TestRequester
+from conans.test.utils.cpp_test_files import cpp_hello_conan_files
+from conans.model.ref import ConanFileReference, PackageReference
+from conans.util.files import load, save
+from conans.paths import CONANINFO, CONAN_MANIFEST, CONANFILE
+from conans.test.utils.test_files import temp_folder
+from conans.client.conf import ConanClientConfigParser
+from conans import tools
+
+
+class FailingDownloadRequester(TestRequester):
+
+    def get(self, url, *args, **kwargs):
+        if "/files/" in url or "signature" in url:
+            raise Exception("Evil mock download failure")
+        return super(FailingDownloadRequester, self).get(url, *args, **kwargs)
+
+
+def _set_parallel_transfers(client, value):
+    conf = load(client.paths.conan_conf_path)
+    conf = conf.replace("[general]", "[general]\nparallel_transfers: %s" % value)
+    save(client.paths.conan_conf_path, conf)
+
+
+class ParallelTransfersTest(unittest.TestCase):
+
+    def conf_test(self):
+        tmp_dir = temp_folder()
+        conf_path = os.path.join(tmp_dir, "conan.conf")
+        save(conf_path, "[storage]\npath: ~/.conan/data\n")
+        self.assertEqual(ConanClientConfigParser(conf_path).parallel_transfers, 1)
+        save(conf_path, "[storage]\npath: ~/.conan/data\n[general]\nparallel_transfers: 8\n")
+        self.assertEqual(ConanClientConfigParser(conf_path).parallel_transfers, 8)
+        with tools.environment_append({"CONAN_PARALLEL_TRANSFERS": "3"}):
+            self.assertEqual(ConanClientConfigParser(conf_path).parallel_transfers, 3)
+
+    def upload_install_test(self):
+        server = TestServer()
+        servers = {"default": server}
+        client = TestClient(servers=servers, users={"default": [("lasote", "mypass")]})
+        _set_parallel_transfers(client, 4)
+        client.save(cpp_hello_conan_files("Hello0", "1.0", build=False))
+        client.run("export lasote/stable")
+        client.run("install Hello0/1.0@lasote/stable --build missing")
+        client.run("upload Hello0/1.0@lasote/stable --all")
+        self.assertIn("Uploading conan_package.tgz", str(client.user_io.out))
+        self.assertIn("Uploading conaninfo.txt", str(client.user_io.out))
+
+        client2 = TestClient(servers=servers, users={"default": [("lasote", "mypass")]})
+        _set_parallel_transfers(client2, 4)
+        client2.run("install Hello0/1.0@lasote/stable")
+        output = str(client2.user_io.out)
+        for filename in ("conanfile.py", "conanmanifest.txt", "conaninfo.txt",
+                         "conan_export.tgz", "conan_package.tgz"):
+            self.assertIn("Downloading %s" % filename, output)
+
+        ref = ConanFileReference.loads("Hello0/1.0@lasote/stable")
+        self.assertTrue(os.path.exists(os.path.join(client2.paths.export(ref), CONANFILE)))
+        package_ids = client2.paths.conan_packages(ref)
+        self.assertEqual(len(package_ids), 1)
+        package_folder = client2.paths.package(PackageReference(ref, package_ids[0]))
+        for filename in (CONANINFO, CONAN_MANIFEST, "include/helloHello0.h"):
+            self.assertTrue(os.path.exists(os.path.join(package_folder, filename)))
+
+    def aggregated_failures_test(self):
+        server = TestServer()
+        servers = {"default": server}
+        client = TestClient(servers=servers, users={"default": [("lasote", "mypass")]})
+        client.save(cpp_hello_conan_files("Hello0", "1.0", build=False))
+        client.run("export lasote/stable")
+        client.run("upload Hello0/1.0@lasote/stable")
+
+        client2 = TestClient(servers=servers, users={"default": [("lasote", "mypass")]},
+                             requester_class=FailingDownloadRequester)
+        _set_parallel_transfers(client2, 4)
+        error = client2.run("install Hello0/1.0@lasote/stable", ignore_error=True)
+        self.assertTrue(error)
+        output = str(client2.user_io.out)
+        self.assertIn("Error downloading files:", output)
+        for filename in ("conanfile.py", "conanmanifest.txt", "conan_export.tgz"):
+            self.assertIn("%s: Error downloading file" % filename, output)
+
+    def aggregated_other_failures_test(self):
+        # The failures are not always ConanExceptions, nor can be built from a message
+        class DiskError(Exception):
+            def __init__(self, path, reason):
+                super(DiskError, self).__init__("%s: %s" % (path, reason))
+
+        def failing_download(downloader, url, file_path=None, *args, **kwargs):  # @UnusedVariable
+            raise DiskError(file_path, "No space left on device")
+
+        server = TestServer()
+        servers = {"default": server}
+        client = TestClient(servers=servers, users={"default": [("lasote", "mypass")]})
+        client.save(cpp_hello_conan_files("Hello0", "1.0", build=False))
+        client.run("export lasote/stable")
+        client.run("upload Hello0/1.0@lasote/stable")
+
+        client2 = TestClient(servers=servers, users={"default": [("lasote", "mypass")]})
+        _set_parallel_transfers(client2, 4)
+        with patch.object(Downloader, "download", failing_download):
+            error = client2.run("install Hello0/1.0@lasote/stable", ignore_error=True)
+        self.assertTrue(error)
+        output = str(client2.user_io.out)
+        self.assertIn("Error downloading files:", output)
+        for filename in ("conanfile.py", "conanmanifest.txt"):
+            self.assertIn("%s: " % filename, output)
+        self.assertIn("No space left on device", output)
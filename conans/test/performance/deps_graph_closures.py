@@ -0,0 +1,63 @@
+import unittest
+import random
+import time
+from conans.client.deps_builder import DepsGraph
+from conans.test.deps_graph_test import requires_node
+
+
+def _bfs_ordered_closure(deps, node, flat):
+    """ the previous DepsGraph.ordered_closure, one BFS per node filtering the flat list
+    """
+    def public_neighbors(n):
+        public_requires = [r.conan_reference for r in n.conanfile.requires.values()
+                           if not r.private]
+        return [neighbor for neighbor in deps.neighbors(n)
+                if neighbor.conan_ref in public_requires]
+
+    closure = set()
+    current = deps.neighbors(node)
+    while current:
+        new_current = set()
+        for n in current:
+            closure.add(n)
+            new_current.update(set(public_neighbors(n)).difference(current))
+        current = new_current
+    return [n for n in flat if n in closure]
+
+
+class DepsGraphClosuresSpeedTest(unittest.TestCase):
+    """ NOT really a test, but a helper to measure the transitive closures of all the nodes
+    of a big dependency graph: a BFS per node vs. the memoized bitsets
+    FILE name is not "test" so it will not run under unit testing
+    """
+
+    size = 2000
+
+    def closures_speed_test(self):
+        rand = random.Random(0)
+        deps = DepsGraph()
+        nodes = []
+        for index in range(self.size):
+            candidates = list(range(max(0, index - 50), index))
+            dependencies = rand.sample(candidates, min(3, len(candidates)))
+            node = requires_node(str(index), *[(str(dependency), "private")
+                                               if rand.random() < 0.2 else str(dependency)
+                                               for dependency in dependencies])
+            nodes.append(node)
+            deps.add_node(node)
+            for dependency in dependencies:
+                deps.add_edge(node, nodes[dependency])
+
+        t1 = time.time()
+        closures = [deps.ordered_closure(node) for node in nodes]
+        memoized_time = time.time() - t1
+
+        flat = [node for level in deps.inverse_levels() for node in level]
+        sample = range(0, self.size, 20)  # The BFS of all the nodes takes too long
+        t1 = time.time()
+        expected = [_bfs_ordered_closure(deps, nodes[index], flat) for index in sample]
+        bfs_time = time.time() - t1
+        self.assertEqual([closures[index] for index in sample], expected)
+
+        print("%d nodes, per node: bfs closure %.5f s, memoized closure %.5f s"
+              % (self.size, bfs_time / len(sample), memoized_time / self.size))
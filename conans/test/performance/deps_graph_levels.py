@@ -0,0 +1,33 @@
+import unittest
+import time
+from conans.test.deps_graph_test import synthetic_graph, _rescan_levels
+
+
+class DepsGraphLevelsSpeedTest(unittest.TestCase):
+    """ NOT really a test, but a helper to measure the computation of the levels of big
+    dependency graphs: rescanning the open nodes on each level vs. Kahn's algorithm
+    FILE name is not "test" so it will not run under unit testing
+    """
+
+    def _measure(self, deps):
+        t1 = time.time()
+        _rescan_levels(deps.nodes, deps._neighbors)
+        rescan_time = time.time() - t1
+
+        t1 = time.time()
+        levels = deps.by_levels()
+        kahn_time = time.time() - t1
+
+        t1 = time.time()
+        for _ in range(10):
+            deps.by_levels()
+        cached_time = (time.time() - t1) / 10
+
+        print("%d nodes, %d levels: rescan %.4f s, kahn %.4f s, cached %.4f s"
+              % (len(deps.nodes), len(levels), rescan_time, kahn_time, cached_time))
+
+    def wide_graph_speed_test(self):
+        self._measure(synthetic_graph(2000, 500, 4))
+
+    def deep_graph_speed_test(self):
+        self._measure(synthetic_graph(2000, 10, 3))
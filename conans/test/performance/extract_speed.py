@@ -0,0 +1,51 @@
+import unittest
+import os
+import time
+from conans.test.utils.test_files import temp_folder
+from conans.util.files import tar_extract, gzopen_without_timestamps, touch
+
+
+class ExtractSpeedTest(unittest.TestCase):
+    """ NOT really a test, but a helper to measure the extraction of a package with many small
+    files: stamping the modification time while extracting vs. touching all of them afterwards
+    FILE name is not "test" so it will not run under unit testing
+    """
+
+    num_files = 50000
+
+    def _package_tgz(self, tmp_dir):
+        package_folder = os.path.join(tmp_dir, "package")
+        for i in range(self.num_files):
+            folder = os.path.join(package_folder, "include", "dir%d" % (i // 500))
+            if i % 500 == 0:
+                os.makedirs(folder)
+            with open(os.path.join(folder, "header%d.h" % i), "w") as handle:
+                handle.write("#define HEADER_%d\n" % i)
+        tgz_path = os.path.join(tmp_dir, "conan_package.tgz")
+        with open(tgz_path, "wb") as tgz_handle:
+            tgz = gzopen_without_timestamps("conan_package.tgz", mode="w", fileobj=tgz_handle)
+            tgz.add(package_folder, arcname=".")
+            tgz.close()
+        return tgz_path
+
+    def extract_speed_test(self):
+        tmp_dir = temp_folder()
+        tgz_path = self._package_tgz(tmp_dir)
+
+        dest_folder = os.path.join(tmp_dir, "touched")
+        t1 = time.time()
+        with open(tgz_path, "rb") as handle:
+            tar_extract(handle, dest_folder)
+        for dirname, _, filenames in os.walk(dest_folder):
+            for fname in filenames:
+                touch(os.path.join(dirname, fname))
+        touch_time = time.time() - t1
+
+        dest_folder = os.path.join(tmp_dir, "stamped")
+        t1 = time.time()
+        with open(tgz_path, "rb") as handle:
+            tar_extract(handle, dest_folder, mtime=time.time())
+        stamp_time = time.time() - t1
+
+        print("Extract %d files and touch them: %.2f s" % (self.num_files, touch_time))
+        print("Extract %d files with mtime: %.2f s" % (self.num_files, stamp_time))
@@ -0,0 +1,68 @@
+import unittest
+import os
+import sys
+import time
+import requests
+from conans.client.rest.rest_client import RestApiClient
+from conans.client.output import ConanOutput
+from conans.model.ref import ConanFileReference, PackageReference
+from conans.model.manifest import FileTreeManifest
+from conans.paths import CONANFILE, CONAN_MANIFEST, CONANINFO, PACKAGE_TGZ_NAME
+from conans.test.server.utils.server_launcher import TestServerLauncher
+from conans.test.utils.test_files import temp_folder
+from conans.util.files import save, md5
+from conans.model.version import Version
+
+
+class TransferSpeedTest(unittest.TestCase):
+    """ NOT really a test, but a helper to measure the upload and download throughput
+    against a local server (real sockets)
+    FILE name is not "test" so it will not run under unit testing
+    """
+
+    size_mb = 256
+
+    def transfer_speed_test(self):
+        server = TestServerLauncher(server_version=Version("0.16.0"),
+                                    min_client_compatible_version=Version("0.16.0"))
+        server.start()
+        try:
+            api = RestApiClient(ConanOutput(sys.stdout, True), requester=requests)
+            api.remote_url = "http://localhost:%s" % str(server.port)
+            api.token = api.authenticate("private_user", "private_pass")
+
+            conan_ref = ConanFileReference.loads("Big/1.0@private_user/testing")
+            tmp_dir = temp_folder()
+            conanfile = "from conans import ConanFile\nclass BigConan(ConanFile):\n    pass\n"
+            manifest = FileTreeManifest(123123123, {CONANFILE: md5(conanfile)})
+            recipe_files = {CONANFILE: conanfile, CONAN_MANIFEST: str(manifest)}
+            for filename, content in recipe_files.items():
+                save(os.path.join(tmp_dir, "recipe", filename), content)
+            api.upload_conan(conan_ref, {f: os.path.join(tmp_dir, "recipe", f)
+                                         for f in recipe_files}, 1, 0, False)
+
+            package_ref = PackageReference(conan_ref, "myid")
+            package_dir = os.path.join(tmp_dir, "package")
+            save(os.path.join(package_dir, CONANINFO), "")
+            save(os.path.join(package_dir, CONAN_MANIFEST), "")
+            big_file = os.path.join(package_dir, PACKAGE_TGZ_NAME)
+            with open(big_file, "wb") as handle:
+                for _ in range(self.size_mb):
+                    handle.write(os.urandom(1024 * 1024))
+            files = {f: os.path.join(package_dir, f)
+                     for f in (CONANINFO, CONAN_MANIFEST, PACKAGE_TGZ_NAME)}
+
+            t1 = time.time()
+            api.upload_package(package_ref, files, 1, 0)
+            upload_time = time.time() - t1
+
+            t1 = time.time()
+            api.get_package(package_ref, os.path.join(tmp_dir, "download"))
+            download_time = time.time() - t1
+
+            print("Upload %d MB: %.2f s, %.1f MB/s" % (self.size_mb, upload_time,
+                                                       self.size_mb / upload_time))
+            print("Download %d MB: %.2f s, %.1f MB/s" % (self.size_mb, download_time,
+                                                         self.size_mb / download_time))
+        finally:
+            server.stop()
@@ -1,5 +1,5 @@
 import unittest
-from conans.search.query_parse import infix_to_postfix, evaluate_postfix
+from conans.search.query_parse import infix_to_postfix, evaluate_postfix, compile_query
 
 
 class QueryParseTest(unittest.TestCase):
@@ -44,3 +44,33 @@ class QueryParseTest(unittest.TestCase):
         self.assertTrue(evaluate("((((a=2 AND ((((f=23 OR j=45))))))))"))
         self.assertFalse(evaluate("((((a=2 AND ((((f=23 OR j=42))))))))"))
 
+    def compile_query_test(self):
+        infos = {"win": {"settings": {"os": "Windows", "compiler": "Visual Studio",
+                                      "compiler.version": "12"},
+                         "options": {"shared": "True"}},
+                 "linux": {"settings": {"os": "Linux", "compiler": "gcc",
+                                        "compiler.version": "4.10"},
+                           "options": {"shared": "False"}},
+                 "any": {"settings": {"compiler": "gcc", "compiler.version": "4.3"},
+                         "options": {}}}
+
+        def search(q):
+            predicate = compile_query(q)
+            return sorted(package_id for package_id, info in infos.items() if predicate(info))
+
+        self.assertEqual(search(""), ["any", "linux", "win"])
+        self.assertEqual(search("os=Windows"), ["any", "win"])
+        self.assertEqual(search('compiler="Visual Studio"'), ["win"])
+        self.assertEqual(search("os!=Windows"), ["any", "linux"])
+        self.assertEqual(search("compiler IN (gcc, clang)"), ["any", "linux"])
+        self.assertEqual(search("compiler.version=4.*"), ["any", "linux"])
+        self.assertEqual(search("compiler.version>4.5"), ["linux", "win"])
+        self.assertEqual(search("compiler.version>=4.3 AND compiler.version<12"),
+                         ["any", "linux"])
+        self.assertEqual(search("shared=True AND os=Windows OR compiler.version<=4.3"),
+                         ["any", "win"])
+        self.assertEqual(search("shared=True AND (os=Linux OR compiler.version<=4.3)"), ["any"])
+
+        for query in ("invalid", "os= 3", "os=3 FAKE", "(os=3", "os IN gcc", "os IN (a b)"):
+            with self.assertRaises(Exception):
+                compile_query(query)
@@ -0,0 +1,123 @@
+import unittest
+import os
+import platform
+from conans.test.utils.test_files import temp_folder
+from conans.util.files import save, load
+from conans.util.staging import stage_tree, STAGING_MODES, HARDLINK, SYMLINK
+from conans.errors import ConanException
+from conans.tools import replace_in_file, environment_append
+from conans.model.ref import ConanFileReference, PackageReference
+from conans.paths import CONANFILE
+from conans.test.tools import TestClient
+
+
+class StagingTest(unittest.TestCase):
+
+    def _origin(self):
+        origin = os.path.join(temp_folder(), "origin")
+        save(os.path.join(origin, "file.txt"), "hello")
+        save(os.path.join(origin, "subdir", "other.txt"), "bye")
+        save(os.path.join(origin, "excluded.txt"), "excluded")
+        if platform.system() != "Windows":
+            os.symlink("file.txt", os.path.join(origin, "link.txt"))
+        return origin
+
+    def modes_test(self):
+        for mode in STAGING_MODES:
+            origin = self._origin()
+            dest = os.path.join(temp_folder(), "dest")
+            stage_tree(origin, dest, mode,
+                       ignore=lambda src, names: [n for n in names if n == "excluded.txt"])
+            self.assertEqual(load(os.path.join(dest, "file.txt")), "hello")
+            self.assertEqual(load(os.path.join(dest, "subdir", "other.txt")), "bye")
+            self.assertFalse(os.path.exists(os.path.join(dest, "excluded.txt")))
+            if platform.system() != "Windows":
+                self.assertEqual(os.readlink(os.path.join(dest, "link.txt")), "file.txt")
+
+    def hardlink_copy_on_write_test(self):
+        origin = self._origin()
+        dest = os.path.join(temp_folder(), "dest")
+        stage_tree(origin, dest, HARDLINK)
+        save(os.path.join(dest, "file.txt"), "modified")
+        replace_in_file(os.path.join(dest, "subdir", "other.txt"), "bye", "changed")
+        self.assertEqual(load(os.path.join(dest, "file.txt")), "modified")
+        self.assertEqual(load(os.path.join(dest, "subdir", "other.txt")), "changed")
+        self.assertEqual(load(os.path.join(origin, "file.txt")), "hello")
+        self.assertEqual(load(os.path.join(origin, "subdir", "other.txt")), "bye")
+
+    def symlink_copy_on_write_test(self):
+        if platform.system() == "Windows":
+            return
+        origin = self._origin()
+        dest = os.path.join(temp_folder(), "dest")
+        stage_tree(origin, dest, SYMLINK)
+        save(os.path.join(dest, "file.txt"), "modified")
+        replace_in_file(os.path.join(dest, "subdir", "other.txt"), "bye", "changed")
+        self.assertFalse(os.path.islink(os.path.join(dest, "file.txt")))
+        self.assertFalse(os.path.islink(os.path.join(dest, "subdir", "other.txt")))
+        self.assertEqual(load(os.path.join(dest, "file.txt")), "modified")
+        self.assertEqual(load(os.path.join(dest, "subdir", "other.txt")), "changed")
+        self.assertEqual(load(os.path.join(origin, "file.txt")), "hello")
+        self.assertEqual(load(os.path.join(origin, "subdir", "other.txt")), "bye")
+
+    def symlink_test(self):
+        if platform.system() == "Windows":
+            return
+        origin = self._origin()
+        dest = os.path.join(temp_folder(), "dest")
+        stage_tree(origin, dest, SYMLINK)
+        self.assertTrue(os.path.islink(os.path.join(dest, "subdir", "other.txt")))
+
+    def invalid_mode_test(self):
+        with self.assertRaisesRegexp(ConanException, "Invalid staging mode"):
+            stage_tree(self._origin(), os.path.join(temp_folder(), "dest"), "magic")
+
+
+conanfile = """from conans import ConanFile
+
+class HelloConan(ConanFile):
+    name = "Hello"
+    version = "0.1"
+    exports = "*.txt"
+
+    def source(self):
+        with open("file.txt", "a") as handle:
+            handle.write(" modified by source")
+
+    def build(self):
+        with open("file.txt", "a") as handle:
+            handle.write(" modified by build")
+"""
+
+
+class BuildStagingTest(unittest.TestCase):
+
+    def linked_export_test(self):
+        for mode in (HARDLINK, SYMLINK):
+            client = TestClient()
+            client.save({CONANFILE: conanfile, "file.txt": "hello"})
+            client.run("export lasote/stable")
+            with environment_append({"CONAN_BUILD_STAGING": mode}):
+                client.run("install Hello/0.1@lasote/stable --build")
+            conan_ref = ConanFileReference.loads("Hello/0.1@lasote/stable")
+            # The exported files are never modified through the links
+            self.assertEqual(load(os.path.join(client.paths.export(conan_ref), "file.txt")),
+                             "hello")
+            self.assertIn("modified by source",
+                          load(os.path.join(client.paths.source(conan_ref), "file.txt")))
+
+    def modified_linked_sources_test(self):
+        # build() appends to the linked file, the shared source folder is created again
+        for mode in (HARDLINK, SYMLINK):
+            client = TestClient()
+            client.save({CONANFILE: conanfile, "file.txt": "hello"})
+            client.run("export lasote/stable")
+            conan_ref = ConanFileReference.loads("Hello/0.1@lasote/stable")
+            for _ in range(2):
+                with environment_append({"CONAN_BUILD_STAGING": mode}):
+                    client.run("install Hello/0.1@lasote/stable --build")
+                self.assertIn("The build modified the linked sources", client.user_io.out)
+                package_id = os.listdir(client.paths.builds(conan_ref))[0]
+                build_folder = client.paths.build(PackageReference(conan_ref, package_id))
+                self.assertEqual(load(os.path.join(build_folder, "file.txt")),
+                                 "hello modified by source modified by build")
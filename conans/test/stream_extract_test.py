@@ -0,0 +1,99 @@
+import unittest
+import os
+import tarfile
+from io import BytesIO
+from conans.test.tools import TestClient, TestServer
+from conans.test.utils.cpp_test_files import cpp_hello_conan_files
+from conans.test.utils.test_files import temp_folder
+from conans.model.ref import ConanFileReference, PackageReference
+from conans.util.files import load, save, tar_extract, gzopen_without_timestamps
+from conans.paths import CONANINFO, CONAN_MANIFEST, PACKAGE_TGZ_NAME
+from conans.client.rest.uploader_downloader import ResponseReader
+
+
+class _ChunkedResponse(object):
+
+    def __init__(self, content, chunk_size):
+        self.content = content
+        self.headers = {"content-length": str(len(content))}
+        self._chunk_size = chunk_size
+
+    def iter_content(self, chunk_size=1):  # @UnusedVariable
+        for i in range(0, len(self.content), self._chunk_size):
+            yield self.content[i:i + self._chunk_size]
+
+
+def _tgz_contents(files):
+    tgz_contents = BytesIO()
+    tgz = gzopen_without_timestamps("file.tgz", mode="w", fileobj=tgz_contents)
+    for name, content in files.items():
+        info = tarfile.TarInfo(name=name)
+        info.size = len(content)
+        tgz.addfile(tarinfo=info, fileobj=BytesIO(content))
+    tgz.close()
+    return tgz_contents.getvalue()
+
+
+class StreamExtractTest(unittest.TestCase):
+
+    def response_reader_test(self):
+        content = os.urandom(10000)
+        reader = ResponseReader(_ChunkedResponse(content, 333), None)
+        self.assertEqual(reader.read(512), content[:512])
+        self.assertEqual(reader.read(10), content[512:522])
+        self.assertEqual(reader.read(), content[522:])
+        self.assertEqual(reader.read(100), b"")
+
+    def tar_extract_stream_test(self):
+        tgz = _tgz_contents({"include/hello.h": b"hello", "lib/hello.a": b"binary",
+                             "../outside.txt": b"evil"})
+        tmp_dir = temp_folder()
+        dest_folder = os.path.join(tmp_dir, "dest")
+        old_dir = os.getcwd()
+        os.chdir(tmp_dir)
+        try:
+            tar_extract(ResponseReader(_ChunkedResponse(tgz, 7), None), dest_folder,
+                        stream=True)
+        finally:
+            os.chdir(old_dir)
+        self.assertEqual(load(os.path.join(dest_folder, "include/hello.h")), "hello")
+        self.assertEqual(load(os.path.join(dest_folder, "lib/hello.a")), "binary")
+        self.assertFalse(os.path.exists(os.path.join(tmp_dir, "outside.txt")))
+
+    def tar_extract_mtime_test(self):
+        tgz = _tgz_contents({"include/hello.h": b"hello", "lib/hello.a": b"binary"})
+        for stream in (False, True):
+            dest_folder = temp_folder()
+            tar_extract(BytesIO(tgz), dest_folder, stream=stream)
+            self.assertEqual(os.path.getmtime(os.path.join(dest_folder, "lib/hello.a")), 0)
+
+            dest_folder = temp_folder()
+            tar_extract(BytesIO(tgz), dest_folder, stream=stream, mtime=1234567890)
+            for filename in ("include/hello.h", "lib/hello.a"):
+                self.assertEqual(os.path.getmtime(os.path.join(dest_folder, filename)),
+                                 1234567890)
+
+    def install_test(self):
+        servers = {"default": TestServer()}
+        client = TestClient(servers=servers, users={"default": [("lasote", "mypass")]})
+        client.save(cpp_hello_conan_files("Hello0", "1.0", build=False))
+        client.run("export lasote/stable")
+        client.run("install Hello0/1.0@lasote/stable --build missing")
+        client.run("upload Hello0/1.0@lasote/stable --all")
+
+        for parallel_transfers in (1, 4):
+            client2 = TestClient(servers=servers, users={"default": [("lasote", "mypass")]})
+            conf = load(client2.paths.conan_conf_path)
+            conf = conf.replace("[general]", "[general]\nstream_extract: True\n"
+                                "parallel_transfers: %d" % parallel_transfers)
+            save(client2.paths.conan_conf_path, conf)
+            client2.run("install Hello0/1.0@lasote/stable")
+            self.assertIn("Downloading %s" % PACKAGE_TGZ_NAME, str(client2.user_io.out))
+
+            ref = ConanFileReference.loads("Hello0/1.0@lasote/stable")
+            package_ids = client2.paths.conan_packages(ref)
+            self.assertEqual(len(package_ids), 1)
+            package_folder = client2.paths.package(PackageReference(ref, package_ids[0]))
+            for filename in (CONANINFO, CONAN_MANIFEST, "include/helloHello0.h"):
+                self.assertTrue(os.path.exists(os.path.join(package_folder, filename)))
+            self.assertFalse(os.path.exists(os.path.join(package_folder, PACKAGE_TGZ_NAME)))
@@ -23,16 +23,17 @@ from conans.test.server.utils.server_launcher import (TESTING_REMOTE_PRIVATE_USE
                                                       TestServerLauncher)
 from conans.util.env_reader import get_env
 from conans import __version__ as CLIENT_VERSION
-from conans.client.conf import MIN_SERVER_COMPATIBLE_VERSION
+from conans.client.conf import MIN_SERVER_COMPATIBLE_VERSION, ConanClientConfigParser
 from conans.client.rest.version_checker import VersionCheckerRequester
 from conans.model.version import Version
 from conans.test.utils.test_files import temp_folder
 from conans.client.remote_registry import RemoteRegistry
 from collections import Counter
 import six
-from conans.client.rest.uploader_downloader import IterableToFileAdapter
+from conans.client.rest.uploader_downloader import FileReader
 from conans.client.client_cache import ClientCache
 from conans.search.search import DiskSearchManager, DiskSearchAdapter
+from conans.client.store.catalog import CatalogSearchManager
 
 
 class TestingResponse(object):
@@ -51,7 +52,7 @@ class TestingResponse(object):
 
     @property
     def ok(self):
-        return self.test_response.status_code == 200
+        return self.test_response.status_code < 400  # As requests, 206 partial content too
 
     @property
     def content(self):
@@ -106,15 +107,24 @@ class TestRequester(object):
         else:
             return requests.get(url, headers=headers)
 
+    def head(self, url, auth=None, headers=None, verify=None):
+        headers = headers or {}
+        app, url = self._prepare_call(url, headers, auth)
+        if app:
+            response = app.head(url, headers=headers, expect_errors=True)
+            return TestingResponse(response)
+        else:
+            return requests.head(url, headers=headers)
+
     def put(self, url, data, headers=None, verify=None, auth=None):
         headers = headers or {}
         app, url = self._prepare_call(url, headers, auth=auth)
         if app:
-            if isinstance(data, IterableToFileAdapter):
-                data_accum = b""
+            if isinstance(data, FileReader):
+                data_accum = bytearray()
                 for tmp in data:
-                    data_accum += tmp
-                data = data_accum
+                    data_accum.extend(tmp)
+                data = bytes(data_accum)
             response = app.put(url, data, expect_errors=True, headers=headers)
             return TestingResponse(response)
         else:
@@ -304,8 +314,12 @@ class TestClient(object):
         self.storage_folder = os.path.join(self.base_folder, ".conan", "data")
         self.client_cache = ClientCache(self.base_folder, self.storage_folder, TestBufferConanOutput())
 
-        search_adapter = DiskSearchAdapter()
-        self.search_manager = DiskSearchManager(self.client_cache, search_adapter)
+        if self.client_cache.conan_config.search_index:
+            self.search_manager = CatalogSearchManager(self.client_cache,
+                                                       self.client_cache.catalog)
+        else:
+            search_adapter = DiskSearchAdapter()
+            self.search_manager = DiskSearchManager(self.client_cache, search_adapter)
 
         self._default_settings(get_env("CONAN_COMPILER", "gcc"),
                                get_env("CONAN_COMPILER_VERSION", "4.8"),
@@ -379,7 +393,13 @@ class TestClient(object):
         self.requester = VersionCheckerRequester(requester, self.client_version,
                                                  self.min_server_compatible_version, output)
 
-        self.rest_api_client = RestApiClient(output, requester=self.requester)
+        # Not using client_cache.conan_config, tests might modify the file after this point
+        conan_config = ConanClientConfigParser(self.client_cache.conan_conf_path)
+        self.rest_api_client = RestApiClient(output, requester=self.requester,
+                                             parallel_transfers=conan_config.parallel_transfers,
+                                             stream_extract=conan_config.stream_extract,
+                                             download_retry=conan_config.download_retry,
+                                             checksum_cache=self.client_cache.checksum_cache)
         # To store user and token
         self.localdb = LocalDB(self.client_cache.localdb)
         # Wraps RestApiClient to add authentication support (same interface)
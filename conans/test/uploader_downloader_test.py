@@ -0,0 +1,197 @@
+import unittest
+import io
+import os
+import hashlib
+import tarfile
+from conans.client.rest.uploader_downloader import (FileReader, Downloader, Uploader,
+                                                    adaptive_chunk_size, MIN_CHUNK_SIZE,
+                                                    MAX_CHUNK_SIZE)
+from conans.test.tools import TestBufferConanOutput
+from conans.test.utils.test_files import temp_folder
+from conans.util.files import save, load, gzopen_without_timestamps
+from conans.errors import ConanException
+
+
+class _Response(object):
+    ok = True
+    status_code = 200
+
+    def __init__(self, content, chunk_size, headers=None):
+        self.content = content
+        self.headers = {"content-length": str(len(content))}
+        self.headers.update(headers or {})
+        self._chunk_size = chunk_size
+
+    def iter_content(self, chunk_size=1):  # @UnusedVariable
+        for i in range(0, len(self.content), self._chunk_size):
+            yield self.content[i:i + self._chunk_size]
+
+
+class _Requester(object):
+
+    def __init__(self, content=None, fail_puts=0, truncate_gets=0, checksum=None,
+                 fail_ranges=0):
+        self.content = content
+        self.fail_puts = fail_puts
+        self.fail_ranges = fail_ranges
+        self.gets = 0
+        self.truncate_gets = truncate_gets
+        self.checksum = checksum
+        self.uploaded = []
+        self.ranges = []
+
+    def get(self, url, stream=None, verify=None, auth=None, headers=None):  # @UnusedVariable
+        self.gets += 1
+        response_headers = {"X-Checksum-Sha1": self.checksum} if self.checksum else None
+        if headers and "Range" in headers:
+            self.ranges.append(headers["Range"])
+            if self.fail_ranges:  # Connection refused when trying to resume
+                self.fail_ranges -= 1
+                raise Exception("Connection refused")
+            offset = int(headers["Range"][len("bytes="):-1])
+            response = _Response(self.content[offset:], 1000, response_headers)
+            response.status_code = 206
+            return response
+        response = _Response(self.content, 1000, response_headers)
+        if self.truncate_gets:  # The body ends before the announced content-length
+            self.truncate_gets -= 1
+            response.content = self.content[:len(self.content) // 3]
+        return response
+
+    def put(self, url, data, verify=None, headers=None, auth=None):  # @UnusedVariable
+        contents = bytearray()
+        for chunk in data:
+            contents.extend(chunk)
+            if self.fail_puts:  # Connection lost in the middle of the transfer
+                self.fail_puts -= 1
+                raise Exception("Broken connection")
+        self.uploaded.append(bytes(contents))
+        return _Response(b"", 1)
+
+
+def _tgz_contents(files):
+    tgz_contents = io.BytesIO()
+    tgz = gzopen_without_timestamps("file.tgz", mode="w", fileobj=tgz_contents)
+    for name, content in files.items():
+        info = tarfile.TarInfo(name=name)
+        info.size = len(content)
+        tgz.addfile(tarinfo=info, fileobj=io.BytesIO(content))
+    tgz.close()
+    return tgz_contents.getvalue()
+
+
+class UploaderDownloaderTest(unittest.TestCase):
+
+    def adaptive_chunk_size_test(self):
+        self.assertEqual(adaptive_chunk_size(None), MIN_CHUNK_SIZE)
+        self.assertEqual(adaptive_chunk_size(1000), MIN_CHUNK_SIZE)
+        self.assertEqual(adaptive_chunk_size(100 * 1024 * 1024), 1024 * 1024)
+        self.assertEqual(adaptive_chunk_size(10 * 1024 * 1024 * 1024), MAX_CHUNK_SIZE)
+
+    def file_reader_test(self):
+        content = os.urandom(10000)
+        reader = FileReader(io.BytesIO(content), len(content), 3000, None)
+        self.assertEqual(len(reader), 10000)
+        self.assertEqual(b"".join(bytes(chunk) for chunk in reader), content)
+        self.assertEqual(reader.read(), b"")
+        reader.rewind()
+        self.assertEqual(bytes(reader.read()), content[:3000])
+
+    def upload_retry_test(self):
+        tmp_dir = temp_folder()
+        file_path = os.path.join(tmp_dir, "file.tgz")
+        content = os.urandom(300000)
+        save(file_path, content)
+        requester = _Requester(fail_puts=1)
+        uploader = Uploader(requester, TestBufferConanOutput(), verify=False)
+        uploader.upload("http://fake/file.tgz", file_path, retry=2)
+        # The retry sends the whole file, not what was left of it
+        self.assertEqual(requester.uploaded, [content])
+
+    def download_test(self):
+        content = os.urandom(300000)
+        downloader = Downloader(_Requester(content), TestBufferConanOutput(), verify=False)
+        self.assertEqual(downloader.download("http://fake/file.tgz"), content)
+
+        file_path = os.path.join(temp_folder(), "subfolder", "file.tgz")
+        downloader.download("http://fake/file.tgz", file_path)
+        self.assertEqual(load(file_path, binary=True), content)
+
+    def resume_download_test(self):
+        content = os.urandom(300000)
+        requester = _Requester(content, truncate_gets=1, checksum=hashlib.sha1(content).hexdigest())
+        downloader = Downloader(requester, TestBufferConanOutput(), verify=False)
+        file_path = os.path.join(temp_folder(), "file.tgz")
+        downloader.download("http://fake/file.tgz", file_path, retry=2)
+        self.assertEqual(requester.ranges, ["bytes=100000-"])
+        self.assertEqual(load(file_path, binary=True), content)
+        self.assertFalse(os.path.exists(file_path + ".part"))
+
+        # Without retries, the incomplete transfer is an error
+        requester = _Requester(content, truncate_gets=1)
+        downloader = Downloader(requester, TestBufferConanOutput(), verify=False)
+        file_path = os.path.join(temp_folder(), "file.tgz")
+        with self.assertRaisesRegexp(ConanException, "incomplete transfer"):
+            downloader.download("http://fake/file.tgz", file_path)
+
+    def resume_download_retries_test(self):
+        content = os.urandom(300000)
+        # Every attempt is one request, the failed resume is the last of the 2 attempts
+        requester = _Requester(content, truncate_gets=1, fail_ranges=1)
+        downloader = Downloader(requester, TestBufferConanOutput(), verify=False)
+        file_path = os.path.join(temp_folder(), "file.tgz")
+        with self.assertRaisesRegexp(ConanException, "Connection refused"):
+            downloader.download("http://fake/file.tgz", file_path, retry=2)
+        self.assertEqual(requester.gets, 2)
+
+        # The attempt after the failed one resumes from the same bytes
+        requester = _Requester(content, truncate_gets=1, fail_ranges=1)
+        downloader = Downloader(requester, TestBufferConanOutput(), verify=False)
+        file_path = os.path.join(temp_folder(), "file.tgz")
+        downloader.download("http://fake/file.tgz", file_path, retry=3)
+        self.assertEqual(requester.gets, 3)
+        self.assertEqual(requester.ranges, ["bytes=100000-", "bytes=100000-"])
+        self.assertEqual(load(file_path, binary=True), content)
+
+    def download_checksum_test(self):
+        content = os.urandom(1000)
+        requester = _Requester(content, checksum=hashlib.sha1(b"other").hexdigest())
+        downloader = Downloader(requester, TestBufferConanOutput(), verify=False)
+        file_path = os.path.join(temp_folder(), "file.tgz")
+        with self.assertRaisesRegexp(ConanException, "checksum doesn't match"):
+            downloader.download("http://fake/file.tgz", file_path)
+        self.assertFalse(os.path.exists(file_path))
+        self.assertFalse(os.path.exists(file_path + ".part"))
+
+    def download_extract_retry_test(self):
+        content = _tgz_contents({"include/hello.h": os.urandom(100000),
+                                 "lib/hello.a": os.urandom(200000)})
+        requester = _Requester(content, truncate_gets=1,
+                               checksum=hashlib.sha1(content).hexdigest())
+        output = TestBufferConanOutput()
+        downloader = Downloader(requester, output, verify=False)
+        dest_folder = temp_folder()
+        save(os.path.join(dest_folder, "conaninfo.txt"), "info")
+        downloader.download_extract("http://fake/file.tgz", dest_folder, retry=2)
+        self.assertEqual(requester.gets, 2)
+        self.assertIn("incomplete transfer", str(output))
+        self.assertEqual(sorted(os.listdir(dest_folder)), ["conaninfo.txt", "include", "lib"])
+        self.assertEqual(os.listdir(os.path.join(dest_folder, "include")), ["hello.h"])
+
+        # Without retries, the incomplete transfer is an error and nothing is extracted
+        requester = _Requester(content, truncate_gets=1)
+        downloader = Downloader(requester, TestBufferConanOutput(), verify=False)
+        dest_folder = temp_folder()
+        with self.assertRaisesRegexp(ConanException, "incomplete transfer"):
+            downloader.download_extract("http://fake/file.tgz", dest_folder)
+        self.assertEqual(os.listdir(dest_folder), [])
+
+    def download_extract_checksum_test(self):
+        content = _tgz_contents({"include/hello.h": b"hello"})
+        requester = _Requester(content, checksum=hashlib.sha1(b"other").hexdigest())
+        downloader = Downloader(requester, TestBufferConanOutput(), verify=False)
+        dest_folder = temp_folder()
+        with self.assertRaisesRegexp(ConanException, "checksum doesn't match"):
+            downloader.download_extract("http://fake/file.tgz", dest_folder, retry=2)
+        self.assertEqual(requester.gets, 1)
+        self.assertEqual(os.listdir(dest_folder), [])
@@ -4,7 +4,7 @@ from __future__ import print_function
 import sys
 import os
 from conans.errors import ConanException
-from conans.util.files import _generic_algorithm_sum, load
+from conans.util.files import _generic_algorithm_sum, load, unlink_linked
 from patch import fromfile, fromstring
 from conans.client.rest.uploader_downloader import Downloader
 import requests
@@ -179,6 +179,7 @@ def replace_in_file(file_path, search, replace):
     content = load(file_path)
     content = content.replace(search, replace)
     content = content.encode("utf-8")
+    unlink_linked(file_path)
     with open(file_path, "wb") as handle:
         handle.write(content)
 
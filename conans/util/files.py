@@ -2,6 +2,7 @@ import os
 import shutil
 from errno import ENOENT, EEXIST
 import hashlib
+import mmap
 import sys
 from os.path import abspath, realpath, join as joinpath
 import platform
@@ -52,15 +53,43 @@ def sha1sum(file_path):
 
 
 def _generic_algorithm_sum(file_path, algorithm_name):
+    return file_checksums(file_path, [algorithm_name])[0]
 
+
+# Smaller files are read at once, bigger ones are memory mapped
+_MMAP_MIN_SIZE = 1024 * 1024
+_READ_CHUNK_SIZE = 1024 * 1024
+
+
+def file_checksums(file_path, algorithms):
+    """ Computes several hexdigests of a file, like ["md5", "sha1"], reading it just once.
+    hashlib releases the GIL while hashing big buffers, so it can be called from several
+    threads to hash different files at the same time
+    """
+    hashes = [hashlib.new(algorithm) for algorithm in algorithms]
     with open(file_path, 'rb') as fh:
-        m = hashlib.new(algorithm_name)
-        while True:
-            data = fh.read(8192)
-            if not data:
-                break
-            m.update(data)
-        return m.hexdigest()
+        size = os.fstat(fh.fileno()).st_size
+        mapped = None
+        if size >= _MMAP_MIN_SIZE:
+            try:
+                mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, EnvironmentError):  # Special files, 32 bits address space...
+                mapped = None
+
+        if mapped is not None:
+            try:
+                for h in hashes:
+                    h.update(mapped)
+            finally:
+                mapped.close()
+        else:
+            while True:
+                data = fh.read(_READ_CHUNK_SIZE)
+                if not data:
+                    break
+                for h in hashes:
+                    h.update(data)
+    return [h.hexdigest() for h in hashes]
 
 
 def save(path, content, append=False):
@@ -78,11 +107,31 @@ def save(path, content, append=False):
     if six.PY3:
         if not isinstance(content, bytes):
             content = bytes(content, "utf-8")
+    unlink_linked(path)
     mode = 'wb' if not append else 'ab'
     with open(path, mode) as handle:
         handle.write(content)
 
 
+def unlink_linked(path):
+    """ The files of the folders staged with hardlinks or symlinks share their data with the
+    origin ones, replace them with a copy before modifying them, so the origin is kept (copy on
+    first write)
+    """
+    try:
+        if os.path.islink(path):
+            if not os.path.isfile(path):  # Broken or to a folder, nothing to keep
+                return
+        elif os.stat(path).st_nlink < 2:
+            return
+    except OSError:  # It doesn't exist yet
+        return
+    tmp_path = path + ".conan_unlink"
+    shutil.copy2(path, tmp_path)
+    os.remove(path)
+    os.rename(tmp_path, path)
+
+
 def save_files(path, files):
     for name, content in list(files.items()):
         save(os.path.join(path, name), content)
@@ -194,9 +243,13 @@ def gzopen_without_timestamps(name, mode="r", fileobj=None, compresslevel=None,
     return t
 
 
-def tar_extract(fileobj, destination_dir):
+def tar_extract(fileobj, destination_dir, stream=False, mtime=None):
     '''Extract tar file controlling not absolute paths and fixing the routes
-    if the tar was zipped in windows'''
+    if the tar was zipped in windows.
+    If stream, fileobj is read sequentially just once (it can be a non seekable
+    stream, as a download in progress), and the members are extracted as they arrive.
+    If mtime, it is the modification time given to the extracted files instead of
+    the stored one, set while each file is written'''
     def badpath(path, base):
         # joinpath will ignore base if path is absolute
         return not realpath(abspath(joinpath(base, path))).startswith(base)
@@ -210,9 +263,11 @@ def tar_extract(fileobj, destination_dir):
             else:
                 # Fixes unzip a windows zipped file in linux
                 finfo.name = finfo.name.replace("\\", "/")
+                if mtime is not None and not finfo.isdir():
+                    finfo.mtime = mtime
                 yield finfo
 
-    the_tar = tarfile.open(fileobj=fileobj)
+    the_tar = tarfile.open(fileobj=fileobj, mode="r|*" if stream else "r")
     the_tar.extractall(path=destination_dir, members=safemembers(the_tar))
     the_tar.close()
 
@@ -0,0 +1,182 @@
+import hashlib
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+import fasteners
+from conans.util.files import load
+from conans.util.log import logger
+
+READERS_FOLDER = "readers"
+WRITERS_FOLDER = "writers"
+
+# The file locks are per process, the readers of this process are known without locking them,
+# and the threads of this process are excluded with a thread lock per name
+_own_readers = {}
+_own_readers_lock = threading.Lock()
+_thread_locks = {}
+
+
+def reset_after_fork():
+    """ To be called in a forked process. The readers of the parent are not its own, and the
+    threads of the parent that held any lock don't exist in it
+    """
+    global _own_readers, _own_readers_lock, _thread_locks
+    _own_readers = {}
+    _own_readers_lock = threading.Lock()
+    _thread_locks = {}
+
+
+def _thread_lock(name):
+    with _own_readers_lock:
+        return _thread_locks.setdefault(name, threading.Lock())
+
+
+class _NameLock(object):
+    """ Exclusive lock of a name, both between processes and between the threads of this one
+    """
+
+    def __init__(self, folder, name):
+        filename = "%s.lock" % hashlib.md5(name.encode()).hexdigest()
+        self._thread_lock = _thread_lock(name)
+        self._file_lock = fasteners.InterProcessLock(os.path.join(folder, WRITERS_FOLDER,
+                                                                  filename), logger=logger)
+
+    def acquire(self, blocking=True):
+        if not self._thread_lock.acquire(blocking):
+            return False
+        try:
+            if self._file_lock.acquire(blocking=blocking):
+                return True
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        self._thread_lock.release()
+        return False
+
+    def release(self):
+        try:
+            self._file_lock.release()
+        finally:
+            self._thread_lock.release()
+
+
+class ReadWriteLocks(object):
+    """ Inter-process readers/writer locks of a set of named resources, stored in locks_folder.
+    Any number of readers can hold a name at the same time, a writer excludes the readers and
+    the other writers of that name.
+    It is made with exclusive file locks, that the OS releases if the process dies:
+        - writers/<md5 of name>.lock: held by the writer. The readers hold it while they add
+          that name to their list, so a writer that has it only waits for the readers that
+          were already there, and the new ones wait for it
+        - readers/<id>.lock: one per reader, locked while it reads all the names listed
+          in readers/<id>.names. One that can be locked by other process is a leftover of
+          a dead process
+    So a reader has a single file open while reading, whatever the number of names it reads
+    """
+
+    def __init__(self, locks_folder):
+        self._folder = locks_folder
+
+    @contextmanager
+    def read(self, names):
+        names = sorted(set(names))
+        reader_id = uuid.uuid4().hex
+        reader_path = os.path.join(self._folder, READERS_FOLDER, reader_id)
+        reader = fasteners.InterProcessLock(reader_path + ".lock", logger=logger)
+        reader.acquire()
+        try:
+            own_names = set()
+            with _own_readers_lock:
+                _own_readers[reader_id] = own_names
+            with open(reader_path + ".names", "w") as names_file:
+                for name in names:
+                    name_lock = _NameLock(self._folder, name)
+                    name_lock.acquire()
+                    try:
+                        names_file.write(name + "\n")
+                        names_file.flush()
+                        with _own_readers_lock:
+                            own_names.add(name)
+                    finally:
+                        name_lock.release()
+            yield
+        finally:
+            with _own_readers_lock:
+                _own_readers.pop(reader_id, None)
+            _remove(reader_path + ".names")
+            reader.release()
+            _remove(reader_path + ".lock")
+
+    def acquire_write(self, name, blocking=True, waiting=None):
+        """ return the held writer lock, to be released by the caller. If not blocking, None
+        if there are other writers or readers
+        param waiting: optional callable, called once if it has to wait for others
+        """
+        writer = _NameLock(self._folder, name)
+        if not writer.acquire(blocking=False):
+            if not blocking:
+                return None
+            if waiting:
+                waiting()
+                waiting = None
+            writer.acquire()
+        try:
+            while self._has_readers(name):
+                if not blocking:
+                    writer.release()
+                    return None
+                if waiting:
+                    waiting()
+                    waiting = None
+                time.sleep(0.1)
+        except BaseException:
+            writer.release()
+            raise
+        return writer
+
+    @contextmanager
+    def write(self, name, waiting=None):
+        writer = self.acquire_write(name, waiting=waiting)
+        try:
+            yield
+        finally:
+            writer.release()
+
+    def _has_readers(self, name):
+        with _own_readers_lock:
+            if any(name in names for names in _own_readers.values()):
+                return True
+        readers_folder = os.path.join(self._folder, READERS_FOLDER)
+        try:
+            filenames = os.listdir(readers_folder)
+        except OSError:
+            return False
+        for filename in filenames:
+            reader_id, ext = os.path.splitext(filename)
+            if ext != ".names":
+                continue
+            with _own_readers_lock:
+                if reader_id in _own_readers:
+                    continue
+            reader_path = os.path.join(readers_folder, reader_id)
+            reader = fasteners.InterProcessLock(reader_path + ".lock", logger=logger)
+            if reader.acquire(blocking=False):  # Dead process, or just finished
+                reader.release()
+                _remove(reader_path + ".names")
+                _remove(reader_path + ".lock")
+                continue
+            try:
+                if name in load(reader_path + ".names").splitlines():
+                    return True
+            except (IOError, OSError):  # Just finished
+                pass
+        return False
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:  # Already removed, or still open by other process (Windows)
+        pass
@@ -0,0 +1,28 @@
+import traceback
+from multiprocessing.pool import ThreadPool
+
+from conans.util.log import logger
+
+
+def run_in_threads(function, items, workers):
+    """ Calls function(item) for every item, using up to 'workers' concurrent threads.
+    Exceptions are not raised, they are returned so the caller can aggregate them.
+    return [(item, result, exception), ...] in the same order than items
+    """
+    def _call(item):
+        try:
+            return item, function(item), None
+        except Exception as exc:
+            logger.debug(traceback.format_exc())
+            return item, None, exc
+
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [_call(item) for item in items]
+
+    pool = ThreadPool(min(workers, len(items)))
+    try:
+        return pool.map(_call, items)
+    finally:
+        pool.close()
+        pool.join()
@@ -0,0 +1,198 @@
+""" Creation of the source and build folders from the export and source ones, without copying
+all the bytes when the filesystem allows it
+"""
+import os
+import shutil
+import time
+from conans.errors import ConanException
+from conans.model.manifest import checksum_files
+from conans.util.files import md5
+from conans.util.log import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+COPY = "copy"
+REFLINK = "reflink"
+HARDLINK = "hardlink"
+SYMLINK = "symlink"
+STAGING_MODES = (COPY, REFLINK, HARDLINK, SYMLINK)
+
+_FICLONE = 0x40049409  # Linux ioctl, clones the extents of a file (btrfs, xfs, ...)
+
+
+class FileStager(object):
+    """ Creates the files of the staged tree with the given mode. If the filesystem doesn't
+    support it, that file and all the following ones are copied, a real error (disk full,
+    permissions) will be raised by the copy anyway
+    """
+
+    def __init__(self, mode):
+        if mode not in STAGING_MODES:
+            raise ConanException("Invalid staging mode '%s', possible values: %s"
+                                 % (mode, ", ".join(STAGING_MODES)))
+        if mode == REFLINK and fcntl is None:
+            mode = COPY
+        self.mode = mode
+
+    def is_staged(self, src, dst):
+        """ if dst is already a link of src, so it doesn't need to be created again
+        """
+        try:
+            if self.mode == HARDLINK:
+                return not os.path.islink(dst) and os.path.samefile(src, dst)
+            if self.mode == SYMLINK:
+                return os.path.islink(dst) and os.readlink(dst) == os.path.abspath(src)
+        except (OSError, AttributeError):  # No samefile in python 2 Windows
+            pass
+        return False
+
+    def __call__(self, src, dst):
+        try:
+            if self.mode == HARDLINK:
+                os.link(src, dst)
+                return
+            elif self.mode == SYMLINK:
+                os.symlink(os.path.abspath(src), dst)
+                return
+            elif self.mode == REFLINK:
+                _reflink(src, dst)
+                return
+        except (OSError, IOError, AttributeError, NotImplementedError) as exc:
+            # AttributeError, NotImplementedError: no links in python 2 Windows
+            logger.debug("Staging mode %s not supported, copying: %s" % (self.mode, str(exc)))
+            self.mode = COPY
+            if os.path.lexists(dst):
+                os.remove(dst)
+        shutil.copy2(src, dst)
+
+
+def _reflink(src, dst):
+    with open(src, "rb") as src_file:
+        with open(dst, "wb") as dst_file:
+            fcntl.ioctl(dst_file.fileno(), _FICLONE, src_file.fileno())
+    shutil.copystat(src, dst)
+
+
+def stage_tree(src, dst, mode=COPY, ignore=None):
+    """ Same as shutil.copytree(src, dst, symlinks=True, ignore=ignore), but the files can be:
+        - reflink: cloned, sharing the data until any of them is modified (copy-on-write)
+        - hardlink: hard linked to the origin ones
+        - symlink: symbolic links to the origin files
+    The linked files written by conan (save, tools.replace_in_file) are replaced by a copy
+    first, so the origin is kept, but any other tool writing them modifies the origin
+    When the filesystem doesn't support it, the files are copied
+    """
+    if mode == COPY:
+        shutil.copytree(src, dst, symlinks=True, ignore=ignore)
+        return
+    _stage_tree(src, dst, FileStager(mode), ignore)
+
+
+def _stage_tree(src, dst, stage_file, ignore):
+    names = os.listdir(src)
+    ignored_names = ignore(src, names) if ignore is not None else set()
+    os.makedirs(dst)
+    for name in names:
+        if name in ignored_names:
+            continue
+        src_name = os.path.join(src, name)
+        dst_name = os.path.join(dst, name)
+        if os.path.islink(src_name):
+            os.symlink(os.readlink(src_name), dst_name)
+        elif os.path.isdir(src_name):
+            _stage_tree(src_name, dst_name, stage_file, ignore)
+        else:
+            stage_file(src_name, dst_name)
+    shutil.copystat(src, dst)
+
+
+def tree_checksums(folder, ignore=None, checksum_cache=None):
+    """ The md5 of the files that stage_tree(folder, dst, ignore=ignore) would stage
+    param checksum_cache: optional ChecksumCache, only the files changed since they were
+    stored there are read
+    return {relative path: md5}, the md5 of the symlinks is the one of their target path,
+    they are not followed
+    """
+    files = {}
+    checksums = {}
+    for root, dirs, filenames in os.walk(folder):
+        ignored_names = ignore(root, dirs + filenames) if ignore is not None else set()
+        subdirs = []
+        for name in dirs + filenames:
+            if name in ignored_names:
+                continue
+            path = os.path.join(root, name)
+            rel_path = os.path.relpath(path, folder).replace("\\", "/")
+            if os.path.islink(path):
+                checksums[rel_path] = md5("symlink:%s" % os.readlink(path))
+            elif name in dirs:
+                subdirs.append(name)
+            else:
+                files[rel_path] = path
+        dirs[:] = subdirs
+
+    file_checksums = checksum_files(list(files.values()), ["md5"], checksum_cache)
+    for rel_path, path in files.items():
+        checksums[rel_path] = file_checksums[path][0]
+    return checksums
+
+
+def sync_tree(src, dst, previous, current, mode=COPY, checksum_cache=None):
+    """ Updates dst, staged from src when its files had the previous checksums, to the current
+    ones (both from tree_checksums). Only the new, changed or missing files are staged again,
+    and touched so they are newer than anything built from them, and the files no longer in
+    src are removed. The files of dst modified since they were staged, by a previous build
+    patching its sources, are also staged again. Any other file of dst, like the build
+    outputs, is kept
+    param checksum_cache: optional ChecksumCache, to check the unchanged files of dst without
+    reading them
+    return the relative paths of the staged files
+    """
+    for rel_path in previous:
+        if rel_path not in current:
+            path = os.path.join(dst, rel_path)
+            if os.path.islink(path) or os.path.isfile(path):
+                os.remove(path)
+
+    stage_file = FileStager(mode)
+    to_stage = []
+    to_check = {}  # {dst path: rel_path} of the unchanged ones, that could be modified in dst
+    for rel_path, checksum in sorted(current.items()):
+        src_path = os.path.join(src, rel_path)
+        dst_path = os.path.join(dst, rel_path)
+        if previous.get(rel_path) != checksum or not os.path.lexists(dst_path):
+            to_stage.append(rel_path)
+        elif os.path.islink(src_path):
+            if not os.path.islink(dst_path) or os.readlink(dst_path) != os.readlink(src_path):
+                to_stage.append(rel_path)
+        elif stage_file.is_staged(src_path, dst_path):
+            continue  # Still the link to the source file
+        elif os.path.isfile(dst_path) and not os.path.islink(dst_path):
+            to_check[dst_path] = rel_path
+        else:
+            to_stage.append(rel_path)
+    dst_checksums = checksum_files(list(to_check.keys()), ["md5"], checksum_cache)
+    to_stage.extend(rel_path for dst_path, rel_path in to_check.items()
+                    if dst_checksums[dst_path][0] != current[rel_path])
+
+    now = time.time()
+    for rel_path in sorted(to_stage):
+        src_path = os.path.join(src, rel_path)
+        dst_path = os.path.join(dst, rel_path)
+        if os.path.isdir(dst_path) and not os.path.islink(dst_path):
+            shutil.rmtree(dst_path)
+        elif os.path.lexists(dst_path):
+            os.remove(dst_path)
+        parent = os.path.dirname(dst_path)
+        if not os.path.isdir(parent):
+            os.makedirs(parent)
+        if os.path.islink(src_path):
+            os.symlink(os.readlink(src_path), dst_path)
+        else:
+            stage_file(src_path, dst_path)
+            # Linked files are touched in the origin too, only the mtime changes there
+            os.utime(dst_path, (now, now))
+    return sorted(to_stage)